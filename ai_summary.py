@@ -0,0 +1,283 @@
+"""
+AI Report Summary
+=================
+LLM-generated report summaries: the prompt, the provider call and persistence.
+Calls share process-wide token buckets sized to the provider's quotas
+(requests and tokens per minute) and retry 429/5xx/connection failures with
+backoff, so concurrent workers slow down instead of tripping rate limits.
+The prompt carries only the health-relevant output selected by summary_input;
+reports whose selection exceeds the token budget are summarized map-reduce.
+Table fields that junos_health can parse are taken from the parser; the model
+writes the narrative and whatever could not be parsed (AI_SUMMARY_MODE).
+Summaries are stored once per report (report_summaries) and reused.
+"""
+
+from db.reports import iter_report_sections, get_report_summary, save_report_summary
+from summary_input import build_summary_input, pack_lines
+from junos_health import collect_health_outputs, extract_health, local_summary
+from groq import Groq
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AI_SUMMARY_MODEL = os.getenv('AI_SUMMARY_MODEL', 'llama-3.1-8b-instant')
+
+# llm: the model fills the whole summary; hybrid: parsed fields override the model's;
+# local: no LLM call, the summary is built from parsed fields only
+AI_SUMMARY_MODE = os.getenv('AI_SUMMARY_MODE', 'hybrid').lower()
+
+# Provider quotas; keep these at or slightly under the account's limits
+AI_REQUESTS_PER_MINUTE = float(os.getenv('AI_REQUESTS_PER_MINUTE', 30))
+AI_TOKENS_PER_MINUTE = float(os.getenv('AI_TOKENS_PER_MINUTE', 6000))
+
+# Attempts after the first one for 429/5xx/connection errors
+AI_MAX_RETRIES = int(os.getenv('AI_MAX_RETRIES', 5))
+
+# Completion tokens reserved per request on top of the prompt estimate
+AI_MAX_OUTPUT_TOKENS = int(os.getenv('AI_MAX_OUTPUT_TOKENS', 700))
+
+SYSTEM_PROMPT = (
+    "You are a senior network engineer and technical report writer.\n"
+    "Analyze router/switch reports and produce:\n"
+    "1) Summary table\n"
+    "2) Narrative explanation\n"
+    "Only use provided data."
+)
+
+USER_PROMPT = """
+Analyze the following router/switch system report.
+
+Return ONLY valid JSON with no extra text.
+
+Use this exact format:
+
+{
+  "summary_table": {
+    "Device": "",
+    "Model": "",
+    "OS_version": "",
+    "Uptime": "",
+    "CPU_usage": "",
+    "Memory_usage": "",
+    "Temperature": "",
+    "Power_status": "",
+    "Alarms": "",
+    "Overall_status": ""
+  },
+  "narrative_summary": ""
+}
+
+Rules:
+- Use only data found in the report
+- If a value is missing, use "Not Reported"
+- Overall_status must be: Healthy, Warning, or Critical
+
+Report Data:
+"""
+
+# Map step for reports too large for one request; the notes feed the final USER_PROMPT
+MAP_PROMPT = """
+Extract the facts needed for a device health summary from this part of a
+router/switch system report: hostname, model, OS version, uptime, CPU, memory,
+temperature, power, fans, alarms and any failures or errors.
+
+Reply with short plain-text bullet points. Use only data found in the report.
+
+Report Data:
+"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `capacity` tokens, refilled at `rate` per second."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """
+        Block until `amount` tokens are available, then take them. An amount larger
+        than the capacity waits for a full bucket and takes all of it, leaving the
+        bucket in debt, so later callers wait until it has been paid back.
+        """
+        needed = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# One request may start every 60/RPM seconds; tokens allow a burst of a quarter minute
+request_bucket = TokenBucket(AI_REQUESTS_PER_MINUTE / 60, 1)
+token_bucket = TokenBucket(AI_TOKENS_PER_MINUTE / 60, AI_TOKENS_PER_MINUTE / 4)
+
+
+def estimate_tokens(text):
+    """Rough token count of a prompt (about four characters per token) plus the completion budget."""
+    return len(text) // 4 + AI_MAX_OUTPUT_TOKENS
+
+
+def _is_retryable(e):
+    """429, 5xx and connection/timeouts are worth another attempt; other errors are not."""
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(e).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _retry_delay(e, attempt):
+    """Honor the provider's Retry-After header, else exponential backoff with jitter."""
+    response = getattr(e, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return min(60, 2 ** attempt) * (0.5 + random.random() / 2)
+
+
+def request_summary(result, prompt=USER_PROMPT):
+    """
+    Send one request for report data (appended to `prompt`) and return the raw reply.
+    Waits on the shared rate limits before every attempt; raises after the last retry.
+    GROQ_BASE_URL points the client at another endpoint (e.g. the stub server in benchmarks).
+    """
+    api_key = os.getenv('GROQ_API_KEY')
+    if not api_key:
+        raise RuntimeError("GROQ_API_KEY not found")
+    # Retries are handled here so they also pass through the rate limits
+    client = Groq(api_key=api_key, base_url=os.getenv('GROQ_BASE_URL') or None, max_retries=0)
+    user_prompt = prompt + str(result)
+
+    for attempt in range(AI_MAX_RETRIES + 1):
+        request_bucket.acquire()
+        token_bucket.acquire(estimate_tokens(SYSTEM_PROMPT + user_prompt))
+        try:
+            response = client.chat.completions.create(
+                model=AI_SUMMARY_MODEL,
+                temperature=0.2,
+                max_tokens=AI_MAX_OUTPUT_TOKENS,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ]
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            if attempt == AI_MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            print(f"AI summary request failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def summary_model():
+    """Model label stored with summaries, so changing the model or the mode regenerates them."""
+    if AI_SUMMARY_MODE == "local":
+        return "parsed"
+    if AI_SUMMARY_MODE == "hybrid":
+        return f"parsed+{AI_SUMMARY_MODEL}"
+    return AI_SUMMARY_MODEL
+
+
+def prepare_summary_input(report_id):
+    """
+    Return (chunks, parsed) from one streamed pass over the report's sections:
+    the prompt data as budget-sized chunks (see summary_input, none in local mode)
+    and the summary table fields parsed by junos_health (none in llm mode).
+    """
+    outputs = {}
+    sections = collect_health_outputs(iter_report_sections(report_id), outputs)
+    if AI_SUMMARY_MODE == "local":
+        chunks = []
+        for _ in sections:
+            pass
+    else:
+        chunks = build_summary_input(sections)
+    parsed = extract_health(outputs) if AI_SUMMARY_MODE != "llm" else {}
+    return chunks, parsed
+
+
+def summarize_chunks(chunks, parsed=None):
+    """
+    Return the raw JSON summary for prepared input. A single chunk is one request;
+    otherwise each chunk is condensed to notes (map) and the notes are summarized
+    (reduce), repeating while the notes still exceed the budget.
+    Parsed fields are given to the final request as facts to build on.
+    """
+    while len(chunks) > 1:
+        notes = [request_summary(chunk, MAP_PROMPT) for chunk in chunks]
+        packed = pack_lines("\n".join(notes).splitlines())
+        # Stop shrinking if the notes no longer get smaller; the first chunk still fits
+        chunks = packed if len(packed) < len(chunks) else packed[:1]
+    facts = ""
+    if parsed:
+        facts = "### Parsed values (authoritative)\n" + "\n".join(f"{k}: {v}" for k, v in parsed.items()) + "\n"
+    return request_summary(facts + chunks[0])
+
+
+def summary_input_hash(chunks, parsed):
+    """SHA-256 of prepared summary input, stored with a summary to tell whether it is still current."""
+    data = "\n".join(chunks) + json.dumps(parsed, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def AI_report_summary(report, chunks=None, parsed=None):
+    """Use Groq LLM to analyze report data and return structured JSON summary."""
+    try:
+        if chunks is None:
+            chunks, parsed = prepare_summary_input(report["id"])
+        return summarize_chunks(chunks, parsed)
+    except Exception as e:
+        print(f"AI summary generation failed: {e}")
+        return None
+
+
+def get_ai_summary(report):
+    """
+    Return the report's AI summary as a dict, generating it on first use.
+    Summaries are stored with their model and input hash and reused by later
+    renders while both still match (a different model, mode or input selection
+    regenerates them), so downloads neither wait on nor pay for the LLM again.
+    "field_sources" maps each table field to "parsed", "model" or "missing".
+    Returns None when no valid summary could be produced.
+    """
+    chunks, parsed = prepare_summary_input(report["id"])
+    input_hash = summary_input_hash(chunks, parsed)
+    stored = get_report_summary(report["id"])
+    if stored and stored["model"] == summary_model() and stored["input_hash"] == input_hash:
+        return stored["summary"]
+
+    if AI_SUMMARY_MODE == "local":
+        summary = local_summary(parsed)
+    else:
+        summary_json = AI_report_summary(report, chunks, parsed)
+        if not summary_json or not summary_json.strip():
+            return None
+        try:
+            summary = json.loads(summary_json)
+        except json.JSONDecodeError as e:
+            print(f"AI summary is not valid JSON: {e}")
+            return None
+        summary.setdefault("summary_table", {}).update(parsed)
+
+    model_source = "missing" if AI_SUMMARY_MODE == "local" else "model"
+    summary["field_sources"] = {
+        field: "parsed" if field in parsed else model_source for field in summary["summary_table"]
+    }
+    save_report_summary(report["id"], summary_model(), input_hash, summary)
+    return summary
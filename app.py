@@ -10,6 +10,10 @@ from ui.customers.customer_page import show_customer_page
 from ui.devices.device_page import show_device_page
 from ui.templates.template_page import show_template_page
 from ui.reports.report_page import show_report_page
+from db.instrumentation import query_scope
+
+# Show per-render query counts in the sidebar (DB_QUERY_DEBUG=1)
+QUERY_DEBUG = os.getenv("DB_QUERY_DEBUG", "0") == "1"
 
 # -----------------------------
 # Authentication Check
@@ -72,17 +76,24 @@ with st.sidebar:
 # -----------------------------
 # Page routing
 # -----------------------------
-if selected == "Customer Details":
-    show_customer_page()
+with query_scope(selected) as queries:
+    if selected == "Customer Details":
+        show_customer_page()
+
+    elif selected == "Device Details":
+        show_device_page()
 
-elif selected == "Device Details":
-    show_device_page()
+    elif selected == "Template Details":
+        show_template_page()
 
-elif selected == "Template Details":
-    show_template_page()
+    elif selected == "Report Details and Generate Report":
+        show_report_page()
 
-elif selected == "Report Details and Generate Report":
-    show_report_page()
+    elif selected == "User Management":
+        show_user_management()
 
-elif selected == "User Management":
-    show_user_management()
+if QUERY_DEBUG:
+    with st.sidebar.expander(f"🔎 {len(queries)} queries, {queries.total_ms:.0f} ms"):
+        for fp, count, total_ms, callers in queries.by_fingerprint()[:15]:
+            st.caption(f"**{count}×** {total_ms:.1f} ms · {', '.join(callers)}")
+            st.code(fp, language="sql")
@@ -0,0 +1,84 @@
+"""
+CLI output flowable benchmark
+=============================
+Lays out large `show route` / `show configuration` outputs with the CLIOutput
+flowable (pdf_flowables.py) and with the previous approach (90-character wrap,
+70-line chunks, one Table around a Preformatted per chunk), and compares build
+time, page count and PDF size.
+
+    python -m benchmarks.bench_cli_flowable [--routes 20000] [--units 2000]
+"""
+
+import argparse
+import time
+from io import BytesIO
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Preformatted
+from pdf_flowables import CLIOutput
+from benchmarks import junos_samples
+
+CLI_STYLE = ParagraphStyle(name="CLIStyle", fontName="Courier", fontSize=8, leading=9)
+
+
+def _table_chunks(output):
+    """The layout gen_PDF used before CLIOutput."""
+    lines = []
+    for line in output.split("\n"):
+        while len(line) > 90:
+            lines.append(line[:90])
+            line = line[90:]
+        lines.append(line)
+    batches = ["\n".join(lines[i:i + 70]) for i in range(0, len(lines), 70)]
+    tables = []
+    for i, text in enumerate(batches):
+        top, bottom = i == 0, i == len(batches) - 1
+        table = Table([[Preformatted(text, CLI_STYLE)]], colWidths=[16 * cm])
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), colors.whitesmoke),
+            ("LEFTPADDING", (0, 0), (-1, -1), 6),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+            ("TOPPADDING", (0, 0), (-1, -1), 4 if top else 0),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4 if bottom else 0),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("BOX", (0, 0), (-1, -1), 0.5, colors.grey),
+        ]))
+        tables.append(table)
+    return tables
+
+
+def _flowable(output):
+    return [CLIOutput(output, 16 * cm, font_name="Courier", font_size=8, leading=9)]
+
+
+def _build(story_fn, output):
+    """Build a PDF around one output; returns (ms, pages, bytes)."""
+    started = time.perf_counter()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2 * cm, leftMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm)
+    doc.build(story_fn(output))
+    return (time.perf_counter() - started) * 1000, doc.page, len(buffer.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--routes", type=int, default=20000, help="Routes in the `show route` output")
+    parser.add_argument("--units", type=int, default=2000, help="Interfaces in the `show configuration` output")
+    args = parser.parse_args()
+
+    outputs = {
+        "show route": junos_samples.show_route(args.routes),
+        "show configuration": junos_samples.show_configuration(args.units),
+    }
+    print(f"{'output':<20}{'lines':>8}{'layout':>12}{'ms':>10}{'pages':>8}{'KB':>10}")
+    for name, output in outputs.items():
+        lines = output.count("\n") + 1
+        for layout, story_fn in (("tables", _table_chunks), ("flowable", _flowable)):
+            ms, pages, size = _build(story_fn, output)
+            print(f"{name:<20}{lines:>8}{layout:>12}{ms:>10.0f}{pages:>8}{size / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Storage codec benchmark
+=======================
+Measures compression ratio and encode/decode latency of the report output
+codec (db/codec.py) on synthetic Junos outputs.
+
+    python -m benchmarks.bench_codec [--repeat 5]
+"""
+
+import argparse
+import time
+from db.codec import encode_output, decode_output, zstandard
+from benchmarks import junos_samples
+
+
+SAMPLES = {
+    "show version": junos_samples.show_version(),
+    "show chassis environment": junos_samples.show_chassis_environment(),
+    "show interfaces terse": junos_samples.show_interfaces_terse(),
+    "show route (20k)": junos_samples.show_route(),
+    "show configuration": junos_samples.show_configuration(),
+}
+
+
+def _best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codecs = ["none", "zlib"] + (["zstd"] if zstandard else [])
+    print(f"{'sample':<26}{'codec':<7}{'raw KB':>10}{'stored KB':>11}{'ratio':>8}{'write ms':>10}{'read ms':>9}")
+    for name, text in SAMPLES.items():
+        raw_kb = len(text.encode("utf-8")) / 1024
+        for codec in codecs:
+            encoded = encode_output(text, codec)
+            write = _best_of(args.repeat, lambda: encode_output(text, codec))
+            read = _best_of(args.repeat, lambda: decode_output(encoded))
+            assert decode_output(encoded) == text
+            stored_kb = len(encoded) / 1024
+            print(f"{name:<26}{codec:<7}{raw_kb:>10.1f}{stored_kb:>11.1f}{raw_kb / stored_kb:>7.1f}x{write * 1000:>10.2f}{read * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Report container benchmark
+==========================
+Compares listing sections and reading one output from a report container
+(db/report_format.py) against parsing the equivalent legacy JSON blob.
+
+    python -m benchmarks.bench_container [--copies 60]
+"""
+
+import argparse
+import json
+import time
+from db.report_format import pack_report, ReportContainer, read_report
+from benchmarks import junos_samples
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=60, help="Times the large fleet report is repeated")
+    args = parser.parse_args()
+
+    sections = junos_samples.fleet_report(large=True) * args.copies
+    legacy = json.dumps(sections)
+    container, pack_ms = _timed(lambda: pack_report(sections))
+
+    print(f"Report: {len(sections)} sections, {len(legacy) / 1e6:.1f} MB JSON, {len(container) / 1e6:.1f} MB container (packed in {pack_ms:.0f} ms)")
+    print(f"{'operation':<36}{'JSON ms':>10}{'container ms':>14}")
+
+    _, json_list = _timed(lambda: [s.get("command") for s in read_report(legacy)])
+    _, cont_list = _timed(lambda: [s.get("command") for s in ReportContainer(container).sections(include_output=False)])
+    print(f"{'list sections':<36}{json_list:>10.1f}{cont_list:>14.1f}")
+
+    last = len(sections) - 1
+    _, json_one = _timed(lambda: list(read_report(legacy))[last]["output"])
+    _, cont_one = _timed(lambda: ReportContainer(container).output(last))
+    print(f"{'read last output':<36}{json_one:>10.1f}{cont_one:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+PDF generation benchmark
+========================
+Renders synthetic reports of different shapes through generate_pdf on an
+in-memory SQLite database and reports wall time (best warm render), peak
+Python memory (tracemalloc, over a cold render with the per-process style and
+logo caches cleared), page count and PDF size per scenario. Exits non-zero when a
+scenario exceeds its time or memory threshold, or regresses against a saved
+baseline, so it can gate changes to gen_PDF.
+
+    python -m benchmarks.bench_pdf [--repeat 3] [--save results.json] [--baseline results.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+# scenario -> (max ms, max peak MB); about 2x a single-core run (small scenarios
+# get more headroom, as a few ms of noise is a large share of their time)
+THRESHOLDS = {
+    "huge outputs": (2500, 50),
+    "many small commands": (2000, 18),
+    "many headers": (500, 5),
+    "logos + manual summary": (40, 2),
+    "exact page fit": (300, 4),
+    "fleet report": (40, 1.2),
+}
+
+# Allowed slowdown / memory growth against --baseline before failing
+BASELINE_TOLERANCE = 0.25
+
+_PAGE = re.compile(rb"/Type /Page[^s]")
+
+
+def _logo(color):
+    from PIL import Image
+    buffer = BytesIO()
+    Image.new("RGBA", (1200, 800), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _command(command, output, description=""):
+    return {"type": "Command", "command": command, "description": description, "output": output, "status": "success"}
+
+
+def _scenarios():
+    """Scenario name -> (results, use logos and manual summary)."""
+    from benchmarks import junos_samples
+    small = junos_samples.show_chassis_routing_engine()
+    terse = junos_samples.show_interfaces_terse(100).splitlines()
+    return {
+        "huge outputs": ([
+            _command("show route", junos_samples.show_route(50000), "Routing table"),
+            _command("show configuration", junos_samples.show_configuration(5000), "Configuration"),
+        ], False),
+        "many small commands": ([_command(f"show chassis routing-engine {i}", small) for i in range(1500)], False),
+        "many headers": ([
+            entry for i in range(500)
+            for entry in ({"type": "Header", "text": f"Section {i}", "status": "success"},
+                          _command("show system alarms", junos_samples.show_system_alarms(i % 4)))
+        ], False),
+        "logos + manual summary": (junos_samples.fleet_report()[:5], True),
+        # Outputs filling a page with or without their bottom padding (split edge cases)
+        "exact page fit": ([
+            _command(f"show interfaces terse {i}", "\n".join(terse[:lines]), "Interfaces" if i % 2 else "")
+            for i, lines in enumerate([78, 79, 80] * 50)
+        ], False),
+        "fleet report": (junos_samples.fleet_report(), False),
+    }
+
+
+def _create(results, decorated, index):
+    """Store one report (and its customer/device/template); returns the report id."""
+    from db.customer import create_customer
+    from db.devices import create_device
+    from db.templates import create_template
+    from db.reports import create_reports
+    customer_id = create_customer(f"Bench {index}", "bench@example.com", 0,
+                                  image=BytesIO(_logo((30, 90, 160, 255))) if decorated else None)
+    manual_table = [{"field": f"Check {i}", "value": "Pass"} for i in range(20)] if decorated else None
+    template_id = create_template(
+        f"Bench {index}", "[]", "[]", customer_id, "Synthetic benchmark report", False,
+        manual_summary_desc="Reviewed by the benchmark." if decorated else None,
+        manual_summary_table=manual_table,
+        company_logo=_logo((200, 40, 40, 128)) if decorated else None,
+    )
+    device_id = create_device(customer_id, f"SN{index:05d}", f"bench-{index}", "Juniper", "MX480", "192.0.2.1", 22, "u", "p")
+    return create_reports([{"device_id": device_id, "customer_id": customer_id, "template_id": template_id,
+                            "results": results, "ai_summary": 0}])[0]
+
+
+def _clear_process_caches():
+    """Forget the styles and logos gen_PDF keeps per process, so the next render is cold."""
+    import gen_PDF
+    gen_PDF._STYLES = None
+    gen_PDF._LOGO_CACHE.clear()
+    gen_PDF._LOGO_READERS.clear()
+
+
+def _measure(report_id, repeat):
+    """One cold render under tracemalloc, then the best wall time over `repeat` warm renders."""
+    from gen_PDF import generate_pdf
+    _clear_process_caches()
+    tracemalloc.start()
+    generate_pdf(report_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pdf = generate_pdf(report_id)[0].getvalue()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return {"ms": best, "peak_mb": peak / 1e6, "pages": len(_PAGE.findall(pdf)), "kb": len(pdf) / 1024}
+
+
+def _failures(name, result, baseline):
+    max_ms, max_mb = THRESHOLDS[name]
+    failures = []
+    if result["ms"] > max_ms:
+        failures.append(f"{name}: {result['ms']:.0f} ms exceeds {max_ms} ms")
+    if result["peak_mb"] > max_mb:
+        failures.append(f"{name}: peak {result['peak_mb']:.1f} MB exceeds {max_mb} MB")
+    previous = baseline.get(name)
+    if previous:
+        for metric in ("ms", "peak_mb"):
+            if result[metric] > previous[metric] * (1 + BASELINE_TOLERANCE):
+                failures.append(f"{name}: {metric} {result[metric]:.1f} vs baseline {previous[metric]:.1f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed renders per scenario (best is reported)")
+    parser.add_argument("--scenario", action="append", choices=sorted(THRESHOLDS), help="Run only these scenarios")
+    parser.add_argument("--save", help="Write results as JSON (e.g. to compare a later commit with --baseline)")
+    parser.add_argument("--baseline", help="JSON from an earlier --save; fail on regressions beyond 25%%")
+    args = parser.parse_args()
+
+    # Configuration is read at import time, so set it before loading the app modules
+    os.environ.update({"DB_BACKEND": "sqlite", "DB_SQLITE_PATH": ":memory:", "PDF_CACHE": "0"})
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results, failures = {}, []
+    print(f"{'scenario':<26}{'ms':>9}{'peak MB':>10}{'pages':>8}{'KB':>9}")
+    for index, (name, (sections, decorated)) in enumerate(_scenarios().items()):
+        if args.scenario and name not in args.scenario:
+            continue
+        result = _measure(_create(sections, decorated, index), args.repeat)
+        results[name] = result
+        failures += _failures(name, result, baseline)
+        print(f"{name:<26}{result['ms']:>9.0f}{result['peak_mb']:>10.1f}{result['pages']:>8}{result['kb']:>9.0f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
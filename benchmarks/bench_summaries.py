@@ -0,0 +1,73 @@
+"""
+AI summary worker benchmark
+===========================
+Runs a fleet of AI summaries through the background worker against the stub
+LLM server (benchmarks/stub_llm.py) on an in-memory SQLite database, and
+reports throughput and how often the stub's quota was hit.
+
+    python -m benchmarks.bench_summaries [--reports 500] [--rpm 600] [--error-rate 0.02]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=500, help="Reports with an AI summary to generate")
+    parser.add_argument("--rpm", type=int, default=600, help="Stub quota; the client is configured slightly below it")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of stub replies that are 503s")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    from benchmarks.stub_llm import start_server
+    server, stub = start_server(rpm=args.rpm, error_rate=args.error_rate, latency=0.05)
+
+    # Configuration is read at import time, so set it before loading the app modules
+    os.environ.update({
+        "DB_BACKEND": "sqlite",
+        "DB_SQLITE_PATH": ":memory:",
+        "GROQ_API_KEY": "stub",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{server.server_port}",
+        "AI_REQUESTS_PER_MINUTE": str(args.rpm * 0.95),
+        "AI_TOKENS_PER_MINUTE": str(10 ** 9),
+        "AI_CONCURRENCY": str(args.concurrency),
+    })
+    from db.customer import create_customer
+    from db.devices import create_device
+    from db.templates import create_template
+    from db.reports import create_reports, get_reports_missing_summary
+    from summary_worker import enqueue_summaries, pending_summaries, wait_for_all
+    from benchmarks import junos_samples
+
+    customer_id = create_customer("Bench", "bench@example.com", 0)
+    template_id = create_template("Bench", "[]", "[]", customer_id, "", False)
+    device_ids = [
+        create_device(customer_id, f"SN{i:05d}", f"r{i}", "Juniper", "MX204", "192.0.2.1", 22, "u", "p")
+        for i in range(args.reports)
+    ]
+    report_ids = create_reports([
+        {"device_id": d, "customer_id": customer_id, "template_id": template_id,
+         "results": junos_samples.fleet_report(), "ai_summary": 1}
+        for d in device_ids
+    ])
+
+    started = time.perf_counter()
+    enqueue_summaries(report_ids)
+    enqueued_ms = (time.perf_counter() - started) * 1000
+    while pending_summaries():
+        wait_for_all(timeout=5)
+        print(f"   … {args.reports - pending_summaries()}/{args.reports} done, stub {stub.counts}", file=sys.stderr)
+    elapsed = time.perf_counter() - started
+
+    missing = len(get_reports_missing_summary(args.reports))
+    server.shutdown()
+    print(f"Enqueued {args.reports} summaries in {enqueued_ms:.1f} ms (caller is not blocked)")
+    print(f"Completed in {elapsed:.1f}s ({args.reports / elapsed:.1f}/s), {missing} missing")
+    print(f"Stub replies: {stub.counts['ok']} ok, {stub.counts['rate_limited']} rate-limited, {stub.counts['errors']} injected errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Synthetic Junos CLI outputs
+===========================
+Deterministic generators that mimic the shape of real `show` command output
+(repetitive column layouts, interface names, prefixes) for benchmarks.
+"""
+
+import random
+
+
+def show_version(hostname="edge-rtr-01"):
+    """`show version` for an MX router."""
+    return "\n".join([
+        f"Hostname: {hostname}",
+        "Model: mx480",
+        "Junos: 21.4R3-S5.4",
+        "JUNOS OS Kernel 64-bit  [20230721.2a5d8b4_builder_stable_12_214]",
+        "JUNOS OS libs [20230721.2a5d8b4_builder_stable_12_214]",
+        "JUNOS OS runtime [20230721.2a5d8b4_builder_stable_12_214]",
+        "JUNOS OS time zone information [20230721.2a5d8b4_builder_stable_12_214]",
+        "JUNOS network stack and utilities [20230816.112233_builder_junos_214_r3_s5]",
+        "JUNOS libs [20230816.112233_builder_junos_214_r3_s5]",
+        "JUNOS Packet Forwarding Engine Support (MX Common) [20230816.112233_builder_junos_214_r3_s5]",
+        "JUNOS Routing Software Suite [20230816.112233_builder_junos_214_r3_s5]",
+    ])
+
+
+def show_interfaces_terse(count=400, seed=1):
+    """`show interfaces terse` with `count` logical interfaces."""
+    rng = random.Random(seed)
+    lines = ["Interface               Admin Link Proto    Local                 Remote"]
+    for i in range(count):
+        fpc, pic, port = i // 40, (i // 10) % 4, i % 10
+        state = "up" if rng.random() > 0.1 else "down"
+        lines.append(f"ge-{fpc}/{pic}/{port}                up    {state}")
+        lines.append(f"ge-{fpc}/{pic}/{port}.0              up    {state} inet     10.{fpc}.{pic}.{port * 4 + 1}/30")
+    return "\n".join(lines)
+
+
+def show_route(count=20000, seed=2):
+    """`show route` for an inet.0 table with `count` BGP prefixes."""
+    rng = random.Random(seed)
+    lines = [
+        f"inet.0: {count} destinations, {count * 2} routes ({count} active, 0 holddown, 0 hidden)",
+        "+ = Active Route, - = Last Active, * = Both",
+        "",
+    ]
+    for _ in range(count):
+        prefix = f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.0/24"
+        peer = f"192.0.2.{rng.randint(1, 8)}"
+        lines.append(f"{prefix:<19}*[BGP/170] 5w2d 13:{rng.randint(10, 59)}:{rng.randint(10, 59)}, localpref 100")
+        lines.append(f"                      AS path: 65{rng.randint(100, 999)} {rng.randint(1000, 65000)} I, validation-state: unverified")
+        lines.append(f"                    >  to {peer} via ae{rng.randint(0, 3)}.0")
+    return "\n".join(lines)
+
+
+def show_configuration(units=2000, seed=3):
+    """`show configuration` with `units` interface units and policy stanzas."""
+    rng = random.Random(seed)
+    lines = ["## Last commit: 2026-10-01 02:13:44 UTC by netops", "version 21.4R3-S5.4;", "interfaces {"]
+    for i in range(units):
+        lines += [
+            f"    ge-{i // 40}/{(i // 10) % 4}/{i % 10} {{",
+            f"        description \"CUST-{rng.randint(1000, 9999)} access\";",
+            "        unit 0 {",
+            "            family inet {",
+            f"                address 10.{i // 256}.{i % 256}.1/30;",
+            "            }",
+            "        }",
+            "    }",
+        ]
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def show_chassis_routing_engine():
+    """`show chassis routing-engine` for a dual-RE chassis."""
+    return """Routing Engine status:
+  Slot 0:
+    Current state                  Master
+    Election priority              Master (default)
+    Temperature                 38 degrees C / 100 degrees F
+    CPU temperature             44 degrees C / 111 degrees F
+    DRAM                      32768 MB (32768 MB installed)
+    Memory utilization          21 percent
+    5 sec CPU utilization:
+      User                       3 percent
+      Background                 0 percent
+      Kernel                     4 percent
+      Interrupt                  0 percent
+      Idle                      93 percent
+    Model                          RE-S-X6-64G
+    Start time                     2026-08-20 04:12:09 UTC
+    Uptime                         60 days, 3 hours, 41 minutes, 2 seconds
+    Last reboot reason             Router rebooted after a normal shutdown.
+    Load averages:                 1 minute   5 minute  15 minute
+                                       0.21       0.18       0.16"""
+
+
+def show_chassis_environment():
+    """`show chassis environment` with power, temperature and fan sections."""
+    lines = ["Class Item                           Status     Measurement"]
+    for i in range(4):
+        lines.append(f"Power PEM {i}                          OK")
+    for i in range(6):
+        lines.append(f"Temp  FPC {i} Intake                  OK         {30 + i} degrees C / {86 + 2 * i} degrees F")
+        lines.append(f"      FPC {i} Exhaust                 OK         {38 + i} degrees C / {100 + 2 * i} degrees F")
+    for i in range(3):
+        lines.append(f"Fans  Top Fan Tray Fan {i}            OK         Spinning at normal speed")
+    return "\n".join(lines)
+
+
+def show_system_alarms(count=0):
+    """`show system alarms` with `count` active alarms."""
+    if not count:
+        return "No alarms currently active"
+    lines = [f"{count} alarms currently active", "Alarm time               Class  Description"]
+    for i in range(count):
+        lines.append(f"2026-10-0{1 + i % 9} 0{i % 10}:12:01 UTC  Minor  FPC {i} Temperature Warm")
+    return "\n".join(lines)
+
+
+def fleet_report(large=False):
+    """A realistic template run as a list of result dicts (headers + commands)."""
+    results = [
+        {"type": "Header", "text": "System", "status": "success"},
+        {"type": "Command", "command": "show version", "description": "Software version", "output": show_version(), "status": "success"},
+        {"type": "Command", "command": "show chassis routing-engine", "description": "RE health", "output": show_chassis_routing_engine(), "status": "success"},
+        {"type": "Command", "command": "show chassis environment", "description": "Environment", "output": show_chassis_environment(), "status": "success"},
+        {"type": "Command", "command": "show system alarms", "description": "Alarms", "output": show_system_alarms(), "status": "success"},
+        {"type": "Header", "text": "Interfaces", "status": "success"},
+        {"type": "Command", "command": "show interfaces terse", "description": "Interface state", "output": show_interfaces_terse(), "status": "success"},
+    ]
+    if large:
+        results += [
+            {"type": "Header", "text": "Routing", "status": "success"},
+            {"type": "Command", "command": "show route", "description": "Routing table", "output": show_route(), "status": "success"},
+            {"type": "Command", "command": "show configuration", "description": "Running configuration", "output": show_configuration(), "status": "success"},
+        ]
+    return results
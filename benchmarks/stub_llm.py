@@ -0,0 +1,151 @@
+"""
+Stub LLM server
+===============
+Local stand-in for the Groq chat completions API, for exercising the AI
+summary worker without network access or API spend. It enforces its own
+requests-per-minute quota (429 with Retry-After) and can inject 5xx errors,
+latency, and failures of the first requests (used by tests/test_ai_summary.py).
+
+    python -m benchmarks.stub_llm --port 8088 --rpm 30 --error-rate 0.05
+    GROQ_BASE_URL=http://127.0.0.1:8088 GROQ_API_KEY=stub streamlit run app.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUMMARY = {
+    "summary_table": {
+        "Device": "stub-router",
+        "Model": "mx204",
+        "OS_version": "21.4R3-S5",
+        "Uptime": "128 days",
+        "CPU_usage": "7%",
+        "Memory_usage": "41%",
+        "Temperature": "38 C",
+        "Power_status": "OK",
+        "Alarms": "None",
+        "Overall_status": "Healthy"
+    },
+    "narrative_summary": "Stub summary: all monitored components report normal status."
+}
+
+
+class StubLLM:
+    """Quota, fault injection and counters shared by the request handlers."""
+
+    def __init__(self, rpm=30, error_rate=0.0, latency=0.0, fail_first=0, fail_status=429):
+        self.rpm = rpm
+        self.error_rate = error_rate
+        self.latency = latency
+        # The first fail_first requests get fail_status (a 429 asks for a short Retry-After)
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.counts = {"ok": 0, "rate_limited": 0, "errors": 0}
+        self.prompts = []
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """Sliding one-minute window; returns seconds to wait when over quota, else 0."""
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm:
+                self.counts["rate_limited"] += 1
+                return 60 - (now - self._recent[0])
+            self._recent.append(now)
+            return 0
+
+
+def _handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body, headers=None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.endswith("/chat/completions"):
+                self._reply(404, {"error": {"message": "not found"}})
+                return
+            with stub._lock:
+                stub.prompts.append(request.get("messages", [{}])[-1].get("content", ""))
+                failing = stub.fail_first > 0
+                stub.fail_first -= failing
+            if failing:
+                if stub.fail_status == 429:
+                    stub.counts["rate_limited"] += 1
+                    self._reply(429, {"error": {"message": "rate limit exceeded"}}, {"Retry-After": "0.05"})
+                else:
+                    stub.counts["errors"] += 1
+                    self._reply(stub.fail_status, {"error": {"message": "injected failure"}})
+                return
+            retry_after = stub.admit()
+            if retry_after:
+                self._reply(429, {"error": {"message": "rate limit exceeded"}}, {"Retry-After": f"{retry_after:.1f}"})
+                return
+            if random.random() < stub.error_rate:
+                stub.counts["errors"] += 1
+                self._reply(503, {"error": {"message": "service unavailable"}})
+                return
+            time.sleep(stub.latency)
+            stub.counts["ok"] += 1
+            self._reply(200, {
+                "id": "stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps(SUMMARY)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(port=0, **options):
+    """Run the stub in a daemon thread; returns (server, stub). server.server_port has the bound port."""
+    stub = StubLLM(**options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(stub))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stub
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--rpm", type=int, default=30, help="Requests per minute before answering 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    args = parser.parse_args()
+
+    server, stub = start_server(args.port, rpm=args.rpm, error_rate=args.error_rate, latency=args.latency)
+    print(f"Stub LLM listening on http://127.0.0.1:{server.server_port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"Served: {stub.counts}")
+
+
+if __name__ == "__main__":
+    main()
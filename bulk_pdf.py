@@ -0,0 +1,112 @@
+"""
+Bulk PDF Rendering
+==================
+Renders several reports in parallel in a process pool; ReportLab layout is
+CPU-bound and holds the GIL, so threads would not help. The pool is started
+once (spawn, so no locks or connections are inherited from the Streamlit
+process) and reused. Each worker keeps its own logo cache (see gen_PDF) and
+writes to the shared on-disk PDF cache, so repeat downloads are cheap.
+Multi-report downloads are bundled into one ZIP that is written as PDFs
+complete, spooled to disk once it outgrows PDF_BUNDLE_SPOOL_BYTES.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from gen_PDF import generate_pdf, AI_RENDER_WAIT_SECONDS
+from summary_worker import summary_pending, wait_for_summary
+
+# Worker processes for bulk downloads (default: one per core)
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', 0)) or os.cpu_count() or 1
+
+# ZIP bundles larger than this are spooled to a temporary file instead of memory
+PDF_BUNDLE_SPOOL_BYTES = int(os.getenv('PDF_BUNDLE_SPOOL_BYTES', 32 * 1024 * 1024))
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool():
+    """Drop a pool whose worker died so the next call starts a fresh one."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def _render(report_id):
+    """Render one report; errors are returned so one bad report does not stop the batch."""
+    try:
+        buffer, filename = generate_pdf(report_id)
+        return report_id, filename, buffer.getvalue(), None
+    except Exception as e:
+        return report_id, None, None, str(e)
+
+
+def render_pdfs(report_ids):
+    """
+    Render reports in parallel, yielding (report_id, filename, pdf_bytes, error)
+    as each one completes (not in input order).
+    Reports whose AI summary is still being generated by this process's summary
+    worker are submitted once it is ready, so workers do not call the LLM themselves.
+    """
+    report_ids = list(dict.fromkeys(report_ids))
+    if len(report_ids) <= 1 or PDF_WORKERS <= 1:
+        for report_id in report_ids:
+            yield _render(report_id)
+        return
+
+    pool = _get_pool()
+    futures = {}
+    waiting = [report_id for report_id in report_ids if summary_pending(report_id)]
+    for report_id in report_ids:
+        if report_id not in waiting:
+            futures[pool.submit(_render, report_id)] = report_id
+    for report_id in waiting:
+        wait_for_summary(report_id, AI_RENDER_WAIT_SECONDS)
+        futures[pool.submit(_render, report_id)] = report_id
+
+    for future in as_completed(futures):
+        try:
+            yield future.result()
+        except BrokenProcessPool as e:
+            _reset_pool()
+            yield futures[future], None, None, f"PDF worker stopped: {e}"
+
+
+def build_pdf_bundle(report_ids, progress=None):
+    """
+    Render reports into a ZIP in a SpooledTemporaryFile, adding each PDF as it
+    completes so at most one rendered PDF is held at a time.
+    progress(done, total) is called after each report.
+    Returns (bundle file positioned at 0, number of PDFs, {report_id: error}).
+    """
+    report_ids = list(dict.fromkeys(report_ids))
+    bundle = tempfile.SpooledTemporaryFile(max_size=PDF_BUNDLE_SPOOL_BYTES)
+    names, errors = set(), {}
+    with zipfile.ZipFile(bundle, "w", zipfile.ZIP_DEFLATED) as archive:
+        for done, (report_id, filename, pdf_bytes, error) in enumerate(render_pdfs(report_ids), 1):
+            if error:
+                errors[report_id] = error
+            else:
+                # Reports of the same template and device share a filename
+                name = filename if filename not in names else f"{report_id}_{filename}"
+                names.add(name)
+                archive.writestr(name, pdf_bytes)
+            if progress:
+                progress(done, len(report_ids))
+    bundle.seek(0)
+    return bundle, len(names), errors
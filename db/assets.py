@@ -0,0 +1,143 @@
+"""
+Asset Database Module
+=====================
+Content-addressed store for uploaded images (customer and template logos).
+Images are validated once at upload and stored with pre-scaled PNG renditions,
+so PDF rendering and list pages never read the full-size original.
+"""
+
+import hashlib
+from io import BytesIO
+from PIL import Image as PILImage
+from db.connect_to_db import connect_to_db, chunked, in_placeholders
+
+# Rendition name -> longest side in pixels.
+# "pdf" covers the 3 cm cover logo at 300 dpi, "thumb" the 100 px UI previews.
+RENDITION_SIZES = {
+    "pdf": 354,
+    "thumb": 100,
+}
+
+
+def _render(image, max_side):
+    """Scale an opened image to fit max_side and encode it as PNG; returns (bytes, width, height)."""
+    rendition = image.copy()
+    if rendition.mode not in ("RGB", "RGBA", "L", "LA"):
+        rendition = rendition.convert("RGBA")
+    rendition.thumbnail((max_side, max_side), PILImage.LANCZOS)
+    buffer = BytesIO()
+    rendition.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue(), rendition.width, rendition.height
+
+
+def store_asset(data):
+    """
+    Validate image bytes and store them with their renditions.
+    Returns the asset id; identical content is stored once and its existing id returned.
+    Raises ValueError if data is not a readable image.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id FROM assets WHERE hash = %s", (digest,))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+
+        try:
+            PILImage.open(BytesIO(data)).verify()
+            image = PILImage.open(BytesIO(data))
+            image.load()
+        except Exception as e:
+            raise ValueError(f"Invalid image file: {e}")
+
+        renditions = [(name, *_render(image, size)) for name, size in RENDITION_SIZES.items()]
+        mime = PILImage.MIME.get(image.format, "application/octet-stream")
+
+        conn.start_transaction()
+        cursor.execute(
+            """INSERT INTO assets (hash, mime, width, height, byte_size, original)
+               VALUES (%s, %s, %s, %s, %s, %s)
+               ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)""",
+            (digest, mime, image.width, image.height, len(data), data)
+        )
+        asset_id = cursor.lastrowid
+        cursor.executemany(
+            """INSERT INTO asset_renditions (asset_id, name, width, height, data)
+               VALUES (%s, %s, %s, %s, %s)
+               ON DUPLICATE KEY UPDATE data = VALUES(data), width = VALUES(width), height = VALUES(height)""",
+            [(asset_id, name, width, height, png) for name, png, width, height in renditions]
+        )
+        conn.commit()
+        return asset_id
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_asset_rendition(asset_id, name="pdf"):
+    """Fetch one PNG rendition of an asset; returns bytes or None."""
+    if asset_id is None:
+        return None
+    return get_asset_renditions([asset_id], name).get(asset_id)
+
+
+def get_asset_renditions(asset_ids, name="pdf"):
+    """Fetch one rendition for many assets; returns dict of asset id -> PNG bytes."""
+    renditions = {}
+    asset_ids = [asset_id for asset_id in asset_ids if asset_id is not None]
+    if not asset_ids:
+        return renditions
+    conn = connect_to_db(read_only=True)
+    cursor = conn.cursor()
+    for chunk in chunked(asset_ids):
+        cursor.execute(
+            f"SELECT asset_id, data FROM asset_renditions WHERE name = %s AND asset_id IN ({in_placeholders(chunk)})",
+            (name, *chunk)
+        )
+        for asset_id, data in cursor.fetchall():
+            renditions[asset_id] = bytes(data)
+    conn.close()
+    return renditions
+
+
+def _backfill_table(table, id_column, blob_column, counts):
+    """Move legacy logo bytes of one table into assets, one row at a time."""
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {id_column} FROM {table} WHERE {blob_column} IS NOT NULL AND logo_asset_id IS NULL")
+    row_ids = [row[0] for row in cursor.fetchall()]
+    for row_id in row_ids:
+        cursor.execute(f"SELECT {blob_column} FROM {table} WHERE {id_column} = %s", (row_id,))
+        data = cursor.fetchone()[0]
+        if not data:
+            continue
+        try:
+            asset_id = store_asset(bytes(data))
+        except ValueError as e:
+            print(f"Skipping {table} {row_id}: {e}")
+            counts["invalid"] += 1
+            continue
+        cursor.execute(
+            f"UPDATE {table} SET logo_asset_id = %s, {blob_column} = NULL WHERE {id_column} = %s",
+            (asset_id, row_id)
+        )
+        counts["migrated"] += 1
+    conn.close()
+
+
+def backfill_logo_assets():
+    """
+    Backfill job: move customers.images and command_templates.company_logo into
+    the asset store and point rows at it. Invalid images are left in place.
+    Returns {"migrated", "invalid"}.
+    """
+    counts = {"migrated": 0, "invalid": 0}
+    _backfill_table("customers", "id", "images", counts)
+    _backfill_table("command_templates", "id", "company_logo", counts)
+    return counts
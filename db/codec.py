@@ -0,0 +1,62 @@
+"""
+Storage Codec Module
+====================
+Encodes stored command outputs as a 2-byte format tag followed by the payload
+(raw, zlib, or zstd when the optional zstandard package is installed).
+Untagged values are legacy plain text and are returned unchanged.
+"""
+
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+
+TAG_RAW = b"\x00r"
+TAG_ZLIB = b"\x00z"
+TAG_ZSTD = b"\x00s"
+
+REPORT_CODEC = os.getenv('REPORT_CODEC', 'zstd' if zstandard else 'zlib')
+REPORT_CODEC_LEVEL = int(os.getenv('REPORT_CODEC_LEVEL', 6))
+# Outputs shorter than this are stored raw; compression headers would outweigh the gain
+REPORT_CODEC_MIN_BYTES = int(os.getenv('REPORT_CODEC_MIN_BYTES', 256))
+
+
+def encode_output(text, codec=None):
+    """Encode a command output (or legacy result JSON) for storage; None stays None."""
+    if text is None:
+        return None
+    data = text.encode("utf-8") if isinstance(text, str) else bytes(text)
+    codec = codec or REPORT_CODEC
+    if len(data) < REPORT_CODEC_MIN_BYTES or codec == "none":
+        return TAG_RAW + data
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("REPORT_CODEC=zstd requires the zstandard package")
+        return TAG_ZSTD + zstandard.ZstdCompressor(level=REPORT_CODEC_LEVEL).compress(data)
+    return TAG_ZLIB + zlib.compress(data, REPORT_CODEC_LEVEL)
+
+
+def decode_output(value):
+    """Decode a stored output back to text, accepting tagged, raw bytes or legacy str values."""
+    if value is None or isinstance(value, str):
+        return value
+    data = bytes(value)
+    tag, payload = data[:2], data[2:]
+    if tag == TAG_RAW:
+        return payload.decode("utf-8", "replace")
+    if tag == TAG_ZLIB:
+        return zlib.decompress(payload).decode("utf-8", "replace")
+    if tag == TAG_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Stored output is zstd-compressed; install the zstandard package")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(payload).decode("utf-8", "replace")
+    return data.decode("utf-8", "replace")
+
+
+def is_encoded(value):
+    """True when a stored value already carries a codec tag."""
+    return isinstance(value, (bytes, bytearray)) and bytes(value[:2]) in (TAG_RAW, TAG_ZLIB, TAG_ZSTD)
@@ -1,30 +1,54 @@
 """
 Database Connection Module
 =========================
-Provides MySQL connection using credentials from environment variables.
+Provides MySQL connection using credentials from environment variables,
+routing read-only connections to read replicas when configured.
 Handles common connection errors with meaningful messages.
+Connections are wrapped for query instrumentation (see db.instrumentation).
+Also provides helpers for set-based queries over lists of ids and for
+streaming large result sets.
 """
 
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
 import os
+import time
 from dotenv import load_dotenv
+from db.instrumentation import instrument
 
 load_dotenv()
 
+# Read replicas, as "host" or "host:port", comma-separated; same credentials as the primary
+REPLICA_HOSTS = [h.strip() for h in os.getenv('DB_REPLICA_HOSTS', '').split(',') if h.strip()]
 
-def connect_to_db():
-    """
-    Create a MySQL connection using DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT.
-    Raises Exception with descriptive message on failure.
-    """
+# Replicas further behind than this (seconds) are skipped
+REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', 5))
+
+# How long a replica that was down or lagging is left alone before it is tried again
+REPLICA_RETRY_SECONDS = float(os.getenv('DB_REPLICA_RETRY_SECONDS', 30))
+
+# Reads within this many seconds of a primary connection go to the primary,
+# so a page sees the writes it just made (process-wide, so deliberately conservative)
+READ_YOUR_WRITES_SECONDS = float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', REPLICA_MAX_LAG))
+
+# "mysql" (default) or "sqlite" (see db.sqlite_backend)
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
+
+_replica_skip_until = {}
+_replica_lag_unchecked = set()
+_next_replica = 0
+_last_primary_connect = 0.0
+
+
+def _connect(host, port):
+    """Open one autocommit connection to host:port, mapping common errors to readable messages."""
     try:
         connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
+            host=host,
             database=os.getenv('DB_NAME', 'internship'),
             user=os.getenv('DB_USER', 'root'),
             password=os.getenv('DB_PASSWORD'),
-            port=int(os.getenv('DB_PORT', 3306)),
+            port=port,
             connection_timeout=3,
             autocommit=True
         )
@@ -43,6 +67,142 @@ def connect_to_db():
         else:
             raise Exception(f"Database error: {e}")
 
+
+def _replica_lag(conn, host_spec=None):
+    """
+    Seconds the replica is behind its source; 0 if it is not replicating, None if replication is broken.
+    Without the REPLICATION CLIENT privilege the lag cannot be read; the replica
+    is then used unchecked and this is logged once per host.
+    """
+    cursor = conn.cursor(dictionary=True)
+    try:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except Error as e:
+            if e.errno == errorcode.ER_SPECIFIC_ACCESS_DENIED_ERROR:
+                raise
+            # MySQL < 8.0.22
+            cursor.execute("SHOW SLAVE STATUS")
+        row = cursor.fetchone()
+    except Error as e:
+        if e.errno != errorcode.ER_SPECIFIC_ACCESS_DENIED_ERROR:
+            raise
+        if host_spec not in _replica_lag_unchecked:
+            _replica_lag_unchecked.add(host_spec)
+            print(f"Replica {host_spec}: cannot check replication lag (grant REPLICATION CLIENT to the app user); using it unchecked")
+        return 0
+    finally:
+        cursor.close()
+    if not row:
+        return 0
+    lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+
+def _connect_replica():
+    """
+    Connect to the next healthy replica (round robin). Replicas that are down or
+    lag more than REPLICA_MAX_LAG are skipped for REPLICA_RETRY_SECONDS.
+    Returns None when no replica is usable.
+    """
+    global _next_replica
+    now = time.monotonic()
+    for i in range(len(REPLICA_HOSTS)):
+        host_spec = REPLICA_HOSTS[(_next_replica + i) % len(REPLICA_HOSTS)]
+        if _replica_skip_until.get(host_spec, 0) > now:
+            continue
+        host, _, port = host_spec.partition(":")
+        try:
+            conn = _connect(host, int(port or os.getenv('DB_PORT', 3306)))
+            lag = _replica_lag(conn, host_spec)
+        except Exception as e:
+            print(f"Replica {host_spec} unavailable, using another target: {e}")
+            _replica_skip_until[host_spec] = now + REPLICA_RETRY_SECONDS
+            continue
+        if lag is None or lag > REPLICA_MAX_LAG:
+            print(f"Replica {host_spec} lagging ({lag if lag is not None else 'stopped'}), using another target")
+            conn.close()
+            _replica_skip_until[host_spec] = now + REPLICA_RETRY_SECONDS
+            continue
+        _next_replica = (_next_replica + i + 1) % len(REPLICA_HOSTS)
+        return conn
+    return None
+
+
+def connect_to_db(read_only=False):
+    """
+    Create a MySQL connection using DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT.
+    With read_only=True the connection goes to a read replica (DB_REPLICA_HOSTS)
+    when one is healthy and no primary connection was opened recently;
+    otherwise, and for all writes, it goes to the primary.
+    With DB_BACKEND=sqlite every connection opens the local SQLite database.
+    Raises Exception with descriptive message on failure.
+    """
+    global _last_primary_connect
+    if DB_BACKEND == "sqlite":
+        from db.sqlite_backend import connect_sqlite
+        return instrument(connect_sqlite())
+    if read_only and REPLICA_HOSTS and time.monotonic() - _last_primary_connect >= READ_YOUR_WRITES_SECONDS:
+        conn = _connect_replica()
+        if conn is not None:
+            return instrument(conn)
+    if not read_only:
+        _last_primary_connect = time.monotonic()
+    return instrument(_connect(os.getenv('DB_HOST', 'localhost'), int(os.getenv('DB_PORT', 3306))))
+
+
+# Maximum number of ids bound into a single IN (...) clause
+IN_CHUNK_SIZE = int(os.getenv('DB_IN_CHUNK_SIZE', 1000))
+
+
+def chunked(ids, size=IN_CHUNK_SIZE):
+    """
+    Yield lists of at most `size` unique ids, preserving first-seen order.
+    Keeps IN (...) clauses bounded for very large id lists.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    for i in range(0, len(unique_ids), size):
+        yield unique_ids[i:i + size]
+
+
+def in_placeholders(values):
+    """Return the '%s, %s, ...' placeholder list for an IN (...) clause."""
+    return ", ".join(["%s"] * len(values))
+
+
+def get_max_allowed_packet(cursor):
+    """Return the server's max_allowed_packet in bytes (falls back to the 4 MB MySQL default)."""
+    cursor.execute("SHOW VARIABLES LIKE 'max_allowed_packet'")
+    row = cursor.fetchone()
+    if not row:
+        return 4 * 1024 * 1024
+    value = row["Value"] if isinstance(row, dict) else row[1]
+    return int(value)
+
+# Rows pulled per round trip by iter_query
+QUERY_FETCH_SIZE = int(os.getenv('DB_FETCH_SIZE', 500))
+
+
+def iter_query(query, params=(), dictionary=True, fetch_size=QUERY_FETCH_SIZE, read_only=False):
+    """
+    Yield the rows of a query from an unbuffered cursor, fetch_size at a time.
+    Rows stream from the server as they are consumed, so memory stays flat
+    regardless of result size. Runs on its own connection (an unbuffered result
+    blocks other queries on it), closed when the generator finishes or is closed.
+    read_only=True lets it run on a read replica.
+    """
+    conn = connect_to_db(read_only=read_only)
+    try:
+        cursor = conn.cursor(dictionary=dictionary, buffered=False)
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
 # ✅ CRITICAL: No code here that calls connect_to_db()!
 # ✅ Everything must be inside functions or inside if __name__ == "__main__"
 
@@ -2,57 +2,104 @@
 Customer Database Module
 ======================
 CRUD operations for the customers table.
-Supports jump host configuration and optional logo image storage.
+Supports jump host configuration and an optional logo kept in the asset store.
 """
 
 import mysql.connector
-from db.connect_to_db import connect_to_db
+import os
+from db.connect_to_db import connect_to_db, chunked, in_placeholders
+from db.reports import release_output_blobs, get_report_ids
+from pdf_cache import invalidate_reports
+from db.assets import store_asset
+
+# Every column except the legacy images blob; logos are read through db.assets
+CUSTOMER_COLUMNS = (
+    "id, name, email, jump_host, jump_host_ip, jump_host_username, jump_host_password, "
+    "jump_host_hostname, device_type, jump_port, logo_asset_id, created_at"
+)
 
 
 def get_customers():
     """Fetch all customers; returns list of tuples."""
-    conn = connect_to_db()
+    conn = connect_to_db(read_only=True)
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM customers")
+    cursor.execute(f"SELECT {CUSTOMER_COLUMNS} FROM customers")
     customers = cursor.fetchall()
     return customers
 
 def get_customer_by_id(id):
     """Fetch a single customer by ID; returns dict or None."""
-    conn = connect_to_db()
+    conn = connect_to_db(read_only=True)
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM customers WHERE id = %s", (id,))
+    cursor.execute(f"SELECT {CUSTOMER_COLUMNS} FROM customers WHERE id = %s", (id,))
     customer = cursor.fetchone()
     return customer
 
+def get_customers_by_ids(ids):
+    """Fetch many customers in chunked IN (...) queries; returns dict of id -> customer dict."""
+    customers = {}
+    if not ids:
+        return customers
+    conn = connect_to_db(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    for chunk in chunked(ids):
+        cursor.execute(f"SELECT {CUSTOMER_COLUMNS} FROM customers WHERE id IN ({in_placeholders(chunk)})", tuple(chunk))
+        for customer in cursor.fetchall():
+            customers[customer["id"]] = customer
+    conn.close()
+    return customers
+
+def get_dependency_counts(customer_ids):
+    """
+    Count templates, devices and reports per customer with one grouped query per table.
+    Returns dict of customer_id -> {"templates": n, "devices": n, "reports": n};
+    every requested id is present, with zero counts when it has no dependents.
+    """
+    counts = {cust_id: {"templates": 0, "devices": 0, "reports": 0} for cust_id in customer_ids}
+    if not counts:
+        return counts
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    for key, table in (("templates", "command_templates"), ("devices", "devices"), ("reports", "reports")):
+        for chunk in chunked(customer_ids):
+            cursor.execute(
+                f"SELECT customer_id, COUNT(*) FROM {table} WHERE customer_id IN ({in_placeholders(chunk)}) GROUP BY customer_id",
+                tuple(chunk)
+            )
+            for cust_id, count in cursor.fetchall():
+                counts[cust_id][key] = count
+    conn.close()
+    return counts
+
 def create_customer(name, email, jump_host, jump_host_ip=None, jump_host_username=None, jump_host_password=None, jump_host_hostname=None, image=None, device_type=None, jump_port=None):
     """Insert a new customer; returns the new row id."""
+    # Validate and store the logo in the asset store if provided
+    logo_asset_id = None
+    if image is not None:
+        logo_asset_id = store_asset(image.read())
+
     conn = connect_to_db()
     cursor = conn.cursor()
-    
-    # Convert image to binary if provided
-    image_data = None
-    if image is not None:
-        image_data = image.read()
-    
     cursor.execute(
-        "INSERT INTO customers (name, email, jump_host, jump_host_ip, jump_host_username, jump_host_password, jump_host_hostname, images, device_type, jump_port) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
-        (name, email, jump_host, jump_host_ip, jump_host_username, jump_host_password, jump_host_hostname, image_data, device_type, jump_port)
+        "INSERT INTO customers (name, email, jump_host, jump_host_ip, jump_host_username, jump_host_password, jump_host_hostname, logo_asset_id, device_type, jump_port) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+        (name, email, jump_host, jump_host_ip, jump_host_username, jump_host_password, jump_host_hostname, logo_asset_id, device_type, jump_port)
     )
     conn.commit()
     return cursor.lastrowid
 
 def update_customer(id, name, email, jump_host, jump_host_ip, jump_host_username, jump_host_password, jump_host_hostname, image=None, device_type=None, jump_port=None):
     """Update customer; image is only updated if a new file is provided."""
+    # Store the new logo before touching the row so an invalid image changes nothing
+    logo_asset_id = store_asset(image.read()) if image is not None else None
+
     conn = connect_to_db()
     cursor = conn.cursor()
     
     # Only update image if a new one is provided
-    if image is not None:
-        image_data = image.read()
+    if logo_asset_id is not None:
         cursor.execute(
-            "UPDATE customers SET name = %s, email = %s, jump_host = %s, jump_host_ip = %s, jump_host_username = %s, jump_host_password = %s, jump_host_hostname = %s, images = %s, device_type = %s, jump_port = %s WHERE id = %s",
-            (name, email, jump_host, jump_host_ip, jump_host_username, jump_host_password, jump_host_hostname, image_data, device_type, jump_port, id)
+            "UPDATE customers SET name = %s, email = %s, jump_host = %s, jump_host_ip = %s, jump_host_username = %s, jump_host_password = %s, jump_host_hostname = %s, logo_asset_id = %s, device_type = %s, jump_port = %s WHERE id = %s",
+            (name, email, jump_host, jump_host_ip, jump_host_username, jump_host_password, jump_host_hostname, logo_asset_id, device_type, jump_port, id)
         )
     else:
         # Don't update image column if no new image provided
@@ -64,20 +111,78 @@ def update_customer(id, name, email, jump_host, jump_host_ip, jump_host_username
     conn.commit()
     return cursor.rowcount
 
-def delete_customer(id):
-    """Permanently delete a customer by ID along with all associated records."""
+def set_retention_policy(id, archive_after_days=None, retention_days=None, clear=()):
+    """
+    Set a customer's report retention: days in the hot tables before the archival
+    job moves reports to archive files, and days before the purge job deletes
+    them. Only values that are passed change; columns named in clear
+    ("archive_after_days", "retention_days") are reset to NULL, falling back to
+    REPORT_ARCHIVE_AFTER_DAYS / REPORT_RETENTION_DAYS. Returns rows updated.
+    """
+    values = {"archive_after_days": archive_after_days, "retention_days": retention_days}
+    unknown = set(clear) - set(values)
+    if unknown:
+        raise ValueError(f"Unknown retention setting(s): {', '.join(sorted(unknown))}")
+    updates = {column: None if column in clear else value for column, value in values.items()
+               if column in clear or value is not None}
+    if not updates:
+        return 0
+
     conn = connect_to_db()
     cursor = conn.cursor()
-    
-    # Delete associated records first
-    cursor.execute("DELETE FROM command_templates WHERE customer_id = %s", (id,))
-    cursor.execute("DELETE FROM devices WHERE customer_id = %s", (id,))
-    cursor.execute("DELETE FROM reports WHERE customer_id = %s", (id,))
-    
-    # Now delete the customer
-    cursor.execute("DELETE FROM customers WHERE id = %s", (id,))
-    
+    assignments = ", ".join(f"{column} = %s" for column in updates)
+    cursor.execute(f"UPDATE customers SET {assignments} WHERE id = %s", (*updates.values(), id))
     conn.commit()
+    conn.close()
     return cursor.rowcount
 
+# Rows removed per DELETE ... LIMIT statement when clearing a customer's reports
+CASCADE_DELETE_BATCH = int(os.getenv('CASCADE_DELETE_BATCH', 5000))
+
+def delete_customer(id):
+    """Permanently delete a customer by ID along with all associated records."""
+    return delete_customers([id])["customers"]
 
+def delete_customers(ids):
+    """
+    Permanently delete many customers with their reports, templates and devices
+    in one transaction, using set-based statements over chunked id lists.
+    Reports go first in DELETE ... LIMIT batches so huge tenants never run one
+    unbounded statement; their results and section rows cascade, and their
+    cached PDFs are removed after the commit.
+    Returns rows deleted per table: {"reports", "templates", "devices", "customers"}.
+    """
+    counts = {"reports": 0, "templates": 0, "devices": 0, "customers": 0}
+    if not ids:
+        return counts
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        report_ids = get_report_ids(cursor, "customer_id", ids)
+        release_output_blobs(cursor, "customer_id", ids)
+        for chunk in chunked(ids):
+            placeholders = in_placeholders(chunk)
+            while True:
+                cursor.execute(
+                    f"DELETE FROM reports WHERE customer_id IN ({placeholders}) LIMIT {CASCADE_DELETE_BATCH}",
+                    tuple(chunk)
+                )
+                counts["reports"] += cursor.rowcount
+                if cursor.rowcount < CASCADE_DELETE_BATCH:
+                    break
+            for key, table, column in (
+                ("templates", "command_templates", "customer_id"),
+                ("devices", "devices", "customer_id"),
+                ("customers", "customers", "id"),
+            ):
+                cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", tuple(chunk))
+                counts[key] += cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    invalidate_reports(report_ids)
+    return counts
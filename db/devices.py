@@ -7,12 +7,14 @@ Each device belongs to a customer and stores connection credentials.
 
 import mysql.connector
 from db.customer import get_customer_by_id
-from db.connect_to_db import connect_to_db
+from db.connect_to_db import connect_to_db, chunked, in_placeholders
+from db.reports import release_output_blobs, get_report_ids
+from pdf_cache import invalidate_reports
 
 
 def get_devices():
     """Fetch all devices; returns list of tuples."""
-    conn = connect_to_db()
+    conn = connect_to_db(read_only=True)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM devices")
     devices = cursor.fetchall()
@@ -20,12 +22,26 @@ def get_devices():
 
 def get_device_by_id(id):
     """Fetch a single device by ID; returns dict or None."""
-    conn = connect_to_db()
+    conn = connect_to_db(read_only=True)
     cursor = conn.cursor(dictionary=True)
     cursor.execute("SELECT * FROM devices WHERE id = %s", (id,))
     devices = cursor.fetchone()
     return devices
 
+def get_devices_by_ids(ids):
+    """Fetch many devices in chunked IN (...) queries; returns dict of id -> device dict."""
+    devices = {}
+    if not ids:
+        return devices
+    conn = connect_to_db(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    for chunk in chunked(ids):
+        cursor.execute(f"SELECT * FROM devices WHERE id IN ({in_placeholders(chunk)})", tuple(chunk))
+        for device in cursor.fetchall():
+            devices[device["id"]] = device
+    conn.close()
+    return devices
+
 def create_device(customer_id, serial_number, hostname, device_type, device_model, device_ip, device_port, username, password):
     """Insert a new device; validates customer exists. Returns new row id."""
     conn = connect_to_db()
@@ -54,16 +70,35 @@ def update_device(id, customer_id, serial_number, hostname, device_type, device_
     return cursor.rowcount
 
 def delete_device(id):
-    """Permanently delete a device by ID."""
+    """Permanently delete a device by ID; its reports cascade, releasing their output blobs and cached PDFs."""
+    return delete_devices([id])
+
+def delete_devices(ids):
+    """Permanently delete many devices in chunked IN (...) statements; returns rows deleted."""
+    if not ids:
+        return 0
     conn = connect_to_db()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM devices WHERE id = %s", (id,))
-    conn.commit()
-    return cursor.rowcount
+    deleted = 0
+    try:
+        conn.start_transaction()
+        report_ids = get_report_ids(cursor, "device_id", ids)
+        release_output_blobs(cursor, "device_id", ids)
+        for chunk in chunked(ids):
+            cursor.execute(f"DELETE FROM devices WHERE id IN ({in_placeholders(chunk)})", tuple(chunk))
+            deleted += cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    invalidate_reports(report_ids)
+    return deleted
 
 def get_devices_by_customer_id(customer_id):
     """Fetch all devices for a specific customer."""
-    conn = connect_to_db()
+    conn = connect_to_db(read_only=True)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM devices WHERE customer_id = %s", (customer_id,))
     devices = cursor.fetchall()
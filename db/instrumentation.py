@@ -0,0 +1,207 @@
+"""
+Query Instrumentation
+=====================
+Thin wrapper around DB-API connections that records every statement:
+fingerprint, duration, rows, bytes fetched and the calling function.
+
+- query_scope() collects the queries of one unit of work (a page render, a PDF)
+  so per-request counts and repeated fingerprints (N+1 patterns) are visible.
+- QUERY_STATS aggregates per fingerprint for the life of the process.
+- Statements slower than DB_SLOW_QUERY_MS are written to the "db.slow_queries" logger.
+
+Enabled unless DB_INSTRUMENT=0.
+"""
+
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+INSTRUMENT = os.getenv('DB_INSTRUMENT', '1') != '0'
+
+# Statements at or above this many milliseconds (execute + fetches) go to the slow-query log
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', 500))
+
+slow_log = logging.getLogger("db.slow_queries")
+
+# fingerprint -> {"count", "total_ms", "max_ms", "rows", "bytes"}
+QUERY_STATS = {}
+
+_scope = ContextVar("query_scope", default=None)
+
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACE = re.compile(r"\s+")
+
+# Frames in these files are skipped when looking for the caller
+_INTERNAL_FILES = ("instrumentation.py", "connect_to_db.py", "sqlite_backend.py")
+
+
+def fingerprint(sql):
+    """Normalize a statement so calls differing only in values (or IN-list length) group together."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _caller():
+    """Return "module.function:line" of the first frame outside the db plumbing."""
+    frame = sys._getframe(1)
+    while frame and frame.f_code.co_filename.endswith(_INTERNAL_FILES):
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+def _row_bytes(row):
+    """Approximate payload size of one fetched row."""
+    values = row.values() if isinstance(row, dict) else (row or ())
+    return sum(len(v) if isinstance(v, (bytes, bytearray, str)) else 8 for v in values if v is not None)
+
+
+class QueryLog:
+    """The queries recorded inside one query_scope()."""
+
+    def __init__(self, name=None):
+        self.name = name
+        self.queries = []
+
+    def __len__(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self):
+        return sum(q["ms"] for q in self.queries)
+
+    def by_fingerprint(self):
+        """Group queries by fingerprint, most frequent first: [(fingerprint, count, total_ms, callers)]."""
+        groups = {}
+        for q in self.queries:
+            group = groups.setdefault(q["fingerprint"], [0, 0.0, set()])
+            group[0] += 1
+            group[1] += q["ms"]
+            group[2].add(q["caller"])
+        return sorted(
+            ((fp, count, total, sorted(callers)) for fp, (count, total, callers) in groups.items()),
+            key=lambda g: (-g[1], -g[2])
+        )
+
+
+@contextmanager
+def query_scope(name=None):
+    """Record every query issued inside the block; yields the QueryLog."""
+    log = QueryLog(name)
+    token = _scope.set(log)
+    try:
+        yield log
+    finally:
+        _scope.reset(token)
+
+
+def current_query_log():
+    """The QueryLog of the innermost active query_scope(), or None."""
+    return _scope.get()
+
+
+def _start(sql, caller):
+    record = {"fingerprint": fingerprint(sql), "caller": caller, "ms": 0.0, "rows": 0, "bytes": 0, "logged": False}
+    log = _scope.get()
+    if log is not None:
+        log.queries.append(record)
+    stats = QUERY_STATS.setdefault(record["fingerprint"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "bytes": 0})
+    stats["count"] += 1
+    return record, stats
+
+
+def _account(record, stats, ms, rows=0, size=0):
+    record["ms"] += ms
+    record["rows"] += rows
+    record["bytes"] += size
+    stats["total_ms"] += ms
+    stats["max_ms"] = max(stats["max_ms"], record["ms"])
+    stats["rows"] += rows
+    stats["bytes"] += size
+    if record["ms"] >= SLOW_QUERY_MS and not record["logged"]:
+        record["logged"] = True
+        slow_log.warning(
+            "slow query %.0f ms rows=%d bytes=%d caller=%s: %s",
+            record["ms"], record["rows"], record["bytes"], record["caller"], record["fingerprint"]
+        )
+
+
+class InstrumentedCursor:
+    """Cursor proxy timing execute/executemany and the fetches that follow them."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._record = None
+        self._stats = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        self._record, self._stats = _start(sql, _caller())
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params, *args, **kwargs)
+        finally:
+            rowcount = self._cursor.rowcount if self._cursor.rowcount and self._cursor.rowcount > 0 else 0
+            # Reads report their rows as they are fetched
+            rows = 0 if self._cursor.description else rowcount
+            _account(self._record, self._stats, (time.perf_counter() - started) * 1000, rows)
+
+    def executemany(self, sql, seq_of_params, *args, **kwargs):
+        self._record, self._stats = _start(sql, _caller())
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_of_params, *args, **kwargs)
+        finally:
+            rows = self._cursor.rowcount if self._cursor.rowcount and self._cursor.rowcount > 0 else 0
+            _account(self._record, self._stats, (time.perf_counter() - started) * 1000, rows)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        result = getattr(self._cursor, method)(*args)
+        if self._record is not None:
+            rows = [] if result is None else ([result] if method == "fetchone" else result)
+            _account(self._record, self._stats, (time.perf_counter() - started) * 1000,
+                     len(rows), sum(_row_bytes(row) for row in rows))
+        return result
+
+    def fetchone(self):
+        return self._fetch("fetchone")
+
+    def fetchmany(self, size=1):
+        return self._fetch("fetchmany", size)
+
+    def fetchall(self):
+        return self._fetch("fetchall")
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are instrumented; everything else passes through."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+
+
+def instrument(conn):
+    """Wrap a connection when instrumentation is enabled."""
+    return InstrumentedConnection(conn) if INSTRUMENT else conn
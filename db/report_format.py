@@ -0,0 +1,149 @@
+"""
+Report Container Format
+=======================
+Compact binary container for a whole report run, readable section by section.
+
+Layout (all integers little-endian):
+
+    header   b"JRPT" | version u8 | flags u8 | reserved u16
+    body     one codec-tagged payload per section (see db.codec), back to back
+    index    JSON list, one entry per section: metadata + offset/length in body
+    footer   index offset u64 | index length u32 | b"JRPT"
+
+The index sits at the end so sections can be written as they are produced;
+readers load only the footer and index, then fetch individual outputs on demand.
+"""
+
+import json
+import struct
+from io import BytesIO
+from db.codec import encode_output, decode_output
+
+MAGIC = b"JRPT"
+VERSION = 1
+HEADER = struct.Struct("<4sBBH")
+FOOTER = struct.Struct("<QI4s")
+
+# Section fields kept in the index; everything except the output itself
+INDEX_FIELDS = ("type", "text", "command", "description", "status", "duration_ms")
+
+
+def is_container(data):
+    """True when bytes (or a memoryview) start with the container magic."""
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:4]) == MAGIC
+
+
+def write_report(sections, fileobj):
+    """
+    Stream result dicts into fileobj as a container, encoding one output at a time.
+    Returns the number of bytes written.
+    """
+    fileobj.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+    position = HEADER.size
+    index = []
+    for section in sections:
+        entry = {key: section[key] for key in INDEX_FIELDS if section.get(key) is not None}
+        output = section.get("output")
+        if output is not None:
+            payload = encode_output(output)
+            fileobj.write(payload)
+            entry.update(
+                offset=position - HEADER.size,
+                length=len(payload),
+                raw_bytes=len(output.encode("utf-8")),
+                lines=output.count("\n") + 1 if output else 0,
+            )
+            position += len(payload)
+        index.append(entry)
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    fileobj.write(index_bytes)
+    fileobj.write(FOOTER.pack(position, len(index_bytes), MAGIC))
+    return position + len(index_bytes) + FOOTER.size
+
+
+def pack_report(sections):
+    """Serialize result dicts into container bytes."""
+    buffer = BytesIO()
+    write_report(sections, buffer)
+    return buffer.getvalue()
+
+
+class ReportContainer:
+    """
+    Lazy reader over container bytes or a seekable binary file.
+    Only the footer and index are read up front; outputs are decoded per section.
+    """
+
+    def __init__(self, source, base_offset=0, size=None):
+        """
+        source: bytes-like object or seekable file opened in binary mode.
+        base_offset/size select a container embedded in a larger file (e.g. an archive).
+        """
+        self._source = memoryview(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+        self._base = base_offset
+        if size is None:
+            if isinstance(self._source, memoryview):
+                size = len(self._source) - base_offset
+            else:
+                self._source.seek(0, 2)
+                size = self._source.tell() - base_offset
+
+        magic, version, _, _ = HEADER.unpack(self._read(0, HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Not a report container")
+        if version > VERSION:
+            raise ValueError(f"Unsupported report container version {version}")
+
+        index_offset, index_length, magic = FOOTER.unpack(self._read(size - FOOTER.size, FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError("Truncated report container")
+        self.index = json.loads(self._read(index_offset, index_length))
+
+    def _read(self, offset, length):
+        """Read length bytes at offset from the start of the container."""
+        if isinstance(self._source, memoryview):
+            start = self._base + offset
+            return bytes(self._source[start:start + length])
+        self._source.seek(self._base + offset)
+        return self._source.read(length)
+
+    def __len__(self):
+        return len(self.index)
+
+    def output(self, i):
+        """Decode and return the output text of section i (None for headers)."""
+        entry = self.index[i]
+        if "offset" not in entry:
+            return None
+        return decode_output(self._read(HEADER.size + entry["offset"], entry["length"]))
+
+    def section(self, i, include_output=True):
+        """Return section i as a result dict (the shape stored by create_report)."""
+        section = {key: self.index[i][key] for key in INDEX_FIELDS if key in self.index[i]}
+        if include_output and section.get("type") != "Header":
+            section["output"] = self.output(i) or ""
+        return section
+
+    def sections(self, include_output=True):
+        """Yield every section in order, decoding outputs one at a time."""
+        for i in range(len(self.index)):
+            yield self.section(i, include_output)
+
+
+def read_report(raw):
+    """
+    Yield result dicts from a stored report value: a container, or the legacy
+    JSON list (plain or codec-tagged). Unreadable values yield nothing.
+    """
+    if is_container(raw):
+        yield from ReportContainer(raw).sections()
+        return
+    raw = decode_output(raw)
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+    if isinstance(raw, list):
+        yield from (entry for entry in raw if isinstance(entry, dict))
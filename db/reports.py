@@ -2,57 +2,934 @@
 Report Database Module
 ======================
 CRUD operations for reports.
-Reports store JSON result of command executions (device + template).
+Each report's command executions (device + template) are stored one row per
+header/command in report_results; older reports keep a JSON blob in reports.result.
+Command outputs are stored once per distinct content in output_blobs (keyed by
+SHA-256, reference counted) and compressed with the storage codec in db.codec.
+Reports past their customer's archive window are moved into monthly archive
+files of report containers on local disk (indexed in report_archives).
 """
 
 import mysql.connector
-from db.connect_to_db import connect_to_db
+import hashlib
+import os
+import time
+from collections import Counter
+from db.connect_to_db import connect_to_db, iter_query, chunked, in_placeholders, get_max_allowed_packet
+from db.codec import encode_output, decode_output, is_encoded
+from db.report_format import is_container, ReportContainer, read_report, write_report, pack_report
+from pdf_cache import invalidate_reports
 from datetime import datetime
 from fpdf import FPDF
-from db.devices import get_device_by_id
-from db.customer import get_customer_by_id
-from db.templates import get_template_by_id
 import json
 
 
 pdf = FPDF()
 
+# Upper bound on the serialized payload of one bulk INSERT; also capped by the
+# server's max_allowed_packet (with headroom for SQL text and escaping).
+REPORT_BATCH_BYTES = int(os.getenv('REPORT_BATCH_BYTES', 16 * 1024 * 1024))
+
+
+RESULT_INSERT = """
+    INSERT INTO report_results (report_id, ordinal, type, text, command, description, status, output_hash, duration_ms)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+SECTION_INSERT = """
+    INSERT INTO report_sections (report_id, ordinal, type, text, command, status, byte_size, line_count, hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+BLOB_INSERT = """
+    INSERT INTO output_blobs (hash, body, raw_bytes, stored_bytes, ref_count)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE ref_count = ref_count + VALUES(ref_count)
+"""
+
+# Rows pulled per round trip when iterating sections; outputs can be large
+SECTION_FETCH_SIZE = int(os.getenv('SECTION_FETCH_SIZE', 16))
+
+# Archive files live here, one per report month; report_archives stores paths relative to it
+REPORT_ARCHIVE_DIR = os.getenv('REPORT_ARCHIVE_DIR', 'archives')
+
+# Days before reports are archived when the customer has no archive_after_days (unset: never)
+REPORT_ARCHIVE_AFTER_DAYS = os.getenv('REPORT_ARCHIVE_AFTER_DAYS')
+
+# Days before reports are deleted when the customer has no retention_days (unset: never)
+REPORT_RETENTION_DAYS = os.getenv('REPORT_RETENTION_DAYS')
+
+def _result_params(report_id, ordinal, entry, duration_ms=None, output_hash=None):
+    """Map one result entry (Header or Command dict) onto a report_results row."""
+    return (
+        report_id,
+        ordinal,
+        entry.get("type") or "Command",
+        entry.get("text"),
+        entry.get("command"),
+        entry.get("description"),
+        entry.get("status"),
+        output_hash,
+        entry.get("duration_ms", duration_ms),
+    )
+
+def _section_params(report_id, ordinal, entry, output_hash=None):
+    """Map one result entry onto a report_sections index row (sizes of the output, not the output)."""
+    output = entry.get("output")
+    return (
+        report_id,
+        ordinal,
+        entry.get("type") or "Command",
+        entry.get("text"),
+        entry.get("command"),
+        entry.get("status"),
+        len(output.encode("utf-8")) if output else 0,
+        output.count("\n") + 1 if output else 0,
+        output_hash,
+    )
+
+def _entry_bytes(entry):
+    """Approximate wire size of one result entry."""
+    return sum(len(v.encode("utf-8")) for v in entry.values() if isinstance(v, str))
+
+def _report_batches(rows, budget):
+    """Group (params, payload_bytes) rows into batches whose payload stays under budget."""
+    batch, batch_bytes = [], 0
+    for params, size in rows:
+        if batch and batch_bytes + size > budget:
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(params)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+def _store_output_blobs(cursor, outputs, budget):
+    """
+    Store outputs content-addressed in output_blobs, adding one reference per occurrence.
+    Only outputs not already stored are encoded and sent. Returns the SHA-256 hex
+    digest of each output, in order (None for None).
+    """
+    raw_outputs = [o.encode("utf-8") if isinstance(o, str) else None for o in outputs]
+    hashes = [hashlib.sha256(raw).hexdigest() if raw is not None else None for raw in raw_outputs]
+    refs = Counter(h for h in hashes if h)
+    if not refs:
+        return hashes
+
+    existing = set()
+    for chunk in chunked(list(refs)):
+        cursor.execute(f"SELECT hash FROM output_blobs WHERE hash IN ({in_placeholders(chunk)})", tuple(chunk))
+        existing.update(row[0] for row in cursor.fetchall())
+    # A blob released and deleted since the SELECT updates no row; it is stored
+    # again below. A row that was updated stays locked until the caller commits.
+    for h in list(existing):
+        cursor.execute("UPDATE output_blobs SET ref_count = ref_count + %s WHERE hash = %s", (refs[h], h))
+        if cursor.rowcount == 0:
+            existing.discard(h)
+
+    new_rows = {}
+    for h, raw in zip(hashes, raw_outputs):
+        if h and h not in existing and h not in new_rows:
+            body = encode_output(raw)
+            new_rows[h] = ((h, body, len(raw), len(body), refs[h]), len(body))
+    for batch in _report_batches(new_rows.values(), budget):
+        cursor.executemany(BLOB_INSERT, batch)
+
+    return hashes
+
+def get_report_ids(cursor, column, ids):
+    """Ids of reports whose `column` (device_id, customer_id or template_id) is in ids."""
+    report_ids = []
+    for chunk in chunked(ids):
+        cursor.execute(f"SELECT id FROM reports WHERE {column} IN ({in_placeholders(chunk)})", tuple(chunk))
+        report_ids.extend(row[0] for row in cursor.fetchall())
+    return report_ids
+
+def release_output_blobs(cursor, column, ids):
+    """
+    Drop the blob references held by reports whose `column` (id, device_id,
+    customer_id or template_id) is in ids, deleting blobs nobody references.
+    Call inside the transaction that deletes those reports.
+    """
+    released = Counter()
+    for chunk in chunked(ids):
+        cursor.execute(f"""
+            SELECT rr.output_hash, COUNT(*)
+            FROM report_results rr
+            JOIN reports r ON r.id = rr.report_id
+            WHERE r.{column} IN ({in_placeholders(chunk)}) AND rr.output_hash IS NOT NULL
+            GROUP BY rr.output_hash
+        """, tuple(chunk))
+        for output_hash, count in cursor.fetchall():
+            released[output_hash] += count
+    if not released:
+        return 0
+
+    cursor.executemany(
+        "UPDATE output_blobs SET ref_count = ref_count - %s WHERE hash = %s",
+        [(count, h) for h, count in released.items()]
+    )
+    freed = 0
+    for chunk in chunked(list(released)):
+        cursor.execute(f"DELETE FROM output_blobs WHERE ref_count <= 0 AND hash IN ({in_placeholders(chunk)})", tuple(chunk))
+        freed += cursor.rowcount
+    return freed
+
+def _insert_results(cursor, report_id, results, budget):
+    """
+    Write a report's result entries to report_results (outputs going through
+    output_blobs) and its report_sections index rows.
+    """
+    entries = [r for r in results if isinstance(r, dict)]
+    hashes = _store_output_blobs(cursor, [e.get("output") for e in entries], budget)
+    rows = []
+    sections = []
+    for ordinal, (entry, output_hash) in enumerate(zip(entries, hashes)):
+        metadata = {k: v for k, v in entry.items() if k != "output"}
+        rows.append((_result_params(report_id, ordinal, entry, output_hash=output_hash), _entry_bytes(metadata)))
+        sections.append((_section_params(report_id, ordinal, entry, output_hash), _entry_bytes(metadata)))
+    for batch in _report_batches(rows, budget):
+        cursor.executemany(RESULT_INSERT, batch)
+    for batch in _report_batches(sections, budget):
+        cursor.executemany(SECTION_INSERT, batch)
 
 def create_report(device_id, customer_id, template_id, results, ai_summary=None):
-    """Insert a new report; results (list of dicts) is serialized to JSON. AI summary is optional."""
+    """Insert a new report and its result entries (one report_results row each) in one transaction. Returns new row id."""
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    budget = min(REPORT_BATCH_BYTES, get_max_allowed_packet(cursor) // 2)
+
+    try:
+        conn.start_transaction()
+        cursor.execute("""
+            INSERT INTO reports (device_id, customer_id, template_id, ai_summary)
+            VALUES (%s, %s, %s, %s)
+        """, (device_id, customer_id, template_id, ai_summary))
+        report_id = cursor.lastrowid
+        _insert_results(cursor, report_id, results, budget)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return report_id
+
+def create_reports(reports):
+    """
+    Bulk-insert many reports; returns the new row ids in input order.
+
+    Each item is a dict with device_id, customer_id, template_id, results and
+    optional ai_summary. Rows are written in transactions sized by serialized
+    payload; each report row is inserted on its own to get its id, while its
+    results, sections and blobs go out with executemany.
+    A single report larger than the budget is written in a batch of its own.
+    """
+    if not reports:
+        return []
+
+    rows = []
+    for report in reports:
+        size = sum(_entry_bytes(r) for r in report["results"] if isinstance(r, dict))
+        rows.append((report, size))
+
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    # Escaping can double the payload on the wire; keep half the packet free
+    budget = min(REPORT_BATCH_BYTES, get_max_allowed_packet(cursor) // 2)
+
+    report_ids = []
+    try:
+        for batch in _report_batches(rows, budget):
+            conn.start_transaction()
+            batch_ids = []
+            for report in batch:
+                # One row per statement: ids of a multi-row INSERT are only consecutive
+                # with auto_increment_increment = 1 and no interleaved allocation
+                cursor.execute("""
+                    INSERT INTO reports (device_id, customer_id, template_id, ai_summary)
+                    VALUES (%s, %s, %s, %s)
+                """, (report["device_id"], report["customer_id"], report["template_id"], report.get("ai_summary")))
+                batch_ids.append(cursor.lastrowid)
+                _insert_results(cursor, cursor.lastrowid, report["results"], budget)
+            conn.commit()
+            report_ids.extend(batch_ids)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return report_ids
+
+def open_report(device_id, customer_id, template_id, ai_summary=None):
+    """
+    Create an empty report for streaming writes during collection, marked not
+    completed until close_report(). Returns a handle for append_report_result() /
+    close_report() / abort_report().
+    """
     conn = connect_to_db()
     cursor = conn.cursor()
-    results_json = json.dumps(results)
-    
     cursor.execute("""
-        INSERT INTO reports (device_id, customer_id, template_id, result, ai_summary)
-        VALUES (%s, %s, %s, %s, %s)
-    """, (device_id, customer_id, template_id, results_json, ai_summary))
-    
-    conn.commit()
+        INSERT INTO reports (device_id, customer_id, template_id, ai_summary, completed)
+        VALUES (%s, %s, %s, %s, FALSE)
+    """, (device_id, customer_id, template_id, ai_summary))
+    return {
+        "conn": conn,
+        "cursor": cursor,
+        "report_id": cursor.lastrowid,
+        "ordinal": 0,
+        "budget": min(REPORT_BATCH_BYTES, get_max_allowed_packet(cursor) // 2),
+    }
+
+def append_report_result(handle, entry, duration_ms=None):
+    """Insert the next result entry of a streamed report as soon as it is collected."""
+    conn, cursor = handle["conn"], handle["cursor"]
+    try:
+        conn.start_transaction()
+        output_hash = _store_output_blobs(cursor, [entry.get("output")], handle["budget"])[0]
+        cursor.execute(RESULT_INSERT, _result_params(handle["report_id"], handle["ordinal"], entry, duration_ms, output_hash))
+        cursor.execute(SECTION_INSERT, _section_params(handle["report_id"], handle["ordinal"], entry, output_hash))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    handle["ordinal"] += 1
+
+def close_report(handle):
+    """Mark a streamed report completed and release its connection; returns the report id."""
+    conn, cursor = handle["conn"], handle["cursor"]
+    try:
+        cursor.execute("UPDATE reports SET completed = TRUE WHERE id = %s", (handle["report_id"],))
+        conn.commit()
+    finally:
+        conn.close()
+    return handle["report_id"]
+
+def abort_report(handle):
+    """
+    Delete a streamed report whose collection failed, with its blob references.
+    The handle's connection is closed first (dropping any open transaction).
+    A report left behind when the process dies stays marked not completed.
+    """
+    handle["conn"].close()
+    delete_reports([handle["report_id"]])
+
+def _section_from_row(row):
+    """Rebuild a result dict (same shape as the legacy JSON entries) from a report_results row."""
+    stored = row["blob_body"] if row.get("blob_body") is not None else row["output"]
+    if row["type"] == "Header":
+        return {"type": "Header", "text": row["text"] or "", "status": row["status"]}
+    section = {
+        "type": row["type"],
+        "command": row["command"],
+        "description": row["description"] or "",
+        "output": decode_output(stored) or "",
+        "status": row["status"],
+    }
+    if row.get("duration_ms") is not None:
+        section["duration_ms"] = row["duration_ms"]
+    return section
+
+def iter_report_sections(report_id, include_output=True, read_only=True):
+    """
+    Yield a report's result entries in order, fetching SECTION_FETCH_SIZE rows at a time.
+    With include_output=False only headers/commands/status are read.
+    read_only=True allows a read replica; jobs that write back what they read pass False.
+    Reports written before report_results existed are read from reports.result,
+    either a report container (see db.report_format) or the legacy JSON.
+    """
+    if include_output:
+        output_sql = "rr.output, b.body AS blob_body FROM report_results rr LEFT JOIN output_blobs b ON b.hash = rr.output_hash"
+    else:
+        output_sql = "NULL AS output, NULL AS blob_body FROM report_results rr"
+    conn = connect_to_db(read_only=read_only)
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT rr.type, rr.text, rr.command, rr.description, rr.status, rr.duration_ms, "
+            f"{output_sql} WHERE rr.report_id = %s ORDER BY rr.ordinal",
+            (report_id,)
+        )
+        found = False
+        while True:
+            rows = cursor.fetchmany(SECTION_FETCH_SIZE)
+            if not rows:
+                break
+            found = True
+            for row in rows:
+                yield _section_from_row(row)
+        if found:
+            return
+
+        cursor.execute(
+            "SELECT r.result, a.path, a.byte_offset, a.byte_length FROM reports r "
+            "LEFT JOIN report_archives a ON a.report_id = r.id WHERE r.id = %s",
+            (report_id,)
+        )
+        row = cursor.fetchone()
+        if row and row["path"]:
+            # Archived: read the container in place from its archive file
+            with open(os.path.join(REPORT_ARCHIVE_DIR, row["path"]), "rb") as archive:
+                yield from ReportContainer(archive, row["byte_offset"], row["byte_length"]).sections(include_output)
+            return
+        raw = row["result"] if row else None
+        if is_container(raw):
+            # Containers decode only the outputs that are asked for
+            yield from ReportContainer(raw).sections(include_output)
+            return
+        for entry in read_report(raw):
+            if not include_output:
+                entry = {k: v for k, v in entry.items() if k != "output"}
+            yield entry
+    finally:
+        conn.close()
+
+def get_report_sections(report_id, include_output=True):
+    """Fetch all result entries of a report as a list of dicts."""
+    return list(iter_report_sections(report_id, include_output))
+
+def get_report_section(report_id, ordinal):
+    """Fetch a single result entry (with its output) by position; returns dict or None."""
+    conn = connect_to_db(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(
+        "SELECT rr.type, rr.text, rr.command, rr.description, rr.status, rr.duration_ms, rr.output, b.body AS blob_body "
+        "FROM report_results rr LEFT JOIN output_blobs b ON b.hash = rr.output_hash "
+        "WHERE rr.report_id = %s AND rr.ordinal = %s",
+        (report_id, ordinal)
+    )
+    row = cursor.fetchone()
+    conn.close()
+    if row:
+        return _section_from_row(row)
+    for position, section in enumerate(iter_report_sections(report_id)):
+        if position == ordinal:
+            return section
+    return None
+
+def _index_rows(report_id, sections):
+    """Build report_sections rows for result entries read back from storage."""
+    return [
+        _section_params(report_id, ordinal, section, hashlib.sha256(section["output"].encode("utf-8")).hexdigest() if section.get("output") is not None else None)
+        for ordinal, section in enumerate(sections)
+    ]
+
+def get_report_section_index(report_id):
+    """
+    Fetch a report's section index (ordinal, type, text, command, status, byte_size,
+    line_count, hash) without reading any output. Reports not yet indexed are
+    summarized from their stored sections.
+    """
+    conn = connect_to_db(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(
+        "SELECT ordinal, type, text, command, status, byte_size, line_count, hash "
+        "FROM report_sections WHERE report_id = %s ORDER BY ordinal",
+        (report_id,)
+    )
+    index = cursor.fetchall()
+    conn.close()
+    if index:
+        return index
+    keys = ("report_id", "ordinal", "type", "text", "command", "status", "byte_size", "line_count", "hash")
+    return [
+        {k: v for k, v in zip(keys, row) if k != "report_id"}
+        for row in _index_rows(report_id, iter_report_sections(report_id))
+    ]
+
+def get_section_summaries(report_ids):
+    """
+    Per-report section counts from report_sections in grouped IN (...) queries.
+    Returns dict of report_id -> {"sections", "commands", "errors", "output_bytes"};
+    reports without index rows are absent.
+    """
+    summaries = {}
+    if not report_ids:
+        return summaries
+    conn = connect_to_db(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    for chunk in chunked(report_ids):
+        cursor.execute(f"""
+            SELECT
+                report_id,
+                COUNT(*) AS sections,
+                SUM(CASE WHEN type <> 'Header' THEN 1 ELSE 0 END) AS commands,
+                SUM(CASE WHEN status = 'error' THEN 1 ELSE 0 END) AS errors,
+                SUM(byte_size) AS output_bytes
+            FROM report_sections
+            WHERE report_id IN ({in_placeholders(chunk)})
+            GROUP BY report_id
+        """, tuple(chunk))
+        for row in cursor.fetchall():
+            report_id = row.pop("report_id")
+            summaries[report_id] = {key: int(value or 0) for key, value in row.items()}
     conn.close()
+    return summaries
+
+def export_report(report_id, fileobj):
+    """Stream a report's sections into fileobj as a report container; returns bytes written."""
+    return write_report(iter_report_sections(report_id), fileobj)
+
+REPORT_COLUMNS = "id, device_id, customer_id, template_id, created_at, ai_summary, completed"
+
+def iter_reports(include_result=False):
+    """
+    Yield every report as a dict, streamed from an unbuffered cursor.
+    The legacy result blob is only read with include_result=True.
+    """
+    columns = REPORT_COLUMNS + (", result" if include_result else "")
+    yield from iter_query(f"SELECT {columns} FROM reports ORDER BY id", read_only=True)
 
 def get_reports():
     """Fetch all reports; returns list of dicts."""
-    conn = connect_to_db()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM reports")
-    reports = cursor.fetchall()
-    return reports
+    return list(iter_reports(include_result=True))
+
+def export_reports(fileobj):
+    """
+    Stream every report with its sections into a text fileobj as JSON Lines,
+    one report per line. Reports and sections are both read incrementally, so
+    memory is bounded by the largest single report, not by the table.
+    Returns the number of reports written.
+    """
+    written = 0
+    for report in iter_reports():
+        report["created_at"] = report["created_at"].isoformat() if report["created_at"] else None
+        report["sections"] = list(iter_report_sections(report["id"]))
+        fileobj.write(json.dumps(report) + "\n")
+        written += 1
+    return written
 
 def get_report_by_id(id):
     """Fetch a single report by ID; returns dict or None."""
-    conn = connect_to_db()
+    conn = connect_to_db(read_only=True)
     cursor = conn.cursor(dictionary=True)
     cursor.execute("SELECT * FROM reports WHERE id = %s", (id,))
     reports = cursor.fetchone()
     return reports
 
+def get_report_summary(report_id):
+    """Fetch a report's stored AI summary; returns {"model", "input_hash", "summary", "created_at"} or None."""
+    conn = connect_to_db(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(
+        "SELECT model, input_hash, summary, created_at FROM report_summaries WHERE report_id = %s",
+        (report_id,)
+    )
+    row = cursor.fetchone()
+    conn.close()
+    if row and isinstance(row["summary"], (str, bytes, bytearray)):
+        row["summary"] = json.loads(row["summary"])
+    return row
+
+def save_report_summary(report_id, model, input_hash, summary):
+    """Store (or replace) a report's AI summary dict with the model and input hash it came from."""
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO report_summaries (report_id, model, input_hash, summary)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE model = VALUES(model), input_hash = VALUES(input_hash), summary = VALUES(summary)
+    """, (report_id, model, input_hash, json.dumps(summary)))
+    conn.close()
+
+def get_reports_missing_summary(limit=1000):
+    """Ids of completed reports that asked for an AI summary but have none stored, oldest first."""
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT r.id FROM reports r
+        LEFT JOIN report_summaries s ON s.report_id = r.id
+        WHERE r.ai_summary = 1 AND r.completed = 1 AND s.report_id IS NULL
+        ORDER BY r.id
+        LIMIT %s
+    """, (limit,))
+    report_ids = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return report_ids
+
+def get_reports_by_ids(ids):
+    """Fetch many reports in chunked IN (...) queries; returns dict of id -> report dict."""
+    reports = {}
+    if not ids:
+        return reports
+    conn = connect_to_db(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    for chunk in chunked(ids):
+        cursor.execute(f"SELECT * FROM reports WHERE id IN ({in_placeholders(chunk)})", tuple(chunk))
+        for report in cursor.fetchall():
+            reports[report["id"]] = report
+    conn.close()
+    return reports
+
 def delete_report(id):
-    """Permanently delete a report by ID."""
+    """Permanently delete a report by ID, releasing its output blobs."""
+    return delete_reports([id])
+
+def delete_reports(ids):
+    """
+    Permanently delete many reports (and their blob references) in one transaction,
+    then their cached PDFs; returns rows deleted.
+    """
+    if not ids:
+        return 0
     conn = connect_to_db()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM reports WHERE id = %s", (id,))
+    deleted = 0
+    try:
+        conn.start_transaction()
+        release_output_blobs(cursor, "id", ids)
+        for chunk in chunked(ids):
+            cursor.execute(f"DELETE FROM reports WHERE id IN ({in_placeholders(chunk)})", tuple(chunk))
+            deleted += cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    invalidate_reports(ids)
+    return deleted
+
+def _compress_column(table, column, batch_size, sleep_seconds, stats):
+    """Re-encode untagged values of table.column in primary-key ranges of batch_size."""
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        max_id = cursor.fetchone()[0]
+        last_id = 0
+        while last_id < max_id:
+            cursor.execute(
+                f"SELECT id, {column} FROM {table} WHERE id > %s AND id <= %s AND {column} IS NOT NULL",
+                (last_id, last_id + batch_size)
+            )
+            updates = []
+            for row_id, value in cursor.fetchall():
+                if is_encoded(value) or is_container(value):
+                    continue
+                encoded = encode_output(decode_output(value))
+                stats["bytes_before"] += len(value.encode("utf-8") if isinstance(value, str) else value)
+                stats["bytes_after"] += len(encoded)
+                updates.append((encoded, row_id))
+            if updates:
+                conn.start_transaction()
+                cursor.executemany(f"UPDATE {table} SET {column} = %s WHERE id = %s", updates)
+                conn.commit()
+                stats["rows"] += len(updates)
+            last_id += batch_size
+            if sleep_seconds:
+                time.sleep(sleep_seconds)
+    finally:
+        conn.close()
+
+def compress_existing_results(batch_size=500, sleep_seconds=0):
+    """
+    Backfill job: compress report_results.output and legacy reports.result values
+    written before the storage codec existed. Safe to re-run; tagged rows are skipped.
+    Returns {"rows", "bytes_before", "bytes_after"}.
+    """
+    stats = {"rows": 0, "bytes_before": 0, "bytes_after": 0}
+    _compress_column("report_results", "output", batch_size, sleep_seconds, stats)
+    _compress_column("reports", "result", batch_size, sleep_seconds, stats)
+    return stats
+
+def dedupe_existing_results(batch_size=500, sleep_seconds=0):
+    """
+    Backfill job: move inline report_results.output values into output_blobs.
+    Processes id ranges of batch_size, one transaction each. Returns rows moved.
+    """
+    moved = 0
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    budget = min(REPORT_BATCH_BYTES, get_max_allowed_packet(cursor) // 2)
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM report_results")
+        max_id = cursor.fetchone()[0]
+        last_id = 0
+        while last_id < max_id:
+            conn.start_transaction()
+            cursor.execute(
+                "SELECT id, output FROM report_results WHERE id > %s AND id <= %s "
+                "AND output IS NOT NULL AND output_hash IS NULL FOR UPDATE",
+                (last_id, last_id + batch_size)
+            )
+            rows = cursor.fetchall()
+            if rows:
+                hashes = _store_output_blobs(cursor, [decode_output(output) for _, output in rows], budget)
+                cursor.executemany(
+                    "UPDATE report_results SET output = NULL, output_hash = %s WHERE id = %s",
+                    [(h, row_id) for h, (row_id, _) in zip(hashes, rows)]
+                )
+                moved += len(rows)
+            conn.commit()
+            last_id += batch_size
+            if sleep_seconds:
+                time.sleep(sleep_seconds)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return moved
+
+def collect_output_blobs():
+    """
+    Garbage-collection job: recount blob references from report_results and delete
+    unreferenced blobs. Repairs counts after cascading deletes (e.g. a device's
+    reports removed by the foreign key). Returns the number of blobs deleted.
+    """
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute("""
+            UPDATE output_blobs
+            SET ref_count = (SELECT COUNT(*) FROM report_results rr WHERE rr.output_hash = output_blobs.hash)
+        """)
+        cursor.execute("DELETE FROM output_blobs WHERE ref_count <= 0")
+        deleted = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return deleted
+
+def get_dedup_stats():
+    """
+    Storage statistics for output_blobs: references, unique blobs, logical bytes
+    (every reference counted), unique raw bytes, stored (compressed) bytes and ratios.
+    """
+    conn = connect_to_db()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT
+            COALESCE(SUM(ref_count), 0) AS refs,
+            COUNT(*) AS blobs,
+            COALESCE(SUM(raw_bytes * ref_count), 0) AS logical_bytes,
+            COALESCE(SUM(raw_bytes), 0) AS unique_bytes,
+            COALESCE(SUM(stored_bytes), 0) AS stored_bytes
+        FROM output_blobs
+    """)
+    row = cursor.fetchone()
+    conn.close()
+    stats = {key: int(value) for key, value in row.items()}
+    stats["dedup_ratio"] = stats["logical_bytes"] / stats["unique_bytes"] if stats["unique_bytes"] else 0
+    stats["total_ratio"] = stats["logical_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0
+    return stats
+
+def pack_legacy_results(batch_size=100, sleep_seconds=0):
+    """
+    Backfill job: rewrite legacy JSON in reports.result as report containers so
+    their section index and single outputs can be read without parsing the whole run.
+    Processes id ranges of batch_size; containers are skipped. Returns rows rewritten.
+    """
+    rewritten = 0
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM reports")
+        max_id = cursor.fetchone()[0]
+        last_id = 0
+        while last_id < max_id:
+            cursor.execute(
+                "SELECT id, result FROM reports WHERE id > %s AND id <= %s AND result IS NOT NULL",
+                (last_id, last_id + batch_size)
+            )
+            updates = [
+                (pack_report(read_report(value)), row_id)
+                for row_id, value in cursor.fetchall()
+                if not is_container(value)
+            ]
+            if updates:
+                conn.start_transaction()
+                cursor.executemany("UPDATE reports SET result = %s WHERE id = %s", updates)
+                conn.commit()
+                rewritten += len(updates)
+            last_id += batch_size
+            if sleep_seconds:
+                time.sleep(sleep_seconds)
+    finally:
+        conn.close()
+    return rewritten
+
+def index_existing_reports(batch_size=100, sleep_seconds=0):
+    """
+    Backfill job: write report_sections rows for reports created before the index
+    existed. Works through report id ranges of batch_size, one transaction each,
+    streaming every report's sections once. Returns reports indexed.
+    """
+    indexed = 0
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM reports")
+        max_id = cursor.fetchone()[0]
+        last_id = 0
+        while last_id < max_id:
+            cursor.execute("""
+                SELECT r.id FROM reports r
+                WHERE r.id > %s AND r.id <= %s
+                  AND NOT EXISTS (SELECT 1 FROM report_sections s WHERE s.report_id = r.id)
+            """, (last_id, last_id + batch_size))
+            report_ids = [row[0] for row in cursor.fetchall()]
+            if report_ids:
+                rows = []
+                for report_id in report_ids:
+                    rows.extend(_index_rows(report_id, iter_report_sections(report_id, read_only=False)))
+                conn.start_transaction()
+                if rows:
+                    cursor.executemany(SECTION_INSERT, rows)
+                conn.commit()
+                indexed += len(report_ids)
+            last_id += batch_size
+            if sleep_seconds:
+                time.sleep(sleep_seconds)
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return indexed
+
+def _archive_report(conn, cursor, report_id, created_at):
+    """
+    Append one report to its month's archive file as a report container, then in
+    one transaction record it in report_archives and drop its hot result rows.
+    """
+    path = f"reports-{created_at:%Y-%m}.jrpa"
+    os.makedirs(REPORT_ARCHIVE_DIR, exist_ok=True)
+    with open(os.path.join(REPORT_ARCHIVE_DIR, path), "ab") as archive:
+        offset = archive.tell()
+        length = write_report(iter_report_sections(report_id, read_only=False), archive)
+        archive.flush()
+        os.fsync(archive.fileno())
+
+    # A failure past this point leaves unreferenced bytes in the archive file, never a lost report
+    conn.start_transaction()
+    cursor.execute(
+        "INSERT INTO report_archives (report_id, path, byte_offset, byte_length) VALUES (%s, %s, %s, %s)",
+        (report_id, path, offset, length)
+    )
+    release_output_blobs(cursor, "id", [report_id])
+    cursor.execute("DELETE FROM report_results WHERE report_id = %s", (report_id,))
+    cursor.execute("UPDATE reports SET result = NULL WHERE id = %s", (report_id,))
     conn.commit()
-    return cursor.rowcount
+    return length
+
+def archive_old_reports(batch_size=100, sleep_seconds=0):
+    """
+    Archival job: move reports older than their customer's archive_after_days
+    (default REPORT_ARCHIVE_AFTER_DAYS) out of the hot tables into monthly archive
+    files. Report rows and their section index stay, so archived reports are still
+    listed and render on demand. Works through id ranges of batch_size.
+    Returns {"reports", "bytes"}.
+    """
+    stats = {"reports": 0, "bytes": 0}
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM reports")
+        max_id = cursor.fetchone()[0]
+        last_id = 0
+        while last_id < max_id:
+            cursor.execute("""
+                SELECT r.id, r.created_at
+                FROM reports r
+                JOIN customers c ON c.id = r.customer_id
+                LEFT JOIN report_archives a ON a.report_id = r.id
+                WHERE r.id > %s AND r.id <= %s AND a.report_id IS NULL
+                  AND r.created_at < NOW() - INTERVAL COALESCE(c.archive_after_days, %s) DAY
+            """, (last_id, last_id + batch_size, REPORT_ARCHIVE_AFTER_DAYS))
+            for report_id, created_at in cursor.fetchall():
+                stats["bytes"] += _archive_report(conn, cursor, report_id, created_at)
+                stats["reports"] += 1
+            last_id += batch_size
+            if sleep_seconds:
+                time.sleep(sleep_seconds)
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return stats
+
+def _read_checkpoint(path):
+    """Return the last committed report id recorded in a purge checkpoint file (0 if none)."""
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return json.load(f).get("last_id", 0)
+
+def _write_checkpoint(path, last_id):
+    """Atomically record the last committed report id."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"last_id": last_id, "updated_at": datetime.now().isoformat()}, f)
+    os.replace(tmp_path, path)
+
+def purge_expired_reports(batch_size=500, sleep_seconds=0.5, checkpoint_path=None, progress=None):
+    """
+    Retention job: delete reports older than their customer's retention_days
+    (default REPORT_RETENTION_DAYS), with their results and blob references.
+    Walks report id ranges of batch_size, one short transaction each, pausing
+    sleep_seconds between batches to keep lock time and replication lag low.
+    After every committed batch the last id is written to checkpoint_path, so an
+    interrupted run resumes where it stopped; the file is removed on completion.
+    progress, if given, is called with the running stats after each batch.
+    Archive files are append-only; bytes of purged archived reports stay in them.
+    Cached PDFs of purged reports are removed.
+    Returns {"deleted", "batches", "last_id", "elapsed", "rows_per_sec"}.
+    """
+    last_id = _read_checkpoint(checkpoint_path)
+    stats = {"deleted": 0, "batches": 0, "last_id": last_id, "elapsed": 0.0, "rows_per_sec": 0.0}
+    started = time.monotonic()
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM reports")
+        max_id = cursor.fetchone()[0]
+        while last_id < max_id:
+            cursor.execute("""
+                SELECT r.id
+                FROM reports r
+                JOIN customers c ON c.id = r.customer_id
+                WHERE r.id > %s AND r.id <= %s
+                  AND r.created_at < NOW() - INTERVAL COALESCE(c.retention_days, %s) DAY
+            """, (last_id, last_id + batch_size, REPORT_RETENTION_DAYS))
+            report_ids = [row[0] for row in cursor.fetchall()]
+            if report_ids:
+                conn.start_transaction()
+                release_output_blobs(cursor, "id", report_ids)
+                cursor.execute(f"DELETE FROM reports WHERE id IN ({in_placeholders(report_ids)})", tuple(report_ids))
+                stats["deleted"] += cursor.rowcount
+                conn.commit()
+                invalidate_reports(report_ids)
+            last_id += batch_size
+            if checkpoint_path:
+                _write_checkpoint(checkpoint_path, last_id)
+
+            stats["batches"] += 1
+            stats["last_id"] = last_id
+            stats["elapsed"] = time.monotonic() - started
+            stats["rows_per_sec"] = stats["deleted"] / stats["elapsed"] if stats["elapsed"] else 0.0
+            if progress:
+                progress(stats)
+            if sleep_seconds and report_ids:
+                time.sleep(sleep_seconds)
+    except BaseException:
+        # KeyboardInterrupt included: the checkpoint already covers every committed batch
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
 
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return stats
@@ -0,0 +1,183 @@
+"""
+SQLite Backend
+==============
+Runs the db layer on SQLite (a file or in-memory) for local single-node
+deployments and for tests/benchmarks without a MySQL server.
+Enabled with DB_BACKEND=sqlite; DB_SQLITE_PATH picks the file (":memory:" for
+a process-wide in-memory database).
+
+Connections mimic the subset of mysql.connector the db modules use: %s
+placeholders, cursor(dictionary=True), start_transaction(), lastrowid of a
+bulk INSERT pointing at its first row, and mysql.connector exception types.
+MySQL-only SQL in those modules is rewritten per statement (see _translate).
+The schema is created from sql/schema_sqlite.sql on first connect.
+"""
+
+import os
+import re
+import sqlite3
+from datetime import datetime
+from functools import lru_cache
+import mysql.connector
+
+SQLITE_PATH = os.getenv('DB_SQLITE_PATH', 'reportingapp.db')
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql", "schema_sqlite.sql")
+
+# In-memory databases are shared across connections through a named shared cache;
+# one connection stays open so the database lives as long as the process
+MEMORY_URI = "file:reportingapp?mode=memory&cache=shared"
+_memory_anchor = None
+_initialized = set()
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+
+_INTERVAL = re.compile(r"NOW\(\)\s*-\s*INTERVAL\s+(.+?)\s+DAY", re.IGNORECASE)
+_DELETE_LIMIT = re.compile(r"^\s*DELETE\s+FROM\s+(\w+)\s+WHERE\s+(.*)\s+LIMIT\s+(\d+)\s*$", re.IGNORECASE | re.DOTALL)
+_LAST_INSERT_ID = re.compile(r"LAST_INSERT_ID\((\w+)\)", re.IGNORECASE)
+_VALUES_REF = re.compile(r"VALUES\((\w+)\)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _translate(sql):
+    """Rewrite one MySQL statement as used by the db modules into SQLite."""
+    sql = sql.replace("%s", "?")
+    sql = _INTERVAL.sub(r"datetime('now', '-' || (\1) || ' days')", sql)
+    sql = re.sub(r"\s+FOR\s+UPDATE\b", "", sql, flags=re.IGNORECASE)
+    if "ON DUPLICATE KEY UPDATE" in sql.upper():
+        head, _, assignments = re.split(r"(ON DUPLICATE KEY UPDATE)", sql, maxsplit=1, flags=re.IGNORECASE)
+        assignments = _LAST_INSERT_ID.sub(r"\1", _VALUES_REF.sub(r"excluded.\1", assignments))
+        sql = f"{head}ON CONFLICT DO UPDATE SET{assignments}"
+    match = _DELETE_LIMIT.match(sql)
+    if match:
+        table, condition, limit = match.groups()
+        sql = f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {condition} LIMIT {limit})"
+    return sql
+
+
+def _reraise(e):
+    """Raise the mysql.connector exception matching a sqlite3 one, so callers stay backend-agnostic."""
+    if isinstance(e, sqlite3.IntegrityError):
+        raise mysql.connector.IntegrityError(msg=str(e)) from e
+    if isinstance(e, sqlite3.OperationalError):
+        raise mysql.connector.OperationalError(msg=str(e)) from e
+    raise mysql.connector.DatabaseError(msg=str(e)) from e
+
+
+class SQLiteCursor:
+    """Cursor with the mysql.connector surface used by the db modules."""
+
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        self._dictionary = dictionary
+        self.lastrowid = None
+        self.rowcount = -1
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, sql, params=()):
+        if sql.lstrip().upper().startswith("SHOW "):
+            # Server variables / replication status do not exist here; callers use defaults
+            self._cursor = self._cursor.connection.execute("SELECT 1 WHERE 0")
+            return
+        try:
+            self._cursor.execute(_translate(sql), tuple(params or ()))
+        except sqlite3.Error as e:
+            _reraise(e)
+        self.lastrowid = self._cursor.lastrowid
+        self.rowcount = self._cursor.rowcount
+
+    def executemany(self, sql, seq_of_params):
+        """Execute per row so lastrowid is the first inserted id, as for a MySQL multi-row INSERT."""
+        translated = _translate(sql)
+        first_id = None
+        total = 0
+        try:
+            for params in seq_of_params:
+                self._cursor.execute(translated, tuple(params))
+                if first_id is None:
+                    first_id = self._cursor.lastrowid
+                total += max(self._cursor.rowcount, 0)
+        except sqlite3.Error as e:
+            _reraise(e)
+        self.lastrowid = first_id
+        self.rowcount = total
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip([column[0] for column in self._cursor.description], row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Connection with the mysql.connector surface used by the db modules (autocommit by default)."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, dictionary=False, buffered=None):
+        return SQLiteCursor(self._conn, dictionary=dictionary)
+
+    def start_transaction(self):
+        self._conn.execute("BEGIN")
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._conn.close()
+
+
+def _open(path):
+    """Open a raw sqlite3 connection in autocommit mode with foreign keys enforced."""
+    global _memory_anchor
+    if path == ":memory:":
+        conn = sqlite3.connect(MEMORY_URI, uri=True, detect_types=sqlite3.PARSE_DECLTYPES,
+                               isolation_level=None, check_same_thread=False)
+        if _memory_anchor is None:
+            _memory_anchor = conn
+            conn = sqlite3.connect(MEMORY_URI, uri=True, detect_types=sqlite3.PARSE_DECLTYPES,
+                                   isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA read_uncommitted = 1")
+    else:
+        conn = sqlite3.connect(path, timeout=30, detect_types=sqlite3.PARSE_DECLTYPES,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def connect_sqlite(path=None):
+    """Open a connection to the SQLite database, creating the schema on first use."""
+    path = path or SQLITE_PATH
+    conn = _open(path)
+    if path not in _initialized:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reports'").fetchone():
+            with open(SCHEMA_PATH) as f:
+                conn.executescript(f.read())
+        _initialized.add(path)
+    return SQLiteConnection(conn)
@@ -6,21 +6,32 @@ Templates store lists of Juniper CLI commands (JSON) with descriptions.
 """
 
 import mysql.connector
-from db.connect_to_db import connect_to_db
+from db.connect_to_db import connect_to_db, chunked, in_placeholders
+from db.reports import release_output_blobs, get_report_ids
+from pdf_cache import invalidate_reports
+from db.assets import store_asset
+
+# Every column except the legacy company_logo blob; logos are read through db.assets
+TEMPLATE_COLUMNS = (
+    "id, name, description, command, customer_id, created_at, general_desc, update_time, "
+    "premade_report, manual_summary_desc, manual_summary_table, logo_asset_id"
+)
 import json
 from db.customer import get_customer_by_id
 from datetime import datetime
 
 
 def create_template(name, description, command, customer_id, general_desc, premade_report, manual_summary_desc=None, manual_summary_table=None, company_logo=None):
-    """Insert a template; description and command are JSON arrays. Returns new row id."""
+    """Insert a template; description and command are JSON arrays. company_logo is raw image bytes. Returns new row id."""
+    logo_asset_id = store_asset(company_logo) if company_logo else None
+
     conn = connect_to_db()
     cursor = conn.cursor()
     cursor.execute(
         """INSERT INTO command_templates 
-           (name, description, command, customer_id, general_desc, premade_report, manual_summary_desc, manual_summary_table, company_logo) 
+           (name, description, command, customer_id, general_desc, premade_report, manual_summary_desc, manual_summary_table, logo_asset_id) 
            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""", 
-        (name, json.dumps(description), json.dumps(command), customer_id, general_desc, premade_report, manual_summary_desc, json.dumps(manual_summary_table) if manual_summary_table else None, company_logo)
+        (name, json.dumps(description), json.dumps(command), customer_id, general_desc, premade_report, manual_summary_desc, json.dumps(manual_summary_table) if manual_summary_table else None, logo_asset_id)
     )
     conn.commit()
     template_id = cursor.lastrowid
@@ -29,9 +40,9 @@ def create_template(name, description, command, customer_id, general_desc, prema
 
 def get_templates_by_customer_id(customer_id):
     """Fetch all templates for a customer; parses JSON fields into Python lists."""
-    conn = connect_to_db()
+    conn = connect_to_db(read_only=True)
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM command_templates WHERE customer_id = %s", (customer_id,))
+    cursor.execute(f"SELECT {TEMPLATE_COLUMNS} FROM command_templates WHERE customer_id = %s", (customer_id,))
 
     templates = cursor.fetchall()
     conn.close()
@@ -50,24 +61,43 @@ def get_templates_by_customer_id(customer_id):
             'premade_report': template['premade_report'],
             'manual_summary_desc': template['manual_summary_desc'],
             'manual_summary_table': json.loads(template['manual_summary_table']) if isinstance(template['manual_summary_table'], str) else template['manual_summary_table'],
+            'logo_asset_id': template['logo_asset_id'],
         })
     
     return parsed_templates
 
 def delete_template(id):
-    """Permanently delete a template by ID."""
+    """Permanently delete a template by ID; its reports cascade, releasing their output blobs and cached PDFs."""
+    return delete_templates([id])
+
+def delete_templates(ids):
+    """Permanently delete many templates in chunked IN (...) statements; returns rows deleted."""
+    if not ids:
+        return 0
     conn = connect_to_db()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM command_templates WHERE id = %s", (id,))
-    conn.commit()
-    conn.close()
-    return cursor.rowcount
+    deleted = 0
+    try:
+        conn.start_transaction()
+        report_ids = get_report_ids(cursor, "template_id", ids)
+        release_output_blobs(cursor, "template_id", ids)
+        for chunk in chunked(ids):
+            cursor.execute(f"DELETE FROM command_templates WHERE id IN ({in_placeholders(chunk)})", tuple(chunk))
+            deleted += cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    invalidate_reports(report_ids)
+    return deleted
 
 def get_template_by_id(id):
     """Fetch a single template by ID; returns dict or None."""
-    conn = connect_to_db()
+    conn = connect_to_db(read_only=True)
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM command_templates WHERE id = %s", (id,))
+    cursor.execute(f"SELECT {TEMPLATE_COLUMNS} FROM command_templates WHERE id = %s", (id,))
     template = cursor.fetchone()
     
     if template:
@@ -93,6 +123,8 @@ def update_template(
     premade_report=None,
     company_logo=None
 ):
+    """Update a template; company_logo (raw image bytes) replaces the logo only when provided."""
+    logo_asset_id = store_asset(company_logo) if company_logo else None
 
     conn = connect_to_db()
     cursor = conn.cursor()
@@ -137,7 +169,7 @@ def update_template(
             manual_summary_desc = %s,
             manual_summary_table = %s,
             premade_report = %s,
-            company_logo = %s
+            logo_asset_id = COALESCE(%s, logo_asset_id)
         WHERE id = %s
         """,
         (
@@ -150,7 +182,7 @@ def update_template(
             manual_summary_desc,
             manual_summary_json,
             premade_report,
-            company_logo,
+            logo_asset_id,
             id,
         ),
     )
@@ -2,137 +2,169 @@
 PDF Report Generator
 ===================
 Generates professional PDF reports from stored report data.
-Uses Groq/LLM for AI-generated summary and ReportLab for PDF layout.
+Uses the stored AI summary (see ai_summary) and ReportLab for PDF layout.
 """
 
 from db.devices import get_device_by_id
 from db.customer import get_customer_by_id
 from db.templates import get_template_by_id
-from db.reports import get_report_by_id
+from db.reports import get_report_by_id, iter_report_sections, get_report_summary
+from db.assets import get_asset_renditions
+from pdf_cache import cache_key, get_cached_pdf, put_cached_pdf
+from pdf_flowables import CLIOutput, ReaderImage
+from ai_summary import get_ai_summary
+from summary_worker import wait_for_summary
 from datetime import datetime
-from groq import Groq
-import tempfile
+import hashlib
 import os
 import json
 from dotenv import load_dotenv
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table,
-    TableStyle, PageBreak, Image, Preformatted, KeepTogether
+    TableStyle, PageBreak, KeepTogether
 )
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
 from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
 from io import BytesIO
-from PIL import Image as PILImage
 
 load_dotenv()
 
-
-def AI_report_summary(report):
-    """Use Groq LLM to analyze report data and return structured JSON summary."""
-    try:
-        api_key = os.getenv('GROQ_API_KEY')
-        if not api_key:
-            print("GROQ_API_KEY not found")
-            return None
-
-        client = Groq(api_key=api_key)
-        result = report["result"]
-
-        user_prompt = """
-Analyze the following router/switch system report.
-
-Return ONLY valid JSON with no extra text.
-
-Use this exact format:
-
-{
-  "summary_table": {
-    "Device": "",
-    "Model": "",
-    "OS_version": "",
-    "Uptime": "",
-    "CPU_usage": "",
-    "Memory_usage": "",
-    "Temperature": "",
-    "Power_status": "",
-    "Alarms": "",
-    "Overall_status": ""
-  },
-  "narrative_summary": ""
-}
-
-Rules:
-- Use only data found in the report
-- If a value is missing, use "Not Reported"
-- Overall_status must be: Healthy, Warning, or Critical
-
-Report Data:
-""" + str(result)
-
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            temperature=0.2,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a senior network engineer and technical report writer.\n"
-                        "Analyze router/switch reports and produce:\n"
-                        "1) Summary table\n"
-                        "2) Narrative explanation\n"
-                        "Only use provided data."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": user_prompt
-                }
-            ]
-        )
-
-        return response.choices[0].message.content
-
-    except Exception as e:
-        print(f"AI summary generation failed: {e}")
-        return None
-
-
-def _cli_table(text, cli_style, top_border=True, bottom_border=True):
-    """Create a styled CLI output table."""
-    tbl = Table([[Preformatted(text, cli_style)]], colWidths=[16 * cm])
-
-    cmds = [
-        ("BACKGROUND", (0, 0), (-1, -1), colors.whitesmoke),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 0), (-1, -1), 4 if top_border else 0),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4 if bottom_border else 0),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("LINEABOVE", (0, 0), (-1, 0), 0.5, colors.grey) if top_border else ("NOSPLIT", (0, 0), (-1, -1)),
-        ("LINEBELOW", (0, -1), (-1, -1), 0.5, colors.grey) if bottom_border else ("NOSPLIT", (0, 0), (-1, -1)),
-        ("LINEBEFORE", (0, 0), (0, -1), 0.5, colors.grey),
-        ("LINEAFTER", (-1, 0), (-1, -1), 0.5, colors.grey),
-    ]
-
-    tbl.setStyle(TableStyle(cmds))
-    return tbl
+# Seconds a render waits for a queued AI summary before generating it inline
+AI_RENDER_WAIT_SECONDS = float(os.getenv('AI_RENDER_WAIT_SECONDS', 30))
+
+# Command output box (see pdf_flowables.CLIOutput)
+CLI_STYLE = {"font_name": "Courier", "font_size": 8, "leading": 9}
+
+# Output lines kept on the same page as a command's description
+CLI_KEEP_WITH_DESCRIPTION = 10
+
+# Table styles are immutable once built and shared by every render
+LOGO_TABLE_STYLE = TableStyle([
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+])
+META_TABLE_STYLE = TableStyle([
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("BACKGROUND", (0, 0), (0, -1), colors.whitesmoke),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+])
+AI_SUMMARY_TABLE_STYLE = TableStyle([
+    ("GRID", (0, 0), (-1, -1), 0.7, colors.black),
+    ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+])
+MANUAL_SUMMARY_TABLE_STYLE = TableStyle([
+    ("GRID", (0, 0), (-1, -1), 0.7, colors.black),
+    ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+])
+
+_STYLES = None
+
+
+def _get_styles():
+    """Paragraph styles, built once per process."""
+    global _STYLES
+    if _STYLES is None:
+        styles = getSampleStyleSheet()
+        styles.add(ParagraphStyle(
+            name="TitleStyle",
+            fontSize=22,
+            alignment=1,
+            spaceAfter=25
+        ))
+        styles.add(ParagraphStyle(
+            name="HeaderStyle",
+            fontSize=15,
+            spaceAfter=18,
+            textColor=colors.darkblue
+        ))
+        styles.add(ParagraphStyle(
+            name="BodyStyle",
+            fontSize=11,
+            leading=15,
+            spaceAfter=10
+        ))
+        _STYLES = styles
+    return _STYLES
+
+
+# Logo renditions by asset id. Assets are content-addressed and never change,
+# so each process (including bulk_pdf workers) fetches a logo once.
+_LOGO_CACHE = {}
+LOGO_CACHE_MAX_ENTRIES = 256
+
+
+def _get_logos(asset_ids):
+    """PDF renditions for asset ids (None ids skipped), served from the process cache when possible."""
+    missing = [asset_id for asset_id in asset_ids if asset_id is not None and asset_id not in _LOGO_CACHE]
+    if missing:
+        if len(_LOGO_CACHE) + len(missing) > LOGO_CACHE_MAX_ENTRIES:
+            _LOGO_CACHE.clear()
+        _LOGO_CACHE.update(get_asset_renditions(missing, "pdf"))
+    return {asset_id: _LOGO_CACHE.get(asset_id) for asset_id in asset_ids if asset_id is not None}
+
+
+# Decoded logos by content hash, shared by every render in the process
+_LOGO_READERS = {}
+
+
+def _logo_image(png):
+    """A 3 cm cover logo for PNG bytes, decoding each distinct logo once per process."""
+    digest = hashlib.sha256(png).digest()
+    reader = _LOGO_READERS.get(digest)
+    if reader is None:
+        if len(_LOGO_READERS) >= LOGO_CACHE_MAX_ENTRIES:
+            _LOGO_READERS.clear()
+        reader = ImageReader(BytesIO(png))
+        reader.getRGBData()
+        _LOGO_READERS[digest] = reader
+    return ReaderImage(reader, 3 * cm, 3 * cm)
 
 
 def generate_pdf(report_id):
-    """Generate PDF report from report data."""
+    """
+    Generate PDF report from report data.
+    Renders are cached on disk (see pdf_cache); a repeat download only reads
+    the report's metadata rows to check the cache key.
+    """
     report = get_report_by_id(report_id)
     customer = get_customer_by_id(report["customer_id"])
     device = get_device_by_id(report["device_id"])
     template = get_template_by_id(report["template_id"])
+    filename = f"Report_{template['name']}_{device['serial_number']}.pdf"
+
+    key = cache_key(report, customer, device, template)
+    cached = get_cached_pdf(report_id, key)
+    if cached is not None:
+        return BytesIO(cached), filename
 
+    buffer = _render_pdf(report, customer, device, template)
+    # A PDF rendered while the AI summary was unavailable is not kept, so the next download retries
+    if report.get("ai_summary") != 1 or get_report_summary(report_id) is not None:
+        put_cached_pdf(report_id, key, buffer.getvalue())
+    return buffer, filename
+
+
+def _render_pdf(report, customer, device, template):
+    """Lay out one report with ReportLab; returns a BytesIO positioned at 0."""
+    report_id = report["id"]
     customer_name = customer["name"]
     template_name = template["name"]
     device_serial = device["serial_number"]
     template_desc = template.get("general_desc") or "No description provided"
-    customer_logo = customer.get("images")
-    host_logo_path = template.get("company_logo")
+    logos = _get_logos([customer.get("logo_asset_id"), template.get("logo_asset_id")])
+    customer_logo = logos.get(customer.get("logo_asset_id"))
+    host_logo = logos.get(template.get("logo_asset_id"))
     report_time = report["created_at"]
     device_hostname = device["hostname"]
 
@@ -147,72 +179,16 @@ def generate_pdf(report_id):
         bottomMargin=2 * cm
     )
 
-    styles = getSampleStyleSheet()
-
-    styles.add(ParagraphStyle(
-        name="TitleStyle",
-        fontSize=22,
-        alignment=1,
-        spaceAfter=25
-    ))
-
-    styles.add(ParagraphStyle(
-        name="HeaderStyle",
-        fontSize=15,
-        spaceAfter=18,
-        textColor=colors.darkblue
-    ))
-
-    styles.add(ParagraphStyle(
-        name="BodyStyle",
-        fontSize=11,
-        leading=15,
-        spaceAfter=10
-    ))
-
-    cli_style = ParagraphStyle(
-        name="CLIStyle",
-        fontName="Courier",
-        fontSize=8,
-        leading=9
-    )
+    styles = _get_styles()
 
     story = []
 
-    host_tmp_path = None
-    if host_logo_path and isinstance(host_logo_path, (bytes, bytearray)) and len(host_logo_path) > 0:
-        try:
-            PILImage.open(BytesIO(host_logo_path)).verify()
-            
-            tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            tmp_file.write(host_logo_path)
-            tmp_file.close()
-            host_tmp_path = tmp_file.name
-        except Exception as e:
-            print(f"Host logo error: {e}")
-            host_tmp_path = None
-
-    customer_tmp_path = None
-    if customer_logo and isinstance(customer_logo, (bytes, bytearray)) and len(customer_logo) > 0:
-        try:
-            PILImage.open(BytesIO(customer_logo)).verify()
-            
-            tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            tmp_file.write(customer_logo)
-            tmp_file.close()
-            customer_tmp_path = tmp_file.name
-        except Exception as e:
-            print(f"Customer logo error: {e}")
-            customer_tmp_path = None
-
-    left_cell = Image(customer_tmp_path, width=3 * cm, height=3 * cm) if customer_tmp_path else Paragraph("", styles["BodyStyle"])
-    right_cell = Image(host_tmp_path, width=3 * cm, height=3 * cm) if host_tmp_path else Paragraph("", styles["BodyStyle"])
+    # Logos are pre-scaled PNG renditions validated at upload; no re-check needed
+    left_cell = _logo_image(customer_logo) if customer_logo else Paragraph("", styles["BodyStyle"])
+    right_cell = _logo_image(host_logo) if host_logo else Paragraph("", styles["BodyStyle"])
 
     logo_table = Table([[left_cell, right_cell]], colWidths=[13 * cm, 13 * cm])
-    logo_table.setStyle(TableStyle([
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-    ]))
+    logo_table.setStyle(LOGO_TABLE_STYLE)
     story.append(logo_table)
     story.append(Spacer(1, 100))
     story.append(Paragraph(f"{template_name}", styles["TitleStyle"]))
@@ -225,31 +201,28 @@ def generate_pdf(report_id):
         ["Description", Paragraph(template_desc, styles["BodyStyle"])],
         ["Generated", report_time.strftime("%Y-%m-%d %H:%M:%S")]
     ]
+    # Streamed reports are only marked completed once every command was collected
+    if report.get("completed") == 0:
+        meta_data.append(["Status", "Incomplete: collection did not finish"])
 
     meta_table = Table(meta_data, colWidths=[4 * cm, 12 * cm])
-    meta_table.setStyle(TableStyle([
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("BACKGROUND", (0, 0), (0, -1), colors.whitesmoke),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("FONTSIZE", (0, 0), (-1, -1), 9),
-    ]))
+    meta_table.setStyle(META_TABLE_STYLE)
 
     story.append(meta_table)
     story.append(PageBreak())
 
-    if report.get("ai_summary") == 1 and report.get("result"):
+    if report.get("ai_summary") == 1:
         try:
             story.append(Paragraph("System Summary", styles["HeaderStyle"]))
 
-            summary_json = AI_report_summary(report)
+            wait_for_summary(report_id, AI_RENDER_WAIT_SECONDS)
+            summary_data = get_ai_summary(report)
 
-            if not summary_json:
+            if not summary_data:
                 story.append(Paragraph("AI Summary unavailable.", styles["BodyStyle"]))
                 story.append(PageBreak())
 
-            elif summary_json.strip():
-                summary_data = json.loads(summary_json)
-
+            else:
                 table_rows = []
                 for key, value in summary_data.get("summary_table", {}).items():
                     value_str = str(value)
@@ -259,12 +232,16 @@ def generate_pdf(report_id):
 
                 if table_rows:
                     summary_table = Table(table_rows, colWidths=[6 * cm, 10 * cm])
-                    summary_table.setStyle(TableStyle([
-                        ("GRID", (0, 0), (-1, -1), 0.7, colors.black),
-                        ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
-                        ("FONTSIZE", (0, 0), (-1, -1), 9),
-                    ]))
+                    summary_table.setStyle(AI_SUMMARY_TABLE_STYLE)
                     story.append(summary_table)
+                    sources = summary_data.get("field_sources", {})
+                    parsed = [key.replace('_', ' ') for key, source in sources.items() if source == "parsed"]
+                    if parsed:
+                        story.append(Spacer(1, 4))
+                        note = f"Parsed from command output: {', '.join(parsed)}."
+                        if "model" in sources.values():
+                            note += " Other values are AI-generated."
+                        story.append(Paragraph(f"<i>{note}</i>", styles["BodyStyle"]))
                     story.append(Spacer(1, 15))
 
                 narrative = summary_data.get("narrative_summary", "")
@@ -299,16 +276,7 @@ def generate_pdf(report_id):
 
             if table_rows:
                 summary_table = Table(table_rows, colWidths=[6 * cm, 10 * cm])
-                summary_table.setStyle(TableStyle([
-                    ("GRID", (0, 0), (-1, -1), 0.7, colors.black),
-                    ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-                    ("TOPPADDING", (0, 0), (-1, -1), 6),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                    ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ]))
+                summary_table.setStyle(MANUAL_SUMMARY_TABLE_STYLE)
                 story.append(summary_table)
 
         story.append(Spacer(1, 15))
@@ -317,94 +285,44 @@ def generate_pdf(report_id):
         story.append(Spacer(1, 15))
         story.append(PageBreak())
 
-    results = report["result"]
+    # Sections are streamed from the DB; a page break is owed after every
+    # command and only emitted once something follows it.
+    section_count = 0
+    break_pending = False
 
-    if isinstance(results, str):
-        try:
-            results = json.loads(results)
-        except json.JSONDecodeError:
-            results = []
+    for result_data in iter_report_sections(report_id):
+        section_count += 1
 
-    if not isinstance(results, list):
-        results = []
+        if break_pending:
+            story.append(PageBreak())
+            break_pending = False
 
-    if not results:
-        story.append(Paragraph("No command results found.", styles["BodyStyle"]))
-    else:
-        command_entries = [r for r in results if isinstance(r, dict) and r.get("type") != "Header"]
-        command_count = len(command_entries)
-        command_idx = 0
-
-        for result_data in results:
-            if not isinstance(result_data, dict):
-                continue
-
-            if result_data.get("type") == "Header":
-                if story and not isinstance(story[-1], PageBreak):
-                    story.append(PageBreak())
-                story.append(Paragraph(result_data.get("text", ""), styles["HeaderStyle"]))
-                story.append(Spacer(1, 10))
-                continue
-
-            command_idx += 1
-
-            cmd_description = result_data.get("description", "")
-            output = result_data.get("output", "")
-
-            max_line_length = 90
-            wrapped_lines = []
-            for line in output.split('\n'):
-                while len(line) > max_line_length:
-                    wrapped_lines.append(line[:max_line_length])
-                    line = line[max_line_length:]
-                wrapped_lines.append(line)
-
-            BATCH = 70
-
-            batches = []
-            for i in range(0, len(wrapped_lines), BATCH):
-                batches.append('\n'.join(wrapped_lines[i:i + BATCH]))
-
-            n = len(batches)
-
-            cli_flowables = []
-            for i, batch_text in enumerate(batches):
-                is_first = (i == 0)
-                is_last = (i == n - 1)
-                cli_flowables.append(
-                    _cli_table(batch_text, cli_style,
-                               top_border=is_first,
-                               bottom_border=is_last)
-                )
-
-            if cmd_description:
-                desc_para = Paragraph(f"<b>Description:</b> {cmd_description}", styles["BodyStyle"])
-                if cli_flowables:
-                    story.append(KeepTogether([desc_para, cli_flowables[0]]))
-                    for tbl in cli_flowables[1:]:
-                        story.append(tbl)
-                else:
-                    story.append(desc_para)
-            else:
-                for tbl in cli_flowables:
-                    story.append(tbl)
-
-            if command_idx < command_count:
+        if result_data.get("type") == "Header":
+            if story and not isinstance(story[-1], PageBreak):
                 story.append(PageBreak())
+            story.append(Paragraph(result_data.get("text", ""), styles["HeaderStyle"]))
+            story.append(Spacer(1, 10))
+            continue
 
-    doc.build(story)
+        cmd_description = result_data.get("description", "")
+        output = result_data.get("output", "")
 
-    if customer_tmp_path and os.path.exists(customer_tmp_path):
-        try:
-            os.unlink(customer_tmp_path)
-        except Exception:
-            pass
+        cli_output = CLIOutput(output or "", 16 * cm, **CLI_STYLE)
 
-    if host_tmp_path and os.path.exists(host_tmp_path):
-        try:
-            os.unlink(host_tmp_path)
-        except Exception:
-            pass
+        if cmd_description:
+            desc_para = Paragraph(f"<b>Description:</b> {cmd_description}", styles["BodyStyle"])
+            head, *rest = cli_output.split_head(CLI_KEEP_WITH_DESCRIPTION)
+            story.append(KeepTogether([desc_para, head]))
+            story.extend(rest)
+        else:
+            story.append(cli_output)
+
+        break_pending = True
+
+    if section_count == 0:
+        story.append(Paragraph("No command results found.", styles["BodyStyle"]))
+
+    doc.build(story)
 
     buffer.seek(0)
-    return buffer, f"Report_{template_name}_{device_serial}.pdf"
+    return buffer
@@ -0,0 +1,199 @@
+"""
+Junos Health Extractor
+======================
+Rule-based parsing of the AI summary table fields from standard Junos outputs
+(show version, show chassis routing-engine, show chassis environment,
+show system/chassis alarms). Parsing takes microseconds and gives the same
+answer every time, so these fields no longer depend on the LLM (see ai_summary).
+"""
+
+import re
+
+SUMMARY_FIELDS = (
+    "Device", "Model", "OS_version", "Uptime", "CPU_usage", "Memory_usage",
+    "Temperature", "Power_status", "Alarms", "Overall_status"
+)
+
+HEALTH_COMMANDS = (
+    "show version", "show chassis routing-engine", "show chassis environment",
+    "show system alarms", "show chassis alarms"
+)
+
+# Thresholds that turn an otherwise healthy device into a Warning
+WARN_CPU_PERCENT = 80
+WARN_MEMORY_PERCENT = 90
+WARN_TEMPERATURE_C = 70
+
+NOT_REPORTED = "Not Reported"
+
+_VERSION_PATTERNS = {
+    "Device": re.compile(r"^Hostname:\s*(\S+)", re.M),
+    "Model": re.compile(r"^Model:\s*(\S+)", re.M),
+    "OS_version": re.compile(r"^(?:Junos:\s*(\S+)|JUNOS Software Release \[([^\]]+)\])", re.M),
+}
+_SLOT = re.compile(r"^\s*Slot\s+\d+:", re.M)
+_RE_VALUE = re.compile(r"^\s*(Current state|Temperature|Memory utilization|Idle|Uptime)\s{2,}(.+?)\s*$", re.M)
+_DEGREES = re.compile(r"(\d+) degrees C")
+_PERCENT = re.compile(r"(\d+) percent")
+_ALARM_CLASS = re.compile(r"\b(Major|Minor)\b")
+_COLUMNS = re.compile(r"\s{2,}")
+
+# `show chassis environment` statuses; Check needs attention, anything else listed is a failure
+_HEALTHY = ("OK", "Present")
+_ABSENT = ("Absent", "Empty")
+
+
+def _base_command(command):
+    """Command without pipes/extra whitespace, e.g. "show version | no-more" -> "show version"."""
+    return " ".join((command or "").split("|")[0].split())
+
+
+def collect_health_outputs(sections, outputs):
+    """Pass report sections through unchanged, keeping health command outputs in `outputs` (command -> output)."""
+    for section in sections:
+        command = _base_command(section.get("command"))
+        if command in HEALTH_COMMANDS and section.get("output") and section.get("status") != "error":
+            outputs[command] = outputs.get(command, "") + section["output"] + "\n"
+        yield section
+
+
+def parse_version(output):
+    """Hostname, model and Junos release from `show version`."""
+    fields = {}
+    for field, pattern in _VERSION_PATTERNS.items():
+        match = pattern.search(output)
+        if match:
+            fields[field] = next(group for group in match.groups() if group)
+    return fields
+
+
+def parse_routing_engine(output):
+    """CPU, memory, temperature and uptime of the master RE (or the only/first one)."""
+    slots = [part for part in _SLOT.split(output)[1:] if part.strip()] or [output]
+    values = None
+    for slot in slots:
+        slot_values = dict(_RE_VALUE.findall(slot))
+        if values is None or slot_values.get("Current state", "").startswith("Master"):
+            values = slot_values
+    fields = {}
+    idle = _PERCENT.search(values.get("Idle", ""))
+    if idle:
+        fields["CPU_usage"] = f"{100 - int(idle.group(1))}%"
+    memory = _PERCENT.search(values.get("Memory utilization", ""))
+    if memory:
+        fields["Memory_usage"] = f"{memory.group(1)}%"
+    temperature = _DEGREES.search(values.get("Temperature", ""))
+    if temperature:
+        fields["Temperature"] = f"{temperature.group(1)} C"
+    if values.get("Uptime"):
+        fields["Uptime"] = values["Uptime"]
+    return fields
+
+
+def parse_environment(output):
+    """
+    Power status, highest temperature and items needing attention from
+    `show chassis environment`; returns (fields, failed, checks).
+    Absent slots are empty and not counted; Present is installed without a reading.
+    """
+    power, failed, checks, temperatures, current = 0, [], [], [], None
+    for line in output.splitlines()[1:]:
+        if not line.strip():
+            continue
+        if line[:1].strip():
+            current, _, line = line.partition(" ")
+        # Item, status and measurement are separated by column padding;
+        # an item name filling its column leaves one space before the status
+        columns = _COLUMNS.split(line.strip())
+        if len(columns) > 1:
+            item, status = columns[0], columns[1]
+        else:
+            item, _, status = columns[0].rpartition(" ")
+        if not item or status in _ABSENT:
+            continue
+        degrees = _DEGREES.search(line)
+        if degrees:
+            temperatures.append(int(degrees.group(1)))
+        if current == "Power":
+            power += 1
+        if status == "Check":
+            checks.append(f"{current} {item}")
+        elif status not in _HEALTHY:
+            failed.append(f"{current} {item}")
+    fields = {}
+    if power:
+        bad = [item for item in failed if item.startswith("Power")]
+        check = [item for item in checks if item.startswith("Power")]
+        if bad:
+            fields["Power_status"] = "Fault: " + ", ".join(bad)
+        elif check:
+            fields["Power_status"] = "Check: " + ", ".join(check)
+        else:
+            fields["Power_status"] = f"OK ({power} supplies)"
+    if temperatures:
+        fields["Temperature"] = f"{max(temperatures)} C"
+    return fields, failed, checks
+
+
+def parse_alarms(output):
+    """Alarm count and classes from `show system alarms` / `show chassis alarms`; returns (text, classes)."""
+    classes = _ALARM_CLASS.findall(output)
+    if not classes:
+        return ("None" if "No alarms currently active" in output else None), []
+    counts = ", ".join(f"{classes.count(name)} {name.lower()}" for name in ("Major", "Minor") if name in classes)
+    return f"{len(classes)} active ({counts})", classes
+
+
+def _overall_status(fields, failed, checks, alarm_classes):
+    """Healthy/Warning/Critical from parsed values; None when alarms or power were not reported."""
+    if "Alarms" not in fields or "Power_status" not in fields:
+        return None
+    if "Major" in alarm_classes or any(item.startswith(("Power", "Fans")) for item in failed):
+        return "Critical"
+    limits = (("CPU_usage", WARN_CPU_PERCENT), ("Memory_usage", WARN_MEMORY_PERCENT), ("Temperature", WARN_TEMPERATURE_C))
+    over = any(int(re.match(r"\d+", fields[name]).group()) >= limit for name, limit in limits if name in fields)
+    return "Warning" if alarm_classes or failed or checks or over else "Healthy"
+
+
+def extract_health(outputs):
+    """Summary table fields that could be parsed from health command outputs (missing fields are left out)."""
+    fields, failed, checks, alarm_classes = {}, [], [], []
+    if "show version" in outputs:
+        fields.update(parse_version(outputs["show version"]))
+    if "show chassis environment" in outputs:
+        environment, failed, checks = parse_environment(outputs["show chassis environment"])
+        fields.update(environment)
+    # The routing engine's own temperature takes precedence over the chassis maximum
+    if "show chassis routing-engine" in outputs:
+        fields.update(parse_routing_engine(outputs["show chassis routing-engine"]))
+    alarm_output = outputs.get("show system alarms", "") + outputs.get("show chassis alarms", "")
+    if alarm_output:
+        alarms, alarm_classes = parse_alarms(alarm_output)
+        if alarms:
+            fields["Alarms"] = alarms
+    status = _overall_status(fields, failed, checks, alarm_classes)
+    if status:
+        fields["Overall_status"] = status
+    return fields
+
+
+def local_summary(fields):
+    """A complete summary dict built from parsed fields only, with a templated narrative."""
+    table = {name: fields.get(name, NOT_REPORTED) for name in SUMMARY_FIELDS}
+    sentences = []
+    if "Device" in fields or "Model" in fields:
+        sentences.append(f"{fields.get('Device', 'The device')} ({fields.get('Model', 'model not reported')})"
+                         f" runs Junos {fields.get('OS_version', NOT_REPORTED)}.")
+    if "Uptime" in fields:
+        sentences.append(f"It has been up for {fields['Uptime']}.")
+    readings = [f"{label} {fields[name]}" for name, label in
+                (("CPU_usage", "CPU usage"), ("Memory_usage", "memory usage"), ("Temperature", "temperature"))
+                if name in fields]
+    if readings:
+        sentences.append("Routing engine " + ", ".join(readings) + ".")
+    if "Power_status" in fields:
+        sentences.append(f"Power: {fields['Power_status']}.")
+    if "Alarms" in fields:
+        sentences.append(f"Alarms: {fields['Alarms']}.")
+    sentences.append(f"Overall status: {table['Overall_status']}.")
+    return {"summary_table": table, "narrative_summary": " ".join(sentences)}
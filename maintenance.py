@@ -0,0 +1,201 @@
+"""
+Maintenance jobs
+================
+Command-line entry point for batched database maintenance jobs.
+Run from the project root, e.g.:
+
+    python maintenance.py compress-results --batch-size 500
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import argparse
+import time
+from db.assets import backfill_logo_assets
+from db.customer import set_retention_policy
+from db.reports import compress_existing_results, dedupe_existing_results, collect_output_blobs, get_dedup_stats, pack_legacy_results, export_report, export_reports, index_existing_reports, archive_old_reports, purge_expired_reports
+
+
+def _run_compress_results(args):
+    started = time.monotonic()
+    stats = compress_existing_results(batch_size=args.batch_size, sleep_seconds=args.sleep)
+    elapsed = time.monotonic() - started
+    ratio = stats["bytes_before"] / stats["bytes_after"] if stats["bytes_after"] else 0
+    print(f"✅ Compressed {stats['rows']} value(s) in {elapsed:.1f}s")
+    print(f"   {stats['bytes_before']:,} → {stats['bytes_after']:,} bytes ({ratio:.1f}x)")
+
+
+def _run_dedupe_results(args):
+    started = time.monotonic()
+    moved = dedupe_existing_results(batch_size=args.batch_size, sleep_seconds=args.sleep)
+    print(f"✅ Moved {moved} inline output(s) into output_blobs in {time.monotonic() - started:.1f}s")
+
+
+def _run_gc_blobs(args):
+    deleted = collect_output_blobs()
+    print(f"✅ Deleted {deleted} unreferenced output blob(s)")
+
+
+def _run_dedup_stats(args):
+    stats = get_dedup_stats()
+    print(f"References:     {stats['refs']:,}")
+    print(f"Unique blobs:   {stats['blobs']:,}")
+    print(f"Logical bytes:  {stats['logical_bytes']:,}")
+    print(f"Unique bytes:   {stats['unique_bytes']:,}  (dedup {stats['dedup_ratio']:.1f}x)")
+    print(f"Stored bytes:   {stats['stored_bytes']:,}  (total {stats['total_ratio']:.1f}x)")
+
+
+def _run_backfill_logo_assets(args):
+    counts = backfill_logo_assets()
+    print(f"✅ Moved {counts['migrated']} logo(s) into the asset store")
+    if counts["invalid"]:
+        print(f"   ⚠️  {counts['invalid']} stored logo(s) are not valid images and were left in place")
+
+
+def _run_pack_legacy_results(args):
+    started = time.monotonic()
+    rewritten = pack_legacy_results(batch_size=args.batch_size, sleep_seconds=args.sleep)
+    print(f"✅ Rewrote {rewritten} legacy result(s) as report containers in {time.monotonic() - started:.1f}s")
+
+
+def _run_export_report(args):
+    with open(args.output, "wb") as f:
+        written = export_report(args.report_id, f)
+    print(f"✅ Wrote report {args.report_id} to {args.output} ({written:,} bytes)")
+
+
+def _run_export_reports(args):
+    started = time.monotonic()
+    with open(args.output, "w", encoding="utf-8") as f:
+        written = export_reports(f)
+    print(f"✅ Exported {written} report(s) to {args.output} in {time.monotonic() - started:.1f}s")
+
+
+def _run_index_reports(args):
+    started = time.monotonic()
+    indexed = index_existing_reports(batch_size=args.batch_size, sleep_seconds=args.sleep)
+    print(f"✅ Indexed sections of {indexed} report(s) in {time.monotonic() - started:.1f}s")
+
+
+def _run_archive_reports(args):
+    started = time.monotonic()
+    stats = archive_old_reports(batch_size=args.batch_size, sleep_seconds=args.sleep)
+    print(f"✅ Archived {stats['reports']} report(s) ({stats['bytes']:,} bytes) in {time.monotonic() - started:.1f}s")
+
+
+def _print_purge_progress(stats):
+    print(f"   … {stats['deleted']:,} deleted, through id {stats['last_id']:,} ({stats['rows_per_sec']:.0f} rows/s)")
+
+
+def _run_purge_reports(args):
+    try:
+        stats = purge_expired_reports(
+            batch_size=args.batch_size,
+            sleep_seconds=args.sleep,
+            checkpoint_path=args.checkpoint,
+            progress=_print_purge_progress if args.verbose else None,
+        )
+    except KeyboardInterrupt:
+        print("⏸️  Interrupted; rerun with the same --checkpoint to resume")
+        return
+    print(f"✅ Deleted {stats['deleted']:,} expired report(s) in {stats['elapsed']:.1f}s ({stats['rows_per_sec']:.0f} rows/s)")
+
+
+def _run_summarize_reports(args):
+    # Imported here so the other jobs do not need the LLM client installed
+    from summary_worker import enqueue_missing_summaries, pending_summaries, wait_for_all
+    started = time.monotonic()
+    queued = enqueue_missing_summaries(limit=args.limit)
+    print(f"🤖 Generating {queued} missing AI summary(ies)...")
+    while pending_summaries():
+        wait_for_all(timeout=10)
+        print(f"   … {queued - pending_summaries()}/{queued} done")
+    print(f"✅ Processed {queued} summary(ies) in {time.monotonic() - started:.1f}s")
+
+
+def _run_set_retention(args):
+    clear = [column for column, flag in (("archive_after_days", args.clear_archive_after_days),
+                                         ("retention_days", args.clear_retention_days)) if flag]
+    if not set_retention_policy(args.customer_id, archive_after_days=args.archive_after_days,
+                                retention_days=args.retention_days, clear=clear):
+        print(f"Nothing updated for customer {args.customer_id}")
+        return
+    print(f"✅ Updated retention policy of customer {args.customer_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reporting app maintenance jobs")
+    subparsers = parser.add_subparsers(dest="job", required=True)
+
+    compress = subparsers.add_parser("compress-results", help="Compress stored outputs written before the codec existed")
+    compress.add_argument("--batch-size", type=int, default=500, help="Rows per id-range batch")
+    compress.add_argument("--sleep", type=float, default=0, help="Seconds to pause between batches")
+    compress.set_defaults(func=_run_compress_results)
+
+    dedupe = subparsers.add_parser("dedupe-results", help="Move inline outputs into the content-addressed blob store")
+    dedupe.add_argument("--batch-size", type=int, default=500, help="Rows per id-range batch")
+    dedupe.add_argument("--sleep", type=float, default=0, help="Seconds to pause between batches")
+    dedupe.set_defaults(func=_run_dedupe_results)
+
+    gc = subparsers.add_parser("gc-blobs", help="Recount blob references and delete unreferenced blobs")
+    gc.set_defaults(func=_run_gc_blobs)
+
+    stats = subparsers.add_parser("dedup-stats", help="Show output blob deduplication statistics")
+    stats.set_defaults(func=_run_dedup_stats)
+
+    logos = subparsers.add_parser("backfill-logo-assets", help="Move legacy logo blobs into the asset store")
+    logos.set_defaults(func=_run_backfill_logo_assets)
+
+    pack = subparsers.add_parser("pack-legacy-results", help="Rewrite legacy JSON results as report containers")
+    pack.add_argument("--batch-size", type=int, default=100, help="Rows per id-range batch")
+    pack.add_argument("--sleep", type=float, default=0, help="Seconds to pause between batches")
+    pack.set_defaults(func=_run_pack_legacy_results)
+
+    export = subparsers.add_parser("export-report", help="Write one report as a report container file")
+    export.add_argument("report_id", type=int)
+    export.add_argument("output", help="Destination file path")
+    export.set_defaults(func=_run_export_report)
+
+    export_all = subparsers.add_parser("export-reports", help="Stream every report with its sections to a JSON Lines file")
+    export_all.add_argument("output", help="Destination file path")
+    export_all.set_defaults(func=_run_export_reports)
+
+    index = subparsers.add_parser("index-reports", help="Write report_sections rows for reports created before the index")
+    index.add_argument("--batch-size", type=int, default=100, help="Reports per id-range batch")
+    index.add_argument("--sleep", type=float, default=0, help="Seconds to pause between batches")
+    index.set_defaults(func=_run_index_reports)
+
+    archive = subparsers.add_parser("archive-reports", help="Move reports past their archive window into archive files")
+    archive.add_argument("--batch-size", type=int, default=100, help="Reports per id-range batch")
+    archive.add_argument("--sleep", type=float, default=0, help="Seconds to pause between batches")
+    archive.set_defaults(func=_run_archive_reports)
+
+    retention = subparsers.add_parser("set-retention", help="Set a customer's report retention policy")
+    retention.add_argument("customer_id", type=int)
+    archive_days = retention.add_mutually_exclusive_group()
+    archive_days.add_argument("--archive-after-days", type=int, default=None, help="Days before reports are archived (omit to keep the current value)")
+    archive_days.add_argument("--clear-archive-after-days", action="store_true", help="Use REPORT_ARCHIVE_AFTER_DAYS again")
+    retention_days = retention.add_mutually_exclusive_group()
+    retention_days.add_argument("--retention-days", type=int, default=None, help="Days before reports are deleted (omit to keep the current value)")
+    retention_days.add_argument("--clear-retention-days", action="store_true", help="Use REPORT_RETENTION_DAYS again")
+    retention.set_defaults(func=_run_set_retention)
+
+    summarize = subparsers.add_parser("summarize-reports", help="Generate AI summaries that are still missing")
+    summarize.add_argument("--limit", type=int, default=1000, help="Reports to process in this run")
+    summarize.set_defaults(func=_run_summarize_reports)
+
+    purge = subparsers.add_parser("purge-reports", help="Delete reports past their retention window")
+    purge.add_argument("--batch-size", type=int, default=500, help="Report ids per range batch")
+    purge.add_argument("--sleep", type=float, default=0.5, help="Seconds to pause after each batch that deleted rows")
+    purge.add_argument("--checkpoint", default=None, help="Progress file; an interrupted run resumes from it")
+    purge.add_argument("--verbose", action="store_true", help="Print progress after every batch")
+    purge.set_defaults(func=_run_purge_reports)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+PDF Render Cache
+================
+Rendered report PDFs cached on local disk.
+Reports are immutable once created, so a PDF only changes when a field that
+feeds the layout does (customer/device/template text, logos, the AI flag) or
+when the layout itself changes (RENDER_VERSION). Those go into the cache key,
+so edits invalidate by missing; stale files age out through LRU eviction.
+Deleting reports (directly or through a customer, device, template or the
+purge job) removes their cached PDFs in the db layer.
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+PDF_CACHE_DIR = os.getenv('PDF_CACHE_DIR', '.pdf_cache')
+
+# Total size the cache may use before least-recently-used files are evicted
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+PDF_CACHE_ENABLED = os.getenv('PDF_CACHE', '1') != '0'
+
+# Bump when gen_PDF's layout changes so every cached PDF is re-rendered
+RENDER_VERSION = 3
+
+
+def cache_key(report, customer, device, template):
+    """Hash of everything generate_pdf reads for a report, apart from its (immutable) results."""
+    fields = {
+        "version": RENDER_VERSION,
+        "report": [report["id"], report["created_at"], report.get("ai_summary"), report.get("completed")],
+        "customer": [customer["name"], customer.get("logo_asset_id")],
+        "device": [device["serial_number"], device["hostname"]],
+        "template": [
+            template["name"],
+            template.get("general_desc"),
+            template.get("manual_summary_desc"),
+            template.get("manual_summary_table"),
+            template.get("logo_asset_id"),
+        ],
+    }
+    encoded = json.dumps(fields, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def _path(report_id, key):
+    return os.path.join(PDF_CACHE_DIR, f"{report_id}-{key}.pdf")
+
+
+def get_cached_pdf(report_id, key):
+    """Return cached PDF bytes or None; a hit marks the file as recently used."""
+    if not PDF_CACHE_ENABLED:
+        return None
+    path = _path(report_id, key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    os.utime(path)
+    return data
+
+
+def put_cached_pdf(report_id, key, data):
+    """Store PDF bytes atomically, drop older renders of the report, then enforce the size bound."""
+    if not PDF_CACHE_ENABLED:
+        return
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    path = _path(report_id, key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    for stale in glob.glob(os.path.join(PDF_CACHE_DIR, f"{report_id}-*.pdf")):
+        if stale != path:
+            _remove(stale)
+    evict()
+
+
+def invalidate_report(report_id):
+    """Remove every cached render of a report."""
+    for path in glob.glob(os.path.join(PDF_CACHE_DIR, f"{report_id}-*.pdf")):
+        _remove(path)
+
+
+def invalidate_reports(report_ids):
+    """Remove every cached render of many reports in one directory scan."""
+    prefixes = {str(report_id) for report_id in report_ids}
+    if not prefixes:
+        return
+    try:
+        names = os.listdir(PDF_CACHE_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.endswith(".pdf") and name.partition("-")[0] in prefixes:
+            _remove(os.path.join(PDF_CACHE_DIR, name))
+
+
+def evict(max_bytes=None):
+    """Delete least-recently-used PDFs until the cache fits max_bytes; returns files removed."""
+    max_bytes = PDF_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for path in glob.glob(os.path.join(PDF_CACHE_DIR, "*.pdf")):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+        removed += 1
+    return removed
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,151 @@
+"""
+PDF Flowables
+=============
+ReportLab flowables used by gen_PDF.
+ReaderImage draws an already decoded ImageReader, so a logo shared by many
+renders is decoded once (platypus Image only accepts files).
+CLIOutput draws monospaced command output straight onto the canvas instead of
+building a Table around a Preformatted per 70-line chunk. It wraps long lines
+itself and splits across pages by line offsets into one shared list, leaving
+the box open at the page break and continuing it on the next page. Each page's
+lines are escaped in one pass and emitted as a single text block, rather than
+going through ReportLab's per-line text formatting.
+"""
+
+from functools import lru_cache
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable
+
+
+# PDF literal string escapes for WinAnsi text: delimiters, control and 8-bit characters
+_PDF_ESCAPES = {ord("\\"): "\\\\", ord("("): "\\(", ord(")"): "\\)"}
+_PDF_ESCAPES.update({c: f"\\{c:03o}" for c in list(range(32)) + list(range(127, 256)) if c != ord("\n")})
+
+
+def pdf_text_lines(lines):
+    """PDF operators showing each line and moving down one leading (standard fonts, WinAnsi)."""
+    body = "\n".join(lines)
+    if not body.isascii():
+        body = body.encode("cp1252", "replace").decode("latin-1")
+    return "(" + body.translate(_PDF_ESCAPES).replace("\n", ") Tj T* (") + ") Tj"
+
+
+@lru_cache(maxsize=None)
+def _char_width(font_name, font_size):
+    """Advance width of one character of a monospaced font."""
+    return stringWidth("M", font_name, font_size)
+
+
+def wrap_cli_lines(text, max_chars):
+    """Split output into lines of at most max_chars characters (tabs expanded)."""
+    lines = []
+    for line in text.expandtabs(8).split("\n"):
+        line = line.rstrip("\r")
+        if len(line) <= max_chars:
+            lines.append(line)
+            continue
+        lines.extend(line[i:i + max_chars] for i in range(0, len(line), max_chars))
+    return lines
+
+
+class CLIOutput(Flowable):
+    """Boxed monospaced text that wraps to its width and splits across pages."""
+
+    def __init__(self, text, width, font_name="Courier", font_size=8, leading=9,
+                 padding=6, v_padding=4, background=colors.whitesmoke, border=colors.grey,
+                 _lines=None, _start=0, _end=None, _top=True, _bottom=True):
+        super().__init__()
+        self.width = width
+        self.font_name = font_name
+        self.font_size = font_size
+        self.leading = leading
+        self.padding = padding
+        self.v_padding = v_padding
+        self.background = background
+        self.border = border
+        if _lines is None:
+            # Monospaced: every character has the width of one
+            max_chars = max(1, int((width - 2 * padding) // _char_width(font_name, font_size)))
+            _lines = wrap_cli_lines(text, max_chars)
+        self.lines = _lines
+        self.start = _start
+        self.end = len(_lines) if _end is None else _end
+        self.top = _top
+        self.bottom = _bottom
+
+    def _padding(self):
+        """(top, bottom) padding; an edge continued on another page has none."""
+        return (self.v_padding if self.top else 0), (self.v_padding if self.bottom else 0)
+
+    def wrap(self, availWidth, availHeight):
+        top, bottom = self._padding()
+        self.height = (self.end - self.start) * self.leading + top + bottom
+        return self.width, self.height
+
+    def _part(self, start, end, top, bottom):
+        return CLIOutput(
+            None, self.width, self.font_name, self.font_size, self.leading,
+            self.padding, self.v_padding, self.background, self.border,
+            _lines=self.lines, _start=start, _end=end, _top=top, _bottom=bottom
+        )
+
+    def split(self, availWidth, availHeight):
+        top, bottom = self._padding()
+        lines = self.end - self.start
+        if lines * self.leading + top + bottom <= availHeight:
+            return [self]
+        # The first part ends open (no bottom padding); always leave at least
+        # one line for the rest, or the frame would get back a piece that does not fit
+        fits = min(int((availHeight - top) // self.leading), lines - 1)
+        if fits <= 0:
+            return []
+        return self.split_head(fits)
+
+    def split_head(self, lines):
+        """Split off the first `lines` lines (e.g. to keep with a heading); [self] if there are no more."""
+        middle = self.start + lines
+        if middle >= self.end:
+            return [self]
+        return [
+            self._part(self.start, middle, self.top, False),
+            self._part(middle, self.end, False, self.bottom),
+        ]
+
+    def draw(self):
+        canvas = self.canv
+        top, _ = self._padding()
+        canvas.saveState()
+        canvas.setFillColor(self.background)
+        canvas.rect(0, 0, self.width, self.height, stroke=0, fill=1)
+
+        canvas.setStrokeColor(self.border)
+        canvas.setLineWidth(0.5)
+        canvas.line(0, 0, 0, self.height)
+        canvas.line(self.width, 0, self.width, self.height)
+        if self.top:
+            canvas.line(0, self.height, self.width, self.height)
+        if self.bottom:
+            canvas.line(0, 0, self.width, 0)
+
+        canvas.setFillColor(colors.black)
+        canvas.setFont(self.font_name, self.font_size, self.leading)
+        x, y = self.padding, self.height - top - self.font_size
+        canvas.addLiteral(f"BT 1 0 0 1 {x:.2f} {y:.2f} Tm {pdf_text_lines(self.lines[self.start:self.end])} ET")
+        canvas.restoreState()
+
+
+class ReaderImage(Flowable):
+    """An ImageReader drawn at a fixed size, like platypus Image with width/height."""
+
+    def __init__(self, reader, width, height):
+        super().__init__()
+        self.reader = reader
+        self.width = width
+        self.height = height
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(self.reader, 0, 0, self.width, self.height, mask="auto")
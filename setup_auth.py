@@ -7,12 +7,17 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__))
 
-from db.connect_to_db import connect_to_db
+from db.connect_to_db import connect_to_db, DB_BACKEND
 from db.users import create_user, get_user_by_username
 import mysql.connector
 
 def create_users_table():
     """Create the users table if it doesn't exist"""
+    if DB_BACKEND == "sqlite":
+        # Part of sql/schema_sqlite.sql, created on first connect
+        print("✅ Users table created successfully (or already exists)")
+        return True
+
     conn = connect_to_db()
     cursor = conn.cursor()
     
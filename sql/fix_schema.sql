@@ -1,6 +1,29 @@
 CREATE DATABASE IF NOT EXISTS reportingapp;
 USE reportingapp;
 
+-- Image assets (logos), content-addressed, with pre-scaled PNG renditions
+CREATE TABLE assets (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    hash CHAR(64) NOT NULL UNIQUE,
+    mime VARCHAR(50),
+    width INT,
+    height INT,
+    byte_size INT,
+    original LONGBLOB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE asset_renditions (
+    asset_id INT NOT NULL,
+    name VARCHAR(20) NOT NULL,
+    width INT,
+    height INT,
+    data MEDIUMBLOB NOT NULL,
+
+    PRIMARY KEY (asset_id, name),
+    FOREIGN KEY (asset_id) REFERENCES assets(id) ON DELETE CASCADE
+);
+
 -- Customers
 CREATE TABLE customers (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -14,7 +37,12 @@ CREATE TABLE customers (
     device_type VARCHAR(100),
     jump_port INT DEFAULT 22,
     images LONGBLOB,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    logo_asset_id INT,
+    archive_after_days INT,
+    retention_days INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (logo_asset_id) REFERENCES assets(id) ON DELETE SET NULL
 );
 
 -- Devices
@@ -46,10 +74,12 @@ CREATE TABLE command_templates (
     manual_summary_desc TEXT,
     manual_summary_table JSON,
     company_logo LONGBLOB,
+    logo_asset_id INT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
 
-    FOREIGN KEY (customer_id) REFERENCES customers(id) ON DELETE CASCADE
+    FOREIGN KEY (customer_id) REFERENCES customers(id) ON DELETE CASCADE,
+    FOREIGN KEY (logo_asset_id) REFERENCES assets(id) ON DELETE SET NULL
 );
 
 -- Reports
@@ -58,15 +88,88 @@ CREATE TABLE reports (
     device_id INT NOT NULL,
     customer_id INT NOT NULL,
     template_id INT NOT NULL,
-    result LONGTEXT,
+    result LONGBLOB,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     ai_summary BOOLEAN DEFAULT FALSE,
+    completed BOOLEAN NOT NULL DEFAULT TRUE,
 
+    INDEX idx_reports_created_at (created_at),
+    INDEX idx_reports_customer_created (customer_id, created_at),
     FOREIGN KEY (device_id) REFERENCES devices(id) ON DELETE CASCADE,
     FOREIGN KEY (customer_id) REFERENCES customers(id) ON DELETE CASCADE,
     FOREIGN KEY (template_id) REFERENCES command_templates(id) ON DELETE CASCADE
 );
 
+-- Command outputs, stored once per distinct content (SHA-256) with reference counts
+CREATE TABLE output_blobs (
+    hash CHAR(64) PRIMARY KEY,
+    body LONGBLOB NOT NULL,
+    raw_bytes BIGINT NOT NULL,
+    stored_bytes BIGINT NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Report results (one row per header/command; reports.result holds legacy JSON)
+-- output (legacy inline rows), output_blobs.body and reports.result are codec-tagged, see db/reports.py
+CREATE TABLE report_results (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    report_id INT NOT NULL,
+    ordinal INT NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    text TEXT,
+    command TEXT,
+    description TEXT,
+    status VARCHAR(20),
+    output LONGBLOB,
+    output_hash CHAR(64),
+    duration_ms INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE KEY uq_report_results_ordinal (report_id, ordinal),
+    INDEX idx_report_results_output_hash (output_hash),
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
+
+-- Section index: per-section metadata and output sizes, written with the results
+CREATE TABLE report_sections (
+    report_id INT NOT NULL,
+    ordinal INT NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    text TEXT,
+    command TEXT,
+    status VARCHAR(20),
+    byte_size BIGINT NOT NULL DEFAULT 0,
+    line_count INT NOT NULL DEFAULT 0,
+    hash CHAR(64),
+
+    PRIMARY KEY (report_id, ordinal),
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
+
+-- Archived reports: where each report's container sits in its monthly archive file
+-- (path relative to REPORT_ARCHIVE_DIR); their report_results rows are removed
+CREATE TABLE report_archives (
+    report_id INT PRIMARY KEY,
+    path VARCHAR(255) NOT NULL,
+    byte_offset BIGINT NOT NULL,
+    byte_length BIGINT NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
+
+-- AI summaries, generated once per report and reused by every render
+CREATE TABLE report_summaries (
+    report_id INT PRIMARY KEY,
+    model VARCHAR(100) NOT NULL,
+    input_hash CHAR(64) NOT NULL,
+    summary JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
+
 -- Users (for authentication)
 CREATE TABLE IF NOT EXISTS users (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -0,0 +1,19 @@
+-- Normalized per-command report storage.
+-- New reports write one row per header/command here and leave reports.result NULL;
+-- existing reports keep their JSON in reports.result and are still readable.
+CREATE TABLE IF NOT EXISTS report_results (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    report_id INT NOT NULL,
+    ordinal INT NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    text TEXT,
+    command TEXT,
+    description TEXT,
+    status VARCHAR(20),
+    output LONGTEXT,
+    duration_ms INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE KEY uq_report_results_ordinal (report_id, ordinal),
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
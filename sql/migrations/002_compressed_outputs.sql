@@ -0,0 +1,5 @@
+-- Store command outputs through the codec in db/reports.py (tagged raw/zlib/zstd bytes).
+-- Existing text values stay readable; compress them afterwards with:
+--   python maintenance.py compress-results
+ALTER TABLE report_results MODIFY output LONGBLOB;
+ALTER TABLE reports MODIFY result LONGBLOB;
@@ -0,0 +1,16 @@
+-- Content-addressed storage for command outputs.
+-- New report_results rows reference output_blobs by hash instead of storing output inline.
+-- Move existing inline outputs with:
+--   python maintenance.py dedupe-results
+CREATE TABLE IF NOT EXISTS output_blobs (
+    hash CHAR(64) PRIMARY KEY,
+    body LONGBLOB NOT NULL,
+    raw_bytes BIGINT NOT NULL,
+    stored_bytes BIGINT NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE report_results
+    ADD COLUMN output_hash CHAR(64) AFTER output,
+    ADD INDEX idx_report_results_output_hash (output_hash);
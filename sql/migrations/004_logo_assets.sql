@@ -0,0 +1,34 @@
+-- Asset store for customer and template logos.
+-- Logos are validated once at upload and read through pre-scaled renditions.
+-- Move existing customers.images / command_templates.company_logo bytes with:
+--   python maintenance.py backfill-logo-assets
+-- (PDFs only show logos that have been moved to the asset store.)
+CREATE TABLE IF NOT EXISTS assets (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    hash CHAR(64) NOT NULL UNIQUE,
+    mime VARCHAR(50),
+    width INT,
+    height INT,
+    byte_size INT,
+    original LONGBLOB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS asset_renditions (
+    asset_id INT NOT NULL,
+    name VARCHAR(20) NOT NULL,
+    width INT,
+    height INT,
+    data MEDIUMBLOB NOT NULL,
+
+    PRIMARY KEY (asset_id, name),
+    FOREIGN KEY (asset_id) REFERENCES assets(id) ON DELETE CASCADE
+);
+
+ALTER TABLE customers
+    ADD COLUMN logo_asset_id INT AFTER images,
+    ADD FOREIGN KEY (logo_asset_id) REFERENCES assets(id) ON DELETE SET NULL;
+
+ALTER TABLE command_templates
+    ADD COLUMN logo_asset_id INT AFTER company_logo,
+    ADD FOREIGN KEY (logo_asset_id) REFERENCES assets(id) ON DELETE SET NULL;
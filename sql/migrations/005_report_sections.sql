@@ -0,0 +1,18 @@
+-- Section index for reports: which commands a report holds, their status and
+-- output sizes, readable without loading any output.
+-- Index reports created before this migration with:
+--   python maintenance.py index-reports
+CREATE TABLE IF NOT EXISTS report_sections (
+    report_id INT NOT NULL,
+    ordinal INT NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    text TEXT,
+    command TEXT,
+    status VARCHAR(20),
+    byte_size BIGINT NOT NULL DEFAULT 0,
+    line_count INT NOT NULL DEFAULT 0,
+    hash CHAR(64),
+
+    PRIMARY KEY (report_id, ordinal),
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
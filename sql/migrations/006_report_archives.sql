@@ -0,0 +1,23 @@
+-- Report archival.
+-- MySQL cannot partition tables that have (or are referenced by) foreign keys,
+-- so instead of monthly partitions old reports leave the hot tables: their
+-- results move into monthly archive files of report containers on local disk,
+-- indexed by report_archives. Report rows and section indexes stay.
+-- Archive with:
+--   python maintenance.py archive-reports
+ALTER TABLE customers
+    ADD COLUMN archive_after_days INT AFTER logo_asset_id;
+
+ALTER TABLE reports
+    ADD INDEX idx_reports_created_at (created_at),
+    ADD INDEX idx_reports_customer_created (customer_id, created_at);
+
+CREATE TABLE IF NOT EXISTS report_archives (
+    report_id INT PRIMARY KEY,
+    path VARCHAR(255) NOT NULL,
+    byte_offset BIGINT NOT NULL,
+    byte_length BIGINT NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
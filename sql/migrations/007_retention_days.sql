@@ -0,0 +1,5 @@
+-- Per-customer retention for the purge job.
+-- Delete expired reports with:
+--   python maintenance.py purge-reports --checkpoint purge.checkpoint
+ALTER TABLE customers
+    ADD COLUMN retention_days INT AFTER archive_after_days;
@@ -0,0 +1,11 @@
+-- AI summaries are generated once per report (on first render) and stored with
+-- the model and a hash of the report data they were generated from.
+CREATE TABLE IF NOT EXISTS report_summaries (
+    report_id INT PRIMARY KEY,
+    model VARCHAR(100) NOT NULL,
+    input_hash CHAR(64) NOT NULL,
+    summary JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
@@ -0,0 +1,5 @@
+-- Streamed reports are created before their sections are collected; completed
+-- is set by close_report, so a run that stopped part-way is not taken for a
+-- whole report. Existing and bulk-created reports are complete.
+ALTER TABLE reports
+    ADD COLUMN completed BOOLEAN NOT NULL DEFAULT TRUE AFTER ai_summary;
@@ -0,0 +1,173 @@
+-- SQLite schema (DB_BACKEND=sqlite), equivalent to fix_schema.sql.
+-- Applied automatically by db/sqlite_backend.py to an empty database.
+
+-- Image assets (logos), content-addressed, with pre-scaled PNG renditions
+CREATE TABLE assets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    hash CHAR(64) NOT NULL UNIQUE,
+    mime VARCHAR(50),
+    width INT,
+    height INT,
+    byte_size INT,
+    original BLOB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE asset_renditions (
+    asset_id INT NOT NULL,
+    name VARCHAR(20) NOT NULL,
+    width INT,
+    height INT,
+    data BLOB NOT NULL,
+
+    PRIMARY KEY (asset_id, name),
+    FOREIGN KEY (asset_id) REFERENCES assets(id) ON DELETE CASCADE
+);
+
+-- Customers
+CREATE TABLE customers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(255) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    jump_host TINYINT DEFAULT 0,
+    jump_host_ip VARCHAR(45),
+    jump_host_username VARCHAR(255),
+    jump_host_password VARCHAR(255),
+    jump_host_hostname VARCHAR(255),
+    device_type VARCHAR(100),
+    jump_port INT DEFAULT 22,
+    images BLOB,
+    logo_asset_id INT REFERENCES assets(id) ON DELETE SET NULL,
+    archive_after_days INT,
+    retention_days INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Devices
+CREATE TABLE devices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INT NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+    serial_number VARCHAR(50),
+    hostname VARCHAR(50),
+    device_type VARCHAR(100) NOT NULL,
+    device_model VARCHAR(255) NOT NULL,
+    device_ip VARCHAR(45) NOT NULL,
+    device_port INT DEFAULT 22,
+    username VARCHAR(255),
+    password VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Command Templates (description, command and manual_summary_table hold JSON text)
+CREATE TABLE command_templates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    command TEXT,
+    customer_id INT NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+    general_desc TEXT,
+    premade_report BOOLEAN DEFAULT 0,
+    manual_summary_desc TEXT,
+    manual_summary_table TEXT,
+    company_logo BLOB,
+    logo_asset_id INT REFERENCES assets(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    update_time TIMESTAMP
+);
+
+-- Reports
+CREATE TABLE reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    device_id INT NOT NULL REFERENCES devices(id) ON DELETE CASCADE,
+    customer_id INT NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+    template_id INT NOT NULL REFERENCES command_templates(id) ON DELETE CASCADE,
+    result BLOB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ai_summary BOOLEAN DEFAULT 0,
+    completed BOOLEAN NOT NULL DEFAULT 1
+);
+
+CREATE INDEX idx_reports_created_at ON reports (created_at);
+CREATE INDEX idx_reports_customer_created ON reports (customer_id, created_at);
+CREATE INDEX idx_reports_device ON reports (device_id);
+CREATE INDEX idx_reports_template ON reports (template_id);
+
+-- Command outputs, stored once per distinct content (SHA-256) with reference counts
+CREATE TABLE output_blobs (
+    hash CHAR(64) PRIMARY KEY,
+    body BLOB NOT NULL,
+    raw_bytes BIGINT NOT NULL,
+    stored_bytes BIGINT NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Report results (one row per header/command)
+CREATE TABLE report_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id INT NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    ordinal INT NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    text TEXT,
+    command TEXT,
+    description TEXT,
+    status VARCHAR(20),
+    output BLOB,
+    output_hash CHAR(64),
+    duration_ms INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE (report_id, ordinal)
+);
+
+CREATE INDEX idx_report_results_output_hash ON report_results (output_hash);
+
+-- Section index: per-section metadata and output sizes, written with the results
+CREATE TABLE report_sections (
+    report_id INT NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    ordinal INT NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    text TEXT,
+    command TEXT,
+    status VARCHAR(20),
+    byte_size BIGINT NOT NULL DEFAULT 0,
+    line_count INT NOT NULL DEFAULT 0,
+    hash CHAR(64),
+
+    PRIMARY KEY (report_id, ordinal)
+);
+
+-- Archived reports: where each report's container sits in its monthly archive file
+CREATE TABLE report_archives (
+    report_id INT PRIMARY KEY REFERENCES reports(id) ON DELETE CASCADE,
+    path VARCHAR(255) NOT NULL,
+    byte_offset BIGINT NOT NULL,
+    byte_length BIGINT NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- AI summaries, generated once per report and reused by every render
+CREATE TABLE report_summaries (
+    report_id INT PRIMARY KEY REFERENCES reports(id) ON DELETE CASCADE,
+    model VARCHAR(100) NOT NULL,
+    input_hash CHAR(64) NOT NULL,
+    summary TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Users (for authentication)
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    full_name VARCHAR(100),
+    email VARCHAR(100),
+    is_active BOOLEAN DEFAULT 1,
+    is_admin BOOLEAN DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_users_email ON users (email);
@@ -0,0 +1,125 @@
+"""
+AI Summary Input
+================
+Builds the report text sent to the LLM within a token budget.
+Commands that carry health data (routing engine, environment, alarms, version)
+are kept first and compacted; other commands contribute only lines that look
+like problems. Content that still exceeds the budget is split into chunks for
+map-reduce summarization (see ai_summary).
+"""
+
+import os
+import re
+
+# Estimated prompt tokens available for report data per request
+AI_INPUT_TOKEN_BUDGET = int(os.getenv('AI_INPUT_TOKEN_BUDGET', 3000))
+
+# Health commands by priority; each maps to a filter for the lines worth keeping (None keeps all)
+RELEVANT_COMMANDS = [
+    ("show chassis routing-engine", None),
+    ("show system alarms", None),
+    ("show chassis alarms", None),
+    ("show chassis environment", "environment"),
+    ("show version", re.compile(r"^(Hostname:|Model:|Junos:|JUNOS Software Release)")),
+    ("show system uptime", None),
+    ("show system storage", re.compile(r"\b(9\d|8\d|100)%|^Filesystem", re.I)),
+]
+
+# Lines from other commands that are kept because they point at a problem
+PROBLEM_LINE = re.compile(r"\b(error|fail(ed|ure)?|down|alarm|critical|major|minor|warning|absent|offline|exceed)", re.I)
+
+_SPACES = re.compile(r"[ \t]+")
+_DEGREES = re.compile(r"(\d+) degrees C")
+
+
+def _tokens(text):
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4
+
+
+def _compact(lines):
+    """Collapse runs of spaces and drop blank lines."""
+    return [_SPACES.sub(" ", line).strip() for line in lines if line.strip()]
+
+
+def _environment(lines):
+    """Keep every non-OK environment line; fold OK lines into per-class counts and the highest temperature."""
+    kept, ok_counts, current, max_temp = [], {}, "Other", None
+    for line in lines[1:]:
+        parts = line.split()
+        if not parts:
+            continue
+        if line[:1].strip():
+            current = parts[0]
+        if " OK" in line and not PROBLEM_LINE.search(line):
+            ok_counts[current] = ok_counts.get(current, 0) + 1
+            degrees = _DEGREES.search(line)
+            if degrees and (max_temp is None or int(degrees.group(1)) > max_temp):
+                max_temp = int(degrees.group(1))
+        else:
+            kept.append(line)
+    summary = ", ".join(f"{cls}: {count} OK" for cls, count in ok_counts.items())
+    if max_temp is not None:
+        summary += f" (highest temperature {max_temp} degrees C)"
+    return ([summary] if summary else []) + kept
+
+
+def _select(command, output, failed):
+    """Return (priority, lines) for one command, or None when it contributes nothing."""
+    lines = output.splitlines()
+    if failed:
+        return -1, _compact(lines)
+    for priority, (prefix, keep) in enumerate(RELEVANT_COMMANDS):
+        if command.startswith(prefix):
+            if keep == "environment":
+                lines = _environment(lines)
+            elif keep is not None:
+                lines = [line for line in lines if keep.search(line.strip())]
+            return priority, _compact(lines)
+    problems = [line for line in lines if PROBLEM_LINE.search(line)]
+    return (len(RELEVANT_COMMANDS), _compact(problems)) if problems else None
+
+
+def select_report_data(sections):
+    """Blocks of "### command" + kept lines: failed commands, then health commands, then the rest."""
+    selected = []
+    for position, section in enumerate(sections):
+        if section.get("type") == "Header" or not section.get("output"):
+            continue
+        command = (section.get("command") or "").strip()
+        failed = section.get("status") == "error"
+        picked = _select(command, section["output"], failed)
+        if picked and picked[1]:
+            priority, lines = picked
+            status = " (failed)" if failed else ""
+            selected.append((priority, position, [f"### {command}{status}"] + lines))
+    selected.sort(key=lambda item: (item[0], item[1]))
+    return [block for _, _, block in selected]
+
+
+def pack_lines(lines, budget=None):
+    """Split lines into chunks of at most `budget` estimated tokens (a longer single line is cut)."""
+    budget = budget or AI_INPUT_TOKEN_BUDGET
+    chunks, current, used = [], [], 0
+    for line in lines:
+        cost = _tokens(line) + 1
+        if cost > budget:
+            line, cost = line[:budget * 4], budget
+        if current and used + cost > budget:
+            chunks.append("\n".join(current))
+            current, used = [], 0
+        current.append(line)
+        used += cost
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def build_summary_input(sections, budget=None):
+    """
+    Return the report data for the LLM as a list of text chunks, each within
+    `budget` tokens (default AI_INPUT_TOKEN_BUDGET). One chunk is the normal case;
+    several mean the report needs map-reduce summarization.
+    """
+    lines = [line for block in select_report_data(sections) for line in block]
+    return pack_lines(lines, budget) or ["(no command output)"]
@@ -0,0 +1,89 @@
+"""
+AI Summary Worker
+=================
+Background thread pool that generates AI summaries off the Streamlit thread.
+Report creation enqueues the reports that asked for a summary; AI_CONCURRENCY
+workers process them through ai_summary, whose shared token buckets keep the
+whole pool within the provider's quotas.
+The queue is in memory; reports still missing a summary after a restart are
+picked up again by enqueue_missing_summaries() (or rendered synchronously).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from db.reports import get_report_by_id, get_reports_missing_summary
+from ai_summary import get_ai_summary
+
+AI_CONCURRENCY = int(os.getenv('AI_CONCURRENCY', 4))
+
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=AI_CONCURRENCY, thread_name_prefix="ai-summary")
+        return _executor
+
+
+def _run(report_id):
+    """Generate and store one report's summary; failures are logged and left for a later render."""
+    try:
+        report = get_report_by_id(report_id)
+        if report and report.get("ai_summary") == 1:
+            if get_ai_summary(report) is None:
+                print(f"AI summary for report {report_id} could not be generated")
+    except Exception as e:
+        print(f"AI summary worker failed for report {report_id}: {e}")
+    finally:
+        with _lock:
+            _pending.pop(report_id, None)
+
+
+def enqueue_summaries(report_ids):
+    """Queue summary generation for reports; ids already queued are skipped. Returns the number queued."""
+    executor = _get_executor()
+    queued = 0
+    for report_id in report_ids:
+        with _lock:
+            if report_id in _pending:
+                continue
+            _pending[report_id] = executor.submit(_run, report_id)
+        queued += 1
+    return queued
+
+
+def enqueue_missing_summaries(limit=1000):
+    """Queue every report that asked for an AI summary but has none stored (e.g. after a restart)."""
+    return enqueue_summaries(get_reports_missing_summary(limit))
+
+
+def pending_summaries():
+    """Number of summaries queued or in progress."""
+    with _lock:
+        return len(_pending)
+
+
+def summary_pending(report_id):
+    """Whether a summary for report_id is queued or in progress in this process."""
+    with _lock:
+        return report_id in _pending
+
+
+def wait_for_summary(report_id, timeout=None):
+    """Block until a queued summary for report_id finishes (or timeout); no-op if none is queued."""
+    with _lock:
+        future = _pending.get(report_id)
+    if future is not None:
+        wait([future], timeout=timeout)
+
+
+def wait_for_all(timeout=None):
+    """Block until every queued summary has finished (or timeout)."""
+    with _lock:
+        futures = list(_pending.values())
+    wait(futures, timeout=timeout)
@@ -0,0 +1,46 @@
+"""
+Test configuration
+==================
+Runs the db layer on the process-wide in-memory SQLite database (see
+db.sqlite_backend). Configuration is read at import time, so the environment
+is set before any app module is imported.
+"""
+
+import os
+import sys
+import tempfile
+from itertools import count
+
+os.environ.update({
+    "DB_BACKEND": "sqlite",
+    "DB_SQLITE_PATH": ":memory:",
+    "PDF_CACHE_DIR": tempfile.mkdtemp(prefix="pdf_cache_"),
+    "REPORT_ARCHIVE_DIR": tempfile.mkdtemp(prefix="archives_"),
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+_names = count()
+
+
+@pytest.fixture
+def owner():
+    """A fresh customer with one device and one template: {"customer_id", "device_id", "template_id"}."""
+    from db.customer import create_customer
+    from db.devices import create_device
+    from db.templates import create_template
+    index = next(_names)
+    customer_id = create_customer(f"Customer {index}", "test@example.com", 0)
+    template_id = create_template(f"Template {index}", "[]", "[]", customer_id, "Test template", False)
+    device_id = create_device(customer_id, f"SN{index:05d}", f"router-{index}", "Juniper", "MX480", "192.0.2.1", 22, "u", "p")
+    return {"customer_id": customer_id, "device_id": device_id, "template_id": template_id}
+
+
+def command(cmd, output, status="success", description=""):
+    """A Command result entry as collected from a device."""
+    return {"type": "Command", "command": cmd, "description": description, "output": output, "status": status}
+
+
+def header(text):
+    return {"type": "Header", "text": text, "status": "success"}
@@ -0,0 +1,136 @@
+"""AI summaries: rate limiting, retries and stored summaries (against benchmarks/stub_llm.py)."""
+
+import json
+import time
+import pytest
+
+pytest.importorskip("groq")
+
+import ai_summary
+from ai_summary import TokenBucket, get_ai_summary, summary_model
+from benchmarks import junos_samples
+from db.reports import create_reports, get_report_by_id, get_report_summary, save_report_summary
+
+
+def _summary_report(owner):
+    report_id = create_reports([dict(owner, results=junos_samples.fleet_report(), ai_summary=1)])[0]
+    return get_report_by_id(report_id)
+
+
+def _elapsed(fn):
+    started = time.monotonic()
+    fn()
+    return time.monotonic() - started
+
+
+def test_bucket_throttles_to_its_rate():
+    bucket = TokenBucket(rate=20, capacity=1)
+    elapsed = _elapsed(lambda: [bucket.acquire() for _ in range(5)])
+    assert 0.18 <= elapsed < 1
+
+
+def test_bucket_allows_a_burst_up_to_capacity():
+    bucket = TokenBucket(rate=1, capacity=5)
+    assert _elapsed(lambda: [bucket.acquire() for _ in range(5)]) < 0.1
+
+
+def test_amount_over_capacity_is_paid_back():
+    bucket = TokenBucket(rate=100, capacity=10)
+    # A full bucket lets the large request through, 40 tokens in debt
+    assert _elapsed(lambda: bucket.acquire(50)) < 0.05
+    assert 0.35 <= _elapsed(lambda: bucket.acquire(1)) < 1
+
+
+def test_stored_summary_is_reused_only_for_the_same_input(owner, monkeypatch):
+    monkeypatch.setattr(ai_summary, "AI_SUMMARY_MODE", "local")
+    report = _summary_report(owner)
+    summary = get_ai_summary(report)
+    stored = get_report_summary(report["id"])
+    assert summary["summary_table"]["Device"] == "edge-rtr-01"
+
+    save_report_summary(report["id"], summary_model(), stored["input_hash"], {"summary_table": {}, "narrative_summary": "kept"})
+    assert get_ai_summary(report)["narrative_summary"] == "kept"
+
+    save_report_summary(report["id"], summary_model(), "0" * 64, {"summary_table": {}, "narrative_summary": "stale"})
+    assert get_ai_summary(report) == summary
+    assert get_report_summary(report["id"])["input_hash"] == stored["input_hash"]
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Stub LLM server the Groq client is pointed at, with fast rate limits; yields its StubLLM."""
+    from benchmarks.stub_llm import start_server
+    server, stub = start_server(rpm=10000)
+    monkeypatch.setenv("GROQ_API_KEY", "stub")
+    monkeypatch.setenv("GROQ_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(ai_summary, "AI_SUMMARY_MODE", "hybrid")
+    monkeypatch.setattr(ai_summary, "request_bucket", TokenBucket(1000, 10))
+    monkeypatch.setattr(ai_summary, "token_bucket", TokenBucket(10 ** 9, 10 ** 9))
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+def test_rate_limited_request_is_retried(stub):
+    stub.fail_first = 2
+    reply = ai_summary.request_summary("Hostname: r1")
+    assert json.loads(reply)["summary_table"]["Device"] == "stub-router"
+    assert stub.counts == {"ok": 1, "rate_limited": 2, "errors": 0}
+
+
+def test_unavailable_request_is_retried(stub):
+    stub.fail_first, stub.fail_status = 1, 503
+    assert ai_summary.request_summary("Hostname: r1")
+    assert stub.counts == {"ok": 1, "rate_limited": 0, "errors": 1}
+
+
+def test_retries_stop_after_the_limit(stub, monkeypatch):
+    monkeypatch.setattr(ai_summary, "AI_MAX_RETRIES", 2)
+    stub.fail_first = 10
+    with pytest.raises(Exception):
+        ai_summary.request_summary("Hostname: r1")
+    assert stub.counts["rate_limited"] == 3 and stub.counts["ok"] == 0
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.fail_first, stub.fail_status = 1, 400
+    with pytest.raises(Exception):
+        ai_summary.request_summary("Hostname: r1")
+    assert len(stub.prompts) == 1
+
+
+def test_requests_wait_for_the_request_bucket(stub, monkeypatch):
+    monkeypatch.setattr(ai_summary, "request_bucket", TokenBucket(rate=10, capacity=1))
+    elapsed = _elapsed(lambda: [ai_summary.request_summary("Hostname: r1") for _ in range(4)])
+    assert elapsed >= 0.28
+    assert stub.counts["ok"] == 4
+
+
+def test_large_prompts_wait_for_the_token_bucket(stub, monkeypatch):
+    monkeypatch.setattr(ai_summary, "AI_MAX_OUTPUT_TOKENS", 0)
+    monkeypatch.setattr(ai_summary, "token_bucket", TokenBucket(rate=2000, capacity=500))
+    # Each prompt is charged about 1000 tokens, twice the bucket's capacity
+    elapsed = _elapsed(lambda: [ai_summary.request_summary("x" * 4000) for _ in range(3)])
+    assert elapsed >= 0.9
+
+
+def test_worker_stores_one_summary_per_report(owner, stub):
+    from summary_worker import enqueue_summaries, wait_for_all
+    reports = [_summary_report(owner) for _ in range(3)]
+    report_ids = [report["id"] for report in reports]
+
+    enqueue_summaries(report_ids + report_ids)
+    wait_for_all(timeout=30)
+    assert stub.counts["ok"] == 3
+    for report_id in report_ids:
+        stored = get_report_summary(report_id)
+        assert stored["model"] == summary_model()
+        # Parsed fields override the model's in hybrid mode
+        assert stored["summary"]["summary_table"]["Device"] == "edge-rtr-01"
+        assert stored["summary"]["field_sources"]["Device"] == "parsed"
+
+    # Stored summaries are reused, not requested again
+    enqueue_summaries(report_ids)
+    wait_for_all(timeout=30)
+    assert get_ai_summary(reports[0])["narrative_summary"].startswith("Stub summary")
+    assert stub.counts["ok"] == 3
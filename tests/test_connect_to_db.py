@@ -0,0 +1,53 @@
+"""Replica lag checks in db.connect_to_db."""
+
+from mysql.connector import Error, errorcode
+from db import connect_to_db
+
+
+class _Cursor:
+    def __init__(self, responses):
+        self.responses = responses
+        self.row = None
+
+    def execute(self, sql):
+        response = self.responses[sql]
+        if isinstance(response, Exception):
+            raise response
+        self.row = response
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class _Conn:
+    def __init__(self, responses):
+        self.responses = responses
+
+    def cursor(self, dictionary=False):
+        return _Cursor(self.responses)
+
+
+def test_replica_lag():
+    assert connect_to_db._replica_lag(_Conn({"SHOW REPLICA STATUS": {"Seconds_Behind_Source": 3}})) == 3.0
+    assert connect_to_db._replica_lag(_Conn({"SHOW REPLICA STATUS": {"Seconds_Behind_Source": None}})) is None
+    assert connect_to_db._replica_lag(_Conn({"SHOW REPLICA STATUS": None})) == 0
+
+
+def test_replica_lag_falls_back_to_slave_status():
+    conn = _Conn({
+        "SHOW REPLICA STATUS": Error(msg="syntax", errno=errorcode.ER_PARSE_ERROR),
+        "SHOW SLAVE STATUS": {"Seconds_Behind_Master": 7},
+    })
+    assert connect_to_db._replica_lag(conn) == 7.0
+
+
+def test_missing_privilege_is_logged_once(capsys):
+    denied = Error(msg="Access denied; you need the REPLICATION CLIENT privilege",
+                   errno=errorcode.ER_SPECIFIC_ACCESS_DENIED_ERROR)
+    conn = _Conn({"SHOW REPLICA STATUS": denied, "SHOW SLAVE STATUS": denied})
+    assert connect_to_db._replica_lag(conn, "replica9") == 0
+    assert connect_to_db._replica_lag(conn, "replica9") == 0
+    assert capsys.readouterr().out.count("REPLICATION CLIENT") == 1
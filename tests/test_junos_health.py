@@ -0,0 +1,173 @@
+"""Rule-based parsing of Junos health command outputs."""
+
+from junos_health import (
+    parse_version, parse_routing_engine, parse_environment, parse_alarms,
+    extract_health, local_summary, collect_health_outputs,
+)
+
+SHOW_VERSION = """Hostname: edge-rtr-01
+Model: mx480
+Junos: 21.4R3-S5.4
+JUNOS OS Kernel 64-bit  [20230721.2a5d8b4_builder_stable_12_214]
+JUNOS Routing Software Suite [20230816.112233_builder_junos_214_r3_s5]
+"""
+
+SHOW_VERSION_LEGACY = """Hostname: ex-access-3
+Model: ex4200-48t
+JUNOS Base OS boot [12.3R12.4]
+JUNOS Software Release [12.3R12.4]
+"""
+
+# Dual RE, backup listed first
+SHOW_ROUTING_ENGINE = """Routing Engine status:
+  Slot 0:
+    Current state                  Backup
+    Temperature                 35 degrees C / 95 degrees F
+    Memory utilization          12 percent
+    5 sec CPU utilization:
+      Idle                      99 percent
+    Uptime                         12 days, 1 hour, 2 minutes, 3 seconds
+  Slot 1:
+    Current state                  Master
+    Election priority              Master (default)
+    Temperature                 38 degrees C / 100 degrees F
+    CPU temperature             44 degrees C / 111 degrees F
+    DRAM                      32768 MB (32768 MB installed)
+    Memory utilization          21 percent
+    5 sec CPU utilization:
+      User                       3 percent
+      Background                 0 percent
+      Kernel                     4 percent
+      Interrupt                  0 percent
+      Idle                      93 percent
+    Model                          RE-S-X6-64G
+    Start time                     2026-08-20 04:12:09 UTC
+    Uptime                         60 days, 3 hours, 41 minutes, 2 seconds
+"""
+
+# MX480 with two of four PEM slots populated
+SHOW_ENVIRONMENT = """Class Item                           Status     Measurement
+Temp  PEM 0                          OK         40 degrees C / 104 degrees F
+      PEM 1                          OK         41 degrees C / 105 degrees F
+      PEM 2                          Absent
+      PEM 3                          Absent
+      Routing Engine 0               OK         38 degrees C / 100 degrees F
+      Routing Engine 0 CPU           OK         44 degrees C / 111 degrees F
+      Routing Engine 1               Absent
+      CB 0 Intake                    OK         33 degrees C / 91 degrees F
+      FPC 0 Intake                   OK         36 degrees C / 96 degrees F
+      FPC 0 Exhaust A                OK         52 degrees C / 125 degrees F
+Fans  Top Rear Fan                   OK         Spinning at normal speed
+      Bottom Rear Fan                OK         Spinning at normal speed
+      Top Middle Fan                 OK         Spinning at normal speed
+Power PEM 0                          OK
+      PEM 1                          OK
+      PEM 2                          Absent
+      PEM 3                          Absent
+"""
+
+# EX switch: one supply failed, fan trays reported as Present
+SHOW_ENVIRONMENT_FAULT = """Class Item                           Status     Measurement
+Power FPC 0 Power Supply 0           OK
+      FPC 0 Power Supply 1           Failed
+Temp  FPC 0 GEPHY Front Left         OK         29 degrees C / 84 degrees F
+      FPC 0 Maxim Sensor             OK         37 degrees C / 98 degrees F
+Fans  FPC 0 Fan Tray 0               Present
+      FPC 0 Fan Tray 1               Present
+"""
+
+SHOW_ENVIRONMENT_CHECK = """Class Item                           Status     Measurement
+Power PEM 0                          OK
+      PEM 1                          Check
+Fans  Fan Tray 0 Fan 1               OK         Spinning at normal speed
+"""
+
+SHOW_ALARMS = """2 alarms currently active
+Alarm time               Class  Description
+2026-10-01 03:12:01 UTC  Major  PEM 1 Not OK
+2026-10-01 03:12:01 UTC  Minor  Rescue configuration is not set
+"""
+
+
+def test_parse_version():
+    assert parse_version(SHOW_VERSION) == {"Device": "edge-rtr-01", "Model": "mx480", "OS_version": "21.4R3-S5.4"}
+    assert parse_version(SHOW_VERSION_LEGACY)["OS_version"] == "12.3R12.4"
+
+
+def test_parse_routing_engine_uses_master():
+    assert parse_routing_engine(SHOW_ROUTING_ENGINE) == {
+        "CPU_usage": "7%",
+        "Memory_usage": "21%",
+        "Temperature": "38 C",
+        "Uptime": "60 days, 3 hours, 41 minutes, 2 seconds",
+    }
+
+
+def test_absent_slots_are_not_failures():
+    fields, failed, checks = parse_environment(SHOW_ENVIRONMENT)
+    assert fields == {"Power_status": "OK (2 supplies)", "Temperature": "52 C"}
+    assert failed == [] and checks == []
+
+
+def test_failed_supply_and_present_fans():
+    fields, failed, checks = parse_environment(SHOW_ENVIRONMENT_FAULT)
+    assert fields["Power_status"] == "Fault: Power FPC 0 Power Supply 1"
+    assert failed == ["Power FPC 0 Power Supply 1"]
+    assert checks == []
+
+
+def test_check_status_needs_attention():
+    fields, failed, checks = parse_environment(SHOW_ENVIRONMENT_CHECK)
+    assert fields["Power_status"] == "Check: Power PEM 1"
+    assert failed == [] and checks == ["Power PEM 1"]
+
+
+def test_item_filling_its_column():
+    fields, failed, _ = parse_environment("Class Item Status Measurement\nPower FPC 0 Power Supply 0 Absent\n      FPC 0 Power Supply 1 OK\n")
+    assert fields["Power_status"] == "OK (1 supplies)" and failed == []
+
+
+def test_parse_alarms():
+    assert parse_alarms(SHOW_ALARMS) == ("2 active (1 major, 1 minor)", ["Major", "Minor"])
+    assert parse_alarms("No alarms currently active") == ("None", [])
+    assert parse_alarms("error: command is not valid") == (None, [])
+
+
+def _health(environment, alarms="No alarms currently active"):
+    return extract_health({
+        "show version": SHOW_VERSION,
+        "show chassis routing-engine": SHOW_ROUTING_ENGINE,
+        "show chassis environment": environment,
+        "show system alarms": alarms,
+    })
+
+
+def test_overall_status():
+    healthy = _health(SHOW_ENVIRONMENT)
+    assert healthy["Overall_status"] == "Healthy"
+    # The routing engine's temperature wins over the chassis maximum
+    assert healthy["Temperature"] == "38 C"
+    assert _health(SHOW_ENVIRONMENT_CHECK)["Overall_status"] == "Warning"
+    assert _health(SHOW_ENVIRONMENT_FAULT)["Overall_status"] == "Critical"
+    assert _health(SHOW_ENVIRONMENT, SHOW_ALARMS)["Overall_status"] == "Critical"
+
+
+def test_status_needs_power_and_alarms():
+    assert "Overall_status" not in extract_health({"show version": SHOW_VERSION})
+
+
+def test_local_summary_fills_missing_fields():
+    summary = local_summary(parse_version(SHOW_VERSION))
+    assert summary["summary_table"]["Power_status"] == "Not Reported"
+    assert summary["narrative_summary"].startswith("edge-rtr-01 (mx480) runs Junos 21.4R3-S5.4.")
+
+
+def test_collect_health_outputs():
+    sections = [
+        {"type": "Command", "command": "show version | no-more", "output": SHOW_VERSION, "status": "success"},
+        {"type": "Command", "command": "show system alarms", "output": "error: timeout", "status": "error"},
+        {"type": "Command", "command": "show route", "output": "inet.0: 1 destinations", "status": "success"},
+    ]
+    outputs = {}
+    assert list(collect_health_outputs(sections, outputs)) == sections
+    assert outputs == {"show version": SHOW_VERSION + "\n"}
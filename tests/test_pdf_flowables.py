@@ -0,0 +1,62 @@
+"""CLIOutput layout: wrapping and page splits."""
+
+from io import BytesIO
+import pytest
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+from reportlab.lib.styles import getSampleStyleSheet
+from pdf_flowables import CLIOutput, wrap_cli_lines
+
+
+def _build(story):
+    """Lay out story on A4 with gen_PDF's margins; returns the page count."""
+    doc = SimpleDocTemplate(BytesIO(), pagesize=A4, rightMargin=2 * cm, leftMargin=2 * cm,
+                            topMargin=2 * cm, bottomMargin=2 * cm)
+    doc.build(story)
+    return doc.page
+
+
+def _output(lines):
+    return "\n".join(f"line {i}" for i in range(lines))
+
+
+def test_wrap_cli_lines():
+    assert wrap_cli_lines("abcdef\r\n\tx", 4) == ["abcd", "ef", "    ", "    ", "x"]
+
+
+@pytest.mark.parametrize("lines", [1, 78, 79, 80, 5000])
+def test_output_near_page_height_builds(lines):
+    # 79 lines fill the frame with the top padding but not the bottom one
+    assert _build([CLIOutput(_output(lines), 16 * cm)]) >= 1
+
+
+def test_exact_fit_splits_off_a_line():
+    output = CLIOutput(_output(79), 16 * cm)
+    _, height = output.wrap(16 * cm, 716.5)
+    assert height > 716.5
+    first, rest = output.split(16 * cm, 716.5)
+    assert (first.start, first.end, first.bottom) == (0, 78, False)
+    assert (rest.start, rest.end, rest.top) == (78, 79, False)
+
+
+def test_split_keeps_every_line_once():
+    output = CLIOutput(_output(200), 16 * cm)
+    parts = [output]
+    while parts[-1].wrap(16 * cm, 300)[1] > 300:
+        parts[-1:] = parts[-1].split(16 * cm, 300)
+    assert [line for part in parts for line in part.lines[part.start:part.end]] == output.lines
+    assert parts[0].top and parts[-1].bottom
+
+
+def test_split_head():
+    output = CLIOutput(_output(50), 16 * cm)
+    head, rest = output.split_head(10)
+    assert (head.end, head.bottom, rest.start, rest.top) == (10, False, 10, False)
+    assert output.split_head(50) == [output]
+
+
+def test_description_with_long_output():
+    styles = getSampleStyleSheet()
+    head, *rest = CLIOutput(_output(500), 16 * cm).split_head(10)
+    assert _build([Paragraph("Description", styles["Normal"]), head, *rest]) > 1
@@ -0,0 +1,271 @@
+"""Report storage on the SQLite backend: bulk and streamed writes, sections, dedup and deletes."""
+
+from io import BytesIO
+import pytest
+from conftest import command, header
+from db.connect_to_db import connect_to_db
+from db.reports import (
+    create_reports, open_report, append_report_result, close_report,
+    get_report_sections, get_report_section, get_report_section_index,
+    get_section_summaries, delete_reports, export_report,
+)
+from db.report_format import pack_report, read_report, write_report, is_container, ReportContainer
+from db.customer import delete_customers
+
+
+def _report(owner, results, ai_summary=0):
+    return dict(owner, results=results, ai_summary=ai_summary)
+
+
+def _ref_counts(hashes):
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    counts = {}
+    for h in hashes:
+        cursor.execute("SELECT ref_count FROM output_blobs WHERE hash = %s", (h,))
+        row = cursor.fetchone()
+        counts[h] = row[0] if row else None
+    conn.close()
+    return counts
+
+
+def _hashes(report_id):
+    return [entry["hash"] for entry in get_report_section_index(report_id) if entry["hash"]]
+
+
+RESULTS = [
+    header("Chassis"),
+    command("show version", "Hostname: r1\nJunos: 21.4R3-S5", description="Software version"),
+    command("show system alarms", "error: timeout", status="error"),
+]
+
+
+def test_create_reports_round_trip(owner):
+    report_ids = create_reports([_report(owner, RESULTS), _report(owner, RESULTS[1:])])
+    assert len(report_ids) == 2
+
+    sections = get_report_sections(report_ids[0])
+    assert [s["type"] for s in sections] == ["Header", "Command", "Command"]
+    assert sections[1]["output"] == RESULTS[1]["output"]
+    assert sections[1]["description"] == "Software version"
+    assert sections[2]["status"] == "error"
+    assert get_report_sections(report_ids[1]) == sections[1:]
+
+    without_output = get_report_sections(report_ids[0], include_output=False)
+    assert all("output" not in s or s["output"] == "" for s in without_output)
+    assert get_report_section(report_ids[0], 1)["command"] == "show version"
+    assert get_report_section(report_ids[0], 9) is None
+
+
+def test_create_reports_with_gaps_in_ids(owner):
+    # Emulate auto_increment_increment = 2 (multi-primary setups): ids are not consecutive
+    conn = connect_to_db()
+    conn.cursor().execute("""
+        CREATE TRIGGER reports_id_gap AFTER INSERT ON reports
+        BEGIN
+            INSERT INTO reports (device_id, customer_id, template_id) VALUES (NEW.device_id, NEW.customer_id, NEW.template_id);
+            DELETE FROM reports WHERE id = NEW.id + 1;
+        END
+    """)
+    try:
+        outputs = [f"Hostname: gap-{i}" for i in range(3)]
+        report_ids = create_reports([_report(owner, [command("show version", output)]) for output in outputs])
+    finally:
+        conn.cursor().execute("DROP TRIGGER reports_id_gap")
+        conn.close()
+    assert report_ids[1] - report_ids[0] == 2
+    assert [get_report_sections(report_id)[0]["output"] for report_id in report_ids] == outputs
+
+
+def test_create_reports_empty():
+    assert create_reports([]) == []
+
+
+def test_streamed_report(owner):
+    handle = open_report(owner["device_id"], owner["customer_id"], owner["template_id"])
+    for entry in RESULTS:
+        append_report_result(handle, entry, duration_ms=12)
+    report_id = close_report(handle)
+
+    sections = get_report_sections(report_id)
+    assert [s.get("command") for s in sections] == [None, "show version", "show system alarms"]
+    assert sections[1]["duration_ms"] == 12
+    assert sections[1]["output"] == RESULTS[1]["output"]
+
+
+def test_section_index_and_summaries(owner):
+    report_id = create_reports([_report(owner, RESULTS)])[0]
+
+    index = get_report_section_index(report_id)
+    assert [entry["ordinal"] for entry in index] == [0, 1, 2]
+    assert index[1]["byte_size"] == len(RESULTS[1]["output"].encode("utf-8"))
+    assert index[1]["line_count"] == 2
+    assert index[0]["hash"] is None and index[1]["hash"]
+
+    summaries = get_section_summaries([report_id, report_id + 1000])
+    assert summaries == {report_id: {
+        "sections": 3,
+        "commands": 2,
+        "errors": 1,
+        "output_bytes": sum(len(e.get("output", "").encode("utf-8")) for e in RESULTS),
+    }}
+    assert get_section_summaries([]) == {}
+
+
+def test_identical_outputs_share_one_blob(owner):
+    shared = command("show version", "Hostname: r1\n" * 100)
+    report_ids = create_reports([_report(owner, [shared, shared]), _report(owner, [shared])])
+    (blob_hash,) = set(_hashes(report_ids[0]))
+    assert _ref_counts([blob_hash]) == {blob_hash: 3}
+
+    handle = open_report(owner["device_id"], owner["customer_id"], owner["template_id"])
+    append_report_result(handle, shared)
+    streamed_id = close_report(handle)
+    assert _ref_counts([blob_hash]) == {blob_hash: 4}
+
+    assert delete_reports([report_ids[0]]) == 1
+    assert _ref_counts([blob_hash]) == {blob_hash: 2}
+    assert delete_reports([report_ids[1], streamed_id]) == 2
+    assert _ref_counts([blob_hash]) == {blob_hash: None}
+
+
+def test_delete_reports(owner):
+    report_ids = create_reports([_report(owner, RESULTS), _report(owner, RESULTS)])
+    assert delete_reports([]) == 0
+    assert delete_reports(report_ids + [report_ids[-1] + 1000]) == 2
+    assert get_report_sections(report_ids[0]) == []
+    assert get_section_summaries(report_ids) == {}
+
+
+def test_delete_customers_cascades(owner):
+    unique = command("show configuration", "set system host-name only-here\n" * 20)
+    report_ids = create_reports([_report(owner, RESULTS + [unique])] * 3)
+    unique_hash = _hashes(report_ids[0])[-1]
+    assert _ref_counts([unique_hash]) == {unique_hash: 3}
+
+    counts = delete_customers([owner["customer_id"]])
+    assert counts == {"reports": 3, "templates": 1, "devices": 1, "customers": 1}
+    assert _ref_counts([unique_hash]) == {unique_hash: None}
+    assert delete_customers([])["customers"] == 0
+
+
+def test_container_round_trip():
+    data = pack_report(RESULTS)
+    assert is_container(data)
+    assert list(read_report(data)) == RESULTS
+
+    container = ReportContainer(data)
+    assert len(container) == 3
+    assert container.output(0) is None
+    assert container.output(1) == RESULTS[1]["output"]
+    assert "output" not in container.section(1, include_output=False)
+
+
+def test_container_embedded_in_file():
+    archive = BytesIO(b"previous report bytes")
+    offset = archive.tell()
+    length = write_report(iter(RESULTS), archive)
+    archive.write(b"next report bytes")
+
+    container = ReportContainer(archive, offset, length)
+    assert list(container.sections()) == RESULTS
+
+
+def test_export_report_matches_stored_sections(owner):
+    report_id = create_reports([_report(owner, RESULTS)])[0]
+    buffer = BytesIO()
+    export_report(report_id, buffer)
+    assert list(read_report(buffer.getvalue())) == get_report_sections(report_id)
+
+
+def test_legacy_json_is_readable():
+    assert list(read_report('[{"type": "Command", "command": "show version", "output": "x"}, 5]')) == [
+        {"type": "Command", "command": "show version", "output": "x"}
+    ]
+    assert list(read_report("not json")) == []
+
+
+def test_deletes_remove_cached_pdfs(owner):
+    from pdf_cache import put_cached_pdf, get_cached_pdf
+    from db.devices import create_device, delete_devices
+    from db.templates import create_template, delete_templates
+    template_id = create_template("Cache template", "[]", "[]", owner["customer_id"], "", False)
+    device_id = create_device(owner["customer_id"], "SN-CACHE", "cache-1", "Juniper", "MX480", "192.0.2.2", 22, "u", "p")
+    single, by_customer = create_reports([_report(owner, RESULTS)] * 2)
+    by_template = create_reports([_report(dict(owner, template_id=template_id), RESULTS)])[0]
+    by_device = create_reports([_report(dict(owner, device_id=device_id), RESULTS)])[0]
+    report_ids = (single, by_template, by_device, by_customer)
+    for report_id in report_ids:
+        put_cached_pdf(report_id, "key", b"%PDF")
+
+    def cached():
+        return [report_id for report_id in report_ids if get_cached_pdf(report_id, "key")]
+
+    delete_reports([single])
+    assert cached() == [by_template, by_device, by_customer]
+    delete_templates([template_id])
+    assert cached() == [by_device, by_customer]
+    delete_devices([device_id])
+    assert cached() == [by_customer]
+    delete_customers([owner["customer_id"]])
+    assert cached() == []
+
+
+def test_streamed_report_completion(owner):
+    from db.reports import abort_report, get_report_by_id
+    handle = open_report(owner["device_id"], owner["customer_id"], owner["template_id"])
+    append_report_result(handle, RESULTS[1])
+    assert get_report_by_id(handle["report_id"])["completed"] == 0
+    report_id = close_report(handle)
+    assert get_report_by_id(report_id)["completed"] == 1
+
+    failed = open_report(owner["device_id"], owner["customer_id"], owner["template_id"])
+    append_report_result(failed, command("show log messages", "Oct 19 kernel: something unique\n" * 30))
+    (blob_hash,) = _hashes(failed["report_id"])
+    abort_report(failed)
+    assert get_report_by_id(failed["report_id"]) is None
+    assert _ref_counts([blob_hash]) == {blob_hash: None}
+
+
+def test_bulk_reports_are_completed(owner):
+    from db.reports import get_report_by_id
+    report_id = create_reports([_report(owner, RESULTS)])[0]
+    assert get_report_by_id(report_id)["completed"] == 1
+
+
+class _BlobDeletedAfterSelect:
+    """Cursor that deletes the blobs it just found, as a concurrent release would."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.found = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(sql, params)
+        if sql.startswith("SELECT hash FROM output_blobs"):
+            self.found = self._cursor.fetchall()
+            other = connect_to_db()
+            for (h,) in self.found:
+                other.cursor().execute("DELETE FROM output_blobs WHERE hash = %s", (h,))
+            other.close()
+
+    def fetchall(self):
+        rows, self.found = self.found, None
+        return rows if rows is not None else self._cursor.fetchall()
+
+
+def test_blob_deleted_after_lookup_is_stored_again(owner):
+    from db.reports import _store_output_blobs
+    output = "show chassis hardware\\n" * 50
+    report_id = create_reports([_report(owner, [command("show chassis hardware", output)])])[0]
+    (blob_hash,) = _hashes(report_id)
+
+    conn = connect_to_db()
+    cursor = _BlobDeletedAfterSelect(conn.cursor())
+    hashes = _store_output_blobs(cursor, [output, output], 1 << 20)
+    conn.close()
+    assert cursor.found is None and hashes == [blob_hash, blob_hash]
+    assert _ref_counts([blob_hash]) == {blob_hash: 2}
@@ -0,0 +1,60 @@
+"""Per-customer retention settings and the purge job."""
+
+import pytest
+from conftest import command
+from db.connect_to_db import connect_to_db
+from db.customer import set_retention_policy
+from db.reports import create_reports, purge_expired_reports, get_report_sections
+import pdf_cache
+
+
+def _policy(customer_id):
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT archive_after_days, retention_days FROM customers WHERE id = %s", (customer_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return row
+
+
+def _age(report_id, days):
+    conn = connect_to_db()
+    conn.cursor().execute(
+        "UPDATE reports SET created_at = datetime('now', %s) WHERE id = %s", (f"-{days} days", report_id)
+    )
+    conn.close()
+
+
+def test_set_retention_updates_only_given_values(owner):
+    customer_id = owner["customer_id"]
+    assert set_retention_policy(customer_id, archive_after_days=90, retention_days=730) == 1
+    set_retention_policy(customer_id, retention_days=30)
+    assert _policy(customer_id) == (90, 30)
+    set_retention_policy(customer_id, archive_after_days=60)
+    assert _policy(customer_id) == (60, 30)
+    assert set_retention_policy(customer_id) == 0
+    assert _policy(customer_id) == (60, 30)
+
+
+def test_set_retention_clear(owner):
+    customer_id = owner["customer_id"]
+    set_retention_policy(customer_id, archive_after_days=90, retention_days=730)
+    set_retention_policy(customer_id, clear=("archive_after_days",))
+    assert _policy(customer_id) == (None, 730)
+    with pytest.raises(ValueError):
+        set_retention_policy(customer_id, clear=("keep_forever",))
+
+
+def test_purge_deletes_expired_reports_and_their_pdfs(owner):
+    set_retention_policy(owner["customer_id"], retention_days=30)
+    expired, recent = create_reports([dict(owner, results=[command("show version", "x")])] * 2)
+    _age(expired, 40)
+    for report_id in (expired, recent):
+        pdf_cache.put_cached_pdf(report_id, "key", b"%PDF")
+
+    stats = purge_expired_reports(sleep_seconds=0)
+    assert stats["deleted"] == 1
+    assert get_report_sections(expired) == []
+    assert get_report_sections(recent) != []
+    assert pdf_cache.get_cached_pdf(expired, "key") is None
+    assert pdf_cache.get_cached_pdf(recent, "key") == b"%PDF"
@@ -1,8 +1,7 @@
 """Customer dialog components"""
 import re
 import streamlit as st
-from db.customer import create_customer, update_customer, delete_customer, get_customer_by_id
-from db.connect_to_db import connect_to_db
+from db.customer import create_customer, update_customer, delete_customers, get_customers_by_ids, get_dependency_counts
 from ui.utils import create_dismiss_handler
 
 
@@ -95,17 +94,8 @@ def delete_customer_dialog(customer_ids):
     """Delete customer dialog"""
 
     # Check for dependencies
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    has_dependencies = False
-
-    for cust_id in customer_ids:
-        cursor.execute("SELECT COUNT(*) FROM command_templates WHERE customer_id = %s", (cust_id,))
-        if cursor.fetchone()[0] > 0:
-            has_dependencies = True
-            break
-
-    conn.close()
+    dependency_counts = get_dependency_counts(customer_ids)
+    has_dependencies = any(counts["templates"] > 0 for counts in dependency_counts.values())
 
     if has_dependencies:
         st.error("⚠️ Cannot delete customer(s) with existing templates, devices, or reports. Please delete those first.")
@@ -125,9 +115,11 @@ def delete_customer_dialog(customer_ids):
     with col2:
         if st.button("✅ Yes, Delete", key="confirm_delete"):
             try:
-                for cust_id in customer_ids:
-                    delete_customer(cust_id)
-                st.success(f"Deleted {len(customer_ids)} customer(s)")
+                deleted = delete_customers(customer_ids)
+                st.success(
+                    f"Deleted {deleted['customers']} customer(s), {deleted['devices']} device(s) "
+                    f"and {deleted['reports']} report(s)"
+                )
                 st.session_state.show_delete_customer = False
                 st.rerun()
             except Exception as e:
@@ -144,10 +136,11 @@ def update_customer_dialog(selected_customers):
 
     with st.form("update_customers_form", clear_on_submit=False):
         updated_data = []
+        full_customers = get_customers_by_ids(selected_customers["Customer ID"].tolist())
 
         for idx, (_, customer) in enumerate(selected_customers.iterrows()):
             customer_id = customer["Customer ID"]
-            full_customer = get_customer_by_id(customer_id)
+            full_customer = full_customers[customer_id]
 
             st.markdown(f"### Customer ID: {customer_id}")
 
@@ -2,6 +2,7 @@
 import streamlit as st
 import pandas as pd
 from db.connect_to_db import connect_to_db
+from db.customer import CUSTOMER_COLUMNS
 from ui.customers.customer_dialogs import (
     add_customer_dialog,
     delete_customer_dialog,
@@ -21,8 +22,8 @@ def show_customer_page():
     # Load data
     try:
         with st.spinner("Loading customer data..."):
-            conn = connect_to_db()
-            df = pd.read_sql("SELECT * FROM customers LIMIT 1000", conn)
+            conn = connect_to_db(read_only=True)
+            df = pd.read_sql(f"SELECT {CUSTOMER_COLUMNS} FROM customers LIMIT 1000", conn)
             conn.close()
     except Exception as e:
         st.error("⚠️ Failed to load customer data")
@@ -41,7 +42,7 @@ def show_customer_page():
         "jump_host_password": "Jump Host Password",
         "jump_host_hostname": "Jump Host Hostname",        
         "jump_port": "Jump Host Port",        
-        "images": "Images",
+        "logo_asset_id": "Logo Asset ID",
     })
     df["Jump Host"] = df["Jump Host"].apply(lambda x: "Yes" if x else "No")
     df.insert(0, "Select", False)
@@ -57,12 +58,12 @@ def show_customer_page():
             "Jump Host Password": None,
             "Jump Host Hostname": None,   
             "Jump Host Port": None,         
-            "Images": None,
+            "Logo Asset ID": None,
             "Device Type": None,
             "target_port": None,
         },
         disabled=["Customer ID", "Customer Name", "Email", "Jump Host", "Created At",
-                   "Jump Host IP", "Jump Host Username", "Jump Host Password", "Jump Host Hostname","Jump Host Port", "Images", "Device Type"],
+                   "Jump Host IP", "Jump Host Username", "Jump Host Password", "Jump Host Hostname","Jump Host Port", "Logo Asset ID", "Device Type"],
     )
 
     selected_rows = edited_df[edited_df["Select"] == True]
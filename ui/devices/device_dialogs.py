@@ -2,7 +2,7 @@
 import streamlit as st
 import pandas as pd
 from db.customer import get_customers
-from db.devices import create_device, update_device, delete_device
+from db.devices import create_device, update_device, delete_devices
 from ui.utils import create_dismiss_handler
 
 
@@ -101,8 +101,7 @@ def delete_device_dialog(device_ids):
     with col2:
         if st.button("✅ Yes, Delete", key="confirm_delete_device"):
             try:
-                for device_id in device_ids:
-                    delete_device(device_id)
+                delete_devices(device_ids)
                 st.success(f"Deleted {len(device_ids)} device(s)")
                 st.session_state.show_delete_device = False
                 st.rerun()
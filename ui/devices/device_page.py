@@ -20,7 +20,7 @@ def show_device_page():
     # Load data via JOIN
     try:
         with st.spinner("Loading device data..."):
-            conn = connect_to_db()
+            conn = connect_to_db(read_only=True)
             query = """
                 SELECT
                     d.id,
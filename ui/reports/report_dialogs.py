@@ -1,11 +1,12 @@
 """Report dialog components"""
 import json
+import time
 import streamlit as st
 import pandas as pd
 from db.customer import get_customers, get_customer_by_id
-from db.devices import get_devices_by_customer_id, get_device_by_id
+from db.devices import get_devices_by_customer_id, get_devices_by_ids
 from db.templates import get_templates_by_customer_id, get_template_by_id
-from db.reports import create_report, delete_report, get_report_by_id
+from db.reports import create_reports, delete_reports, open_report, append_report_result, close_report, abort_report
 from juniper_service import (
     connect_to_device,
     connect_via_jump_host,
@@ -13,6 +14,7 @@ from juniper_service import (
     close,
 )
 from gen_PDF import generate_pdf
+from summary_worker import enqueue_summaries
 from ui.utils import create_dismiss_handler
 from premade_report import create_premade_report
 
@@ -70,6 +72,7 @@ def create_report_dialog():
     device_options = {f"{d[2]} - {d[5]} - {d[9]} (ID: {d[0]})": d[0] for d in devices_data}
     selected_device = st.multiselect("Device(s)", list(device_options.keys()))
     device_id = [device_options[d] for d in selected_device] if selected_device else []
+    selected_devices = get_devices_by_ids(device_id)
     
     # File uploaders - only if premade_report
     uploaded_files = {}
@@ -93,7 +96,7 @@ def create_report_dialog():
             st.markdown("### Upload Log Files")
 
         for dev_id in device_id:
-            device = get_device_by_id(dev_id)
+            device = selected_devices[dev_id]
             st.markdown(
                 f"Upload .log file for <span style='color:#FFF700; padding:2px 6px; border-radius:3px; font-family:monospace;'>{device['hostname']}</span>",
                 unsafe_allow_html=True,
@@ -128,7 +131,8 @@ def create_report_dialog():
                 )
                 customer = get_customer_by_id(customer_id)
                 jump_port = int(customer.get("jump_port") or 22)
-                successful_reports = 0
+                pending_reports = []
+                streamed_report_ids = []
 
                 if template.get("premade_report") == 1:
                     # Premade report flow - process uploaded files
@@ -138,12 +142,17 @@ def create_report_dialog():
                     
                     for dev_id, uploaded_file in uploaded_files.items():
                         all_results = create_premade_report(dev_id, customer_id, template_id, uploaded_file)
-                        create_report(dev_id, customer_id, template_id, all_results, ai_summary_value)
-                        successful_reports += 1
+                        pending_reports.append({
+                            "device_id": dev_id,
+                            "customer_id": customer_id,
+                            "template_id": template_id,
+                            "results": all_results,
+                            "ai_summary": ai_summary_value,
+                        })
                 else:
                     # Live report flow - connect to devices
                     for dev_id in device_id:
-                        device = get_device_by_id(dev_id)
+                        device = selected_devices[dev_id]
                         target_port = int(device.get("device_port") or 22)
 
                         with st.spinner(f"Connecting to device {device['hostname']}..."):
@@ -175,39 +184,61 @@ def create_report_dialog():
                                 st.error(f"❌ Unexpected connection error: {str(e)}")
                                 continue
 
-                        all_results = []
-                        with st.spinner(f"Executing commands on {device['hostname']}..."):
-                            for item in items_list:
-                                if item.get("type") == "Header":
-                                    all_results.append({
-                                        "type": "Header",
-                                        "text": item.get("text", ""),
-                                        "status": "success",
-                                    })
-                                else:
-                                    cmd = item.get("command")
-                                    cmd_description = item.get("description", "")
-                                    try:
-                                        result = run_command(connection, cmd)
-                                        all_results.append({
-                                            "type": "Command",
-                                            "command": cmd,
-                                            "description": cmd_description,
-                                            "output": result,
+                        # Stream each section into report_results as soon as it is collected;
+                        # a run that fails part-way is deleted rather than left looking complete
+                        report = open_report(dev_id, customer_id, template_id, ai_summary_value)
+                        completed = False
+                        try:
+                            with st.spinner(f"Executing commands on {device['hostname']}..."):
+                                for item in items_list:
+                                    if item.get("type") == "Header":
+                                        append_report_result(report, {
+                                            "type": "Header",
+                                            "text": item.get("text", ""),
                                             "status": "success",
                                         })
-                                    except Exception as e:
-                                        all_results.append({
-                                            "type": "Command",
-                                            "command": cmd,
-                                            "description": cmd_description,
-                                            "output": str(e),
-                                            "status": "error",
-                                        })
+                                    else:
+                                        cmd = item.get("command")
+                                        cmd_description = item.get("description", "")
+                                        started = time.monotonic()
+                                        try:
+                                            result = run_command(connection, cmd)
+                                            entry = {
+                                                "type": "Command",
+                                                "command": cmd,
+                                                "description": cmd_description,
+                                                "output": result,
+                                                "status": "success",
+                                            }
+                                        except Exception as e:
+                                            entry = {
+                                                "type": "Command",
+                                                "command": cmd,
+                                                "description": cmd_description,
+                                                "output": str(e),
+                                                "status": "error",
+                                            }
+                                        duration_ms = int((time.monotonic() - started) * 1000)
+                                        append_report_result(report, entry, duration_ms)
+
+                            close_report(report)
+                            completed = True
+                        except Exception as e:
+                            st.error(f"❌ Report for {device['hostname']} failed: {str(e)}")
+                        finally:
+                            if not completed:
+                                abort_report(report)
+                            close(connection)
+                        if completed:
+                            streamed_report_ids.append(report["report_id"])
+
+                # Write every collected premade report in one bulk transaction
+                created_ids = create_reports(pending_reports) + streamed_report_ids
+                successful_reports = len(created_ids)
 
-                        close(connection)
-                        create_report(dev_id, customer_id, template_id, all_results, ai_summary_value)
-                        successful_reports += 1
+                # Summaries are generated in the background, not in this request
+                if ai_summary_value == 1:
+                    enqueue_summaries(created_ids)
 
                 if successful_reports > 0:
                     st.success(f"✅ Created {successful_reports} report(s) successfully!")
@@ -236,8 +267,7 @@ def delete_report_dialog(report_ids):
     with col2:
         if st.button("✅ Yes, Delete", key="confirm_delete_report"):
             try:
-                for report_id in report_ids:
-                    delete_report(report_id)
+                delete_reports(report_ids)
                 st.success(f"Deleted {len(report_ids)} report(s)")
                 st.session_state.show_delete_report = False
                 st.rerun()
@@ -1,36 +1,40 @@
-import base64
-
 """Report Details page"""
 import streamlit as st
 import pandas as pd
 from db.connect_to_db import connect_to_db
+from db.reports import get_section_summaries
 from ui.reports.report_dialogs import (
     create_report_dialog,
     delete_report_dialog
 )
-from gen_PDF import generate_pdf
+from bulk_pdf import render_pdfs, build_pdf_bundle
+from datetime import datetime
+from summary_worker import pending_summaries
 
 
-def auto_download(pdf_buffer, filename):
-    b64 = base64.b64encode(pdf_buffer.getvalue()).decode()
-    
-    download_link = f"""
-        <html>
-        <body>
-        <a id="download_link" href="data:application/pdf;base64,{b64}" download="{filename}"></a>
-        <script>
-            document.getElementById('download_link').click();
-        </script>
-        </body>
-        </html>
-    """
-    
-    st.components.v1.html(download_link, height=0)
+def _prepare_download(report_ids):
+    """Render the selected reports and keep the result for the download button across reruns."""
+    progress_bar = st.progress(0.0, text=f"Generating {len(report_ids)} report(s)...")
+    progress = lambda done, total: progress_bar.progress(done / total, text=f"Generated {done}/{total} report(s)")
+    if len(report_ids) == 1:
+        report_id, filename, pdf_bytes, error = next(render_pdfs(report_ids))
+        errors = {report_id: error} if error else {}
+        download = (pdf_bytes, filename, "application/pdf") if not error else None
+    else:
+        bundle, count, errors = build_pdf_bundle(report_ids, progress)
+        filename = f"Reports_{datetime.now():%Y%m%d_%H%M%S}.zip"
+        download = (bundle, filename, "application/zip") if count else None
+    progress_bar.empty()
+    for report_id, error in errors.items():
+        st.error(f"Failed to generate report {report_id}: {error}")
+    st.session_state.report_download = (report_ids, download) if download else None
 
 
 def show_report_page():
     """Render the Report Details and Generate Report page."""
     st.subheader("Report Details")
+    if pending_summaries():
+        st.caption(f"🤖 {pending_summaries()} AI summary(ies) being generated in the background")
 
     st.session_state.setdefault("show_create_report", False)
     st.session_state.setdefault("show_delete_report", False)
@@ -38,7 +42,7 @@ def show_report_page():
 
     try:
         with st.spinner("Loading report data..."):
-            conn = connect_to_db()
+            conn = connect_to_db(read_only=True)
             query = """
                 SELECT
                     r.id,
@@ -48,22 +52,31 @@ def show_report_page():
                     c.name AS customer_name,
                     r.template_id,
                     t.name AS template_name,
-                    r.result,
                     r.created_at,
-                    r.ai_summary
+                    r.ai_summary,
+                    r.completed
                 FROM reports r
                 LEFT JOIN devices d ON r.device_id = d.id
                 LEFT JOIN customers c ON r.customer_id = c.id
                 LEFT JOIN command_templates t ON r.template_id = t.id
+                ORDER BY r.created_at DESC
                 LIMIT 1000
             """
             df_reports = pd.read_sql(query, conn)
             conn.close()
+            summaries = get_section_summaries(df_reports["id"].tolist())
     except Exception as e:
         st.error("⚠️ Failed to load report data")
         st.error(f"Error: {str(e)}")
         st.stop()
 
+    # Section counts come from the report_sections index; reports not yet indexed show blanks
+    df_reports["commands"] = df_reports["id"].map(lambda i: summaries.get(i, {}).get("commands"))
+    df_reports["errors"] = df_reports["id"].map(lambda i: summaries.get(i, {}).get("errors"))
+    df_reports["output_size"] = df_reports["id"].map(
+        lambda i: f"{summaries[i]['output_bytes'] / 1024:,.1f} KB" if i in summaries else None
+    )
+
     df_reports = df_reports.rename(columns={
         "id": "Report ID",
         "device_id": "Device ID",
@@ -72,9 +85,12 @@ def show_report_page():
         "customer_name": "Customer Name",
         "template_id": "Template ID",
         "template_name": "Template Name",
-        "result": "Result",
         "created_at": "Created At",
         "ai_summary": "AI Summary",
+        "completed": "Complete",
+        "commands": "Commands",
+        "errors": "Errors",
+        "output_size": "Output Size",
     })
     df_reports.insert(0, "Select", False)
 
@@ -87,10 +103,10 @@ def show_report_page():
             "Device ID": None,
             "Customer ID": None,
             "Template ID": None,
-            "Result": None,
             "AI Summary": None,
+            "Complete": st.column_config.CheckboxColumn("Complete", help="Unchecked: collection did not finish", width="small"),
         },
-        disabled=["Report ID", "Device", "Customer Name", "Template Name", "Created At"],
+        disabled=["Report ID", "Device", "Customer Name", "Template Name", "Created At", "Complete", "Commands", "Errors", "Output Size"],
     )
 
     selected_rows = edited_df[edited_df["Select"] == True]
@@ -107,14 +123,16 @@ def show_report_page():
         else:
             report_ids = selected_rows["Report ID"].tolist()
 
-            if st.button("📋 Download Selected Report(s)"):
-                for report_id in report_ids:
-                    try:
-                        with st.spinner(f"Generating report {report_id}..."):
-                            pdf_buffer, filename = generate_pdf(report_id)
-                            auto_download(pdf_buffer, filename)
-                    except Exception as e:
-                        st.error(f"Failed to generate report {report_id}: {str(e)}")
+            if st.button("📋 Generate Selected Report(s)"):
+                _prepare_download(report_ids)
+            prepared = st.session_state.get("report_download")
+            if prepared and prepared[0] == report_ids:
+                data, filename, mime = prepared[1]
+                if hasattr(data, "read"):
+                    # download_button needs bytes; the bundle itself stays spooled on disk
+                    data.seek(0)
+                    data = data.read()
+                st.download_button(f"⬇️ {filename}", data=data, file_name=filename, mime=mime)
     with col3:
         if selected_rows.empty:
             st.button("🗑 Delete Report", disabled=True)
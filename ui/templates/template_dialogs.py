@@ -6,7 +6,8 @@ import io
 from datetime import datetime
 
 from db.customer import get_customers
-from db.templates import create_template, update_template, delete_template
+from db.templates import create_template, update_template, delete_templates
+from db.assets import get_asset_rendition
 from ui.utils import create_dismiss_handler
 
 
@@ -327,8 +328,7 @@ def delete_template_dialog(template_ids):
     with col2:
         if st.button("Delete", use_container_width=True):
 
-            for i in template_ids:
-                delete_template(i)
+            delete_templates(template_ids)
 
             st.success("Templates deleted")
 
@@ -383,18 +383,14 @@ def update_template_dialog(selected_templates):
         )
 
         # -------------------------
-        # Show existing logo safely
+        # Show existing logo (pre-scaled thumbnail, validated at upload)
         # -------------------------
-        existing_logo = template.get("Company Logo")
+        existing_logo_id = template.get("Logo Asset ID")
 
-        if isinstance(existing_logo, (bytes, bytearray)) and len(existing_logo) > 0:
-            try:
-                image = Image.open(io.BytesIO(existing_logo))
-                image.verify()  # validate image
-                image = Image.open(io.BytesIO(existing_logo))  # reopen after verify
-                st.image(image, width=100, caption="Current Logo")
-            except Exception:
-                st.warning("Stored logo is corrupted or not a valid image.")
+        if pd.notna(existing_logo_id):
+            thumbnail = get_asset_rendition(int(existing_logo_id), "thumb")
+            if thumbnail:
+                st.image(thumbnail, width=100, caption="Current Logo")
 
         st.markdown("Upload a new logo to replace the current one.")
 
@@ -602,7 +598,6 @@ def update_template_dialog(selected_templates):
             "desc": desc,
             "selected_customer": selected_customer,
             "company_logo": company_logo,
-            "existing_logo": existing_logo,
             "premade_report": premade_report,
             "enable_summary": enable_summary,
             "manual_summary_desc": manual_summary_desc,
@@ -633,7 +628,6 @@ def update_template_dialog(selected_templates):
                     st.error(f"Template {update_data['template_id']}: Add at least one command")
                     return
 
-                final_logo = update_data["company_logo"] if update_data["company_logo"] else update_data["existing_logo"]
                 description_array = [x.get("description", "") for x in update_data["updated_commands"]]
 
                 update_template(
@@ -647,7 +641,7 @@ def update_template_dialog(selected_templates):
                     update_data["manual_summary_desc"] if update_data["enable_summary"] else None,
                     update_data["manual_summary_table"] if update_data["enable_summary"] else None,
                     update_data["premade_report"],
-                    final_logo,
+                    update_data["company_logo"],
                 )
 
             st.success(f"Updated {len(all_updates)} template(s)")
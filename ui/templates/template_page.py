@@ -19,7 +19,7 @@ def show_template_page():
 
     try:
         with st.spinner("Loading template data..."):
-            conn = connect_to_db()
+            conn = connect_to_db(read_only=True)
             query = """
                 SELECT
                     t.id,
@@ -33,7 +33,7 @@ def show_template_page():
                     t.update_time,
                     t.manual_summary_desc,
                     t.manual_summary_table,
-                    t.company_logo
+                    t.logo_asset_id
                 FROM command_templates t
                 LEFT JOIN customers c ON t.customer_id = c.id
                 LIMIT 1000
@@ -57,7 +57,7 @@ def show_template_page():
         "update_time": "Last Updated",
         "manual_summary_desc": "Manual Summary Description",
         "manual_summary_table": "Manual Summary Table",
-        "company_logo": "Company Logo",
+        "logo_asset_id": "Logo Asset ID",
     })
     df_templates.insert(0, "Select", False)
 
@@ -70,7 +70,7 @@ def show_template_page():
             "Customer ID": None,
             "Description": None,
             "Command": None,
-            "Company Logo": None,
+            "Logo Asset ID": None,
         },
         disabled=["Template ID", "Name", "Customer Name", "Created At", "General Description", "Last Updated", "Manual Summary Description", "Manual Summary Table"],
     )